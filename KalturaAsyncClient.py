@@ -0,0 +1,377 @@
+import io
+import time
+import asyncio
+import weakref
+
+from KalturaClient import *
+from KalturaClient import KalturaClient, KalturaCallState, KalturaListIterator, PluginServicesProxy
+from KalturaAsyncConnectionPool import KalturaAsyncConnectionPool
+from KalturaCallBatcher import KalturaCallBatcher, KalturaBatchedCall
+
+# A Kaltura client for asyncio (Python 3 only), on the generated services:
+#
+#     client = KalturaAsyncClient(config)
+#     client.setKs(ks)
+#     entry = await client.media.get(entryId)
+#     (thumbs, captions) = await asyncio.gather(
+#         client.thumbAsset.list(thumbFilter),
+#         client.caption.captionAsset.list(captionFilter))
+#
+# An awaited action queues its call without sending it, as in a multirequest,
+# sends the request through a keep-alive pool of asyncio connections, then
+# runs the generated action again on the response to decode its result, so
+# params, files and results are handled as by KalturaClient. Multirequests
+# work the same way, with doMultiRequest awaited:
+#
+#     client.startMultiRequest()
+#     await client.media.get(entryId)
+#     await client.thumbAsset.list(thumbFilter)
+#     (entry, thumbs) = await client.doMultiRequest()
+#
+# Tasks sharing a client each queue their own calls. Proxies configured for
+# urllib are not used. File uploads read their files in the event loop.
+
+try:
+    currentTask = asyncio.current_task
+except AttributeError:
+    currentTask = asyncio.Task.current_task
+
+def getCurrentTask():
+    try:
+        return currentTask()
+    except RuntimeError:
+        # no event loop running
+        return None
+
+# The calls a task is queueing on a client, whether they make up a
+# multirequest, whether the task is queueing the call of an action to send it
+# on its own, and the (url, response) or result node the task's actions are
+# decoding
+class KalturaTaskCallState:
+    def __init__(self):
+        self.callsQueue = []
+        self.multiRequest = False
+        self.queueing = False
+        self.response = None
+        self.resultNode = None
+
+# The same, for code running outside a task
+class KalturaAsyncCallState(KalturaCallState):
+    def __init__(self):
+        KalturaCallState.__init__(self)
+        self.queueing = False
+        self.response = None
+
+# Awaitable actions of a generated service, or services of a plugin:
+#     entry = await client.media.get(entryId)
+#     await KalturaAsyncService(client, KalturaCaptionAssetService(client)).list(filter)
+class KalturaAsyncService:
+    def __init__(self, client, service):
+        self.client = client
+        self.service = service
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        value = getattr(self.service, name)
+        if isinstance(value, (KalturaServiceBase, PluginServicesProxy)):
+            value = KalturaAsyncService(self.client, value)
+        elif callable(value):
+            value = KalturaAsyncAction(self.client, value)
+        setattr(self, name, value)
+        return value
+
+# An action of a generated service; calling it returns the awaitable call
+class KalturaAsyncAction:
+    def __init__(self, client, action):
+        self.client = client
+        self.action = action
+
+    def __call__(self, *args, **kwargs):
+        return self.client.callAction(self.action, *args, **kwargs)
+
+class KalturaAsyncClient(KalturaClient):
+    # keep-alive connections, shared by every async client in the process
+    connectionPool = KalturaAsyncConnectionPool()
+
+    def __init__(self, config):
+        KalturaClient.__init__(self, config)
+        self.callState = KalturaAsyncCallState()
+        self.taskCallStates = weakref.WeakKeyDictionary()
+
+    def getCallState(self):
+        task = getCurrentTask()
+        if task == None:
+            return self.callState
+        state = self.taskCallStates.get(task)
+        if state == None:
+            state = self.taskCallStates[task] = KalturaTaskCallState()
+        return state
+
+    # The queued calls and multirequest flag of the calling task
+    def getCallsQueue(self):
+        return self.getCallState().callsQueue
+
+    def setCallsQueue(self, callsQueue):
+        self.getCallState().callsQueue = callsQueue
+
+    callsQueue = property(getCallsQueue, setCallsQueue)
+
+    def getMultiRequestFlag(self):
+        return self.getCallState().multiRequest
+
+    def setMultiRequestFlag(self, multiRequest):
+        self.getCallState().multiRequest = multiRequest
+
+    multiRequest = property(getMultiRequestFlag, setMultiRequestFlag)
+
+    def isMultiRequest(self):
+        state = self.getCallState()
+        return state.multiRequest or state.queueing
+
+    def __getattr__(self, name):
+        service = KalturaAsyncService(self, KalturaClient.__getattr__(self, name))
+        setattr(self, name, service)
+        return service
+
+    def addCoreService(self, serviceName, serviceClass):
+        setattr(self, serviceName, KalturaAsyncService(self, serviceClass))
+
+    # Queues the call an action makes without sending it, and returns
+    # ((url, params, files, requestTimeout), None), or (None, result) for
+    # actions that make no request (serve actions return a url)
+    def queueAction(self, action, args, kwargs):
+        if isinstance(action, KalturaAsyncAction):
+            action = action.action
+        if not self.config.format in (KALTURA_SERVICE_FORMAT_XML, KALTURA_SERVICE_FORMAT_JSON):
+            raise KalturaClientException("unsupported format: %s" % self.config.format, KalturaClientException.ERROR_FORMAT_NOT_SUPPORTED)
+
+        # the generated action returns once its call is queued, as in a
+        # multirequest, but serve urls are still built for a single call
+        state = self.getCallState()
+        state.queueing = True
+        try:
+            result = action(*args, **kwargs)
+        except:
+            state.callsQueue = []
+            raise
+        finally:
+            state.queueing = False
+        if len(self.callsQueue) == 0:
+            return (None, result)
+
+        (url, params, files) = self.getRequestParams()
+        requestTimeout = self.getRequestTimeout(self.callsQueue)
+        self.callsQueue = []
+        return ((url, params, files, requestTimeout), None)
+
+    async def sendRequest(self, url, params, files, requestTimeout):
+        connectTimeout = getattr(self.config, 'connectTimeout', requestTimeout)
+        if len(files.get()) == 0:
+            body = self.encodeParams(params)
+            headers = {'Content-Type': 'application/x-www-form-urlencoded',
+                       'Content-Length': str(len(body))}
+            body = [body]
+        else:
+            body, headers = self.encodeMultipart(params, files)
+        try:
+            response = await self.connectionPool.request(url, body, headers, requestTimeout, connectTimeout)
+        except asyncio.TimeoutError:
+            raise KalturaClientException('timed out', KalturaClientException.ERROR_READ_TIMEOUT)
+        except Exception as e:
+            raise KalturaClientException(e, KalturaClientException.ERROR_CONNECTION_FAILED)
+        if response.status >= 300:
+            raise KalturaClientException('HTTP Error %s: %s' % (response.status, response.reason), KalturaClientException.ERROR_CONNECTION_FAILED)
+        return response.data
+
+    # Runs an action again with the response to its call, for the generated
+    # code to decode the result
+    def decodeAction(self, url, postResult, action, args, kwargs):
+        state = self.getCallState()
+        state.response = (url, postResult)
+        try:
+            return action(*args, **kwargs)
+        finally:
+            state.response = None
+            state.callsQueue = []
+            state.multiRequest = False
+
+    # Awaited by the actions of the services: sends the call the action makes
+    # and returns its result, or queues it in a multirequest
+    async def callAction(self, action, *args, **kwargs):
+        if isinstance(action, KalturaAsyncAction):
+            action = action.action
+        if self.multiRequest:
+            # sent by doMultiRequest
+            return action(*args, **kwargs)
+        (request, result) = self.queueAction(action, args, kwargs)
+        if request == None:
+            return result
+
+        startTime = time.time()
+        (url, params, files, requestTimeout) = request
+        postResult = await self.sendRequest(url, params, files, requestTimeout)
+        result = self.decodeAction(url, postResult, action, args, kwargs)
+        self.log("execution time for [%s]: [%s]" % (url, time.time() - startTime))
+        return result
+
+    # Parses the response the calling task is decoding; the generated
+    # actions call this once they queued their call
+    def doQueue(self):
+        state = self.getCallState()
+        if state.resultNode != None:
+            resultNode = state.resultNode
+            state.resultNode = None
+            state.callsQueue = []
+            state.multiRequest = False
+            return resultNode
+        if state.response == None:
+            raise KalturaClientException("KalturaAsyncClient calls are sent by awaiting the service actions", KalturaClientException.ERROR_GENERIC)
+        (url, postResult) = state.response
+        state.response = None
+        state.callsQueue = []
+        state.multiRequest = False
+
+        if self.config.format == KALTURA_SERVICE_FORMAT_JSON:
+            return self.parseJsonPostResult(postResult)
+        return self.parsePostResult(postResult)
+
+    def openHttpRequest(self, url, params, files, requestTimeout):
+        raise KalturaClientException("KalturaAsyncClient calls are sent by awaiting the service actions", KalturaClientException.ERROR_GENERIC)
+
+    async def doMultiRequest(self):
+        if len(self.callsQueue) == 0:
+            self.multiRequest = False
+            return []
+        if not self.config.format in (KALTURA_SERVICE_FORMAT_XML, KALTURA_SERVICE_FORMAT_JSON):
+            raise KalturaClientException("unsupported format: %s" % self.config.format, KalturaClientException.ERROR_FORMAT_NOT_SUPPORTED)
+
+        startTime = time.time()
+        (url, params, files) = self.getRequestParams()
+        requestTimeout = self.getRequestTimeout(self.callsQueue)
+        self.callsQueue = []
+        self.multiRequest = False
+
+        postResult = await self.sendRequest(url, params, files, requestTimeout)
+        state = self.getCallState()
+        state.response = (url, postResult)
+        try:
+            result = KalturaClient.doMultiRequest(self)
+        finally:
+            state.response = None
+        self.log("execution time for [%s]: [%s]" % (url, time.time() - startTime))
+        return result
+
+    # Sends the call an action makes on its own and returns (url, response),
+    # with the response read whole
+    async def openActionRequest(self, caller, action, args, kwargs):
+        if self.multiRequest:
+            raise KalturaClientException("%s can't be used in a multirequest" % caller, KalturaClientException.ERROR_GENERIC)
+        ((url, params, files, requestTimeout), _) = self.queueAction(action, args, kwargs)
+        return (url, io.BytesIO(await self.sendRequest(url, params, files, requestTimeout)))
+
+    # As in KalturaClient, with the list or object action awaited:
+    #     for entry in await client.iterateList(client.media.list, filter, pager):
+    async def iterateList(self, listAction, *args, **kwargs):
+        (url, f) = await self.openActionRequest('iterateList', listAction, args, kwargs)
+        return KalturaListIterator(self, f, url, self.config.format)
+
+    async def projectList(self, propertyNames, listAction, *args, **kwargs):
+        (url, f) = await self.openActionRequest('projectList', listAction, args, kwargs)
+        return KalturaListIterator(self, f, url, self.config.format, propertyNames)
+
+    async def projectObject(self, propertyNames, action, *args, **kwargs):
+        startTime = time.time()
+        (url, f) = await self.openActionRequest('projectObject', action, args, kwargs)
+        postResult = self.readHttpResponse(f)
+        if self.config.format == KALTURA_SERVICE_FORMAT_JSON:
+            resultNode = self.parseJsonPostResult(postResult)
+        else:
+            resultNode = self.parsePostResult(postResult)
+        self.log("execution time for [%s]: [%s]" % (url, time.time() - startTime))
+        return KalturaObjectFactory.project(resultNode, propertyNames)
+
+# KalturaCallBatcher for KalturaAsyncClient, as a dataloader: queue() returns
+# a future, and the calls queued are sent together `window` seconds after the
+# first of them (by default, as soon as the tasks already running have had
+# their turn, which takes in every call of an asyncio.gather), or once
+# maxBatchSize of them wait. The batches of a flush are sent at the same time:
+#
+#     batcher = KalturaAsyncCallBatcher(client)
+#     urls = await asyncio.gather(*[batcher.queue(client.thumbAsset.getUrl, thumbId) for thumbId in thumbIds])
+#
+# Tasks sharing a batcher share its multirequests, also when their actions
+# belong to other clients of the same configuration (e.g. pooled clients of
+# concurrent requests): each call is queued and decoded by its own client,
+# with its own ks, and a batch goes out with the client of its first call.
+class KalturaAsyncCallBatcher(KalturaCallBatcher):
+    def __init__(self, client, maxBatchSize = 50, window = 0):
+        KalturaCallBatcher.__init__(self, client, maxBatchSize)
+        self.window = window
+        self.flushTimer = None
+
+    def createCall(self, action, args, kwargs, call):
+        return KalturaAsyncBatchedCall(self, action, args, kwargs, call)
+
+    def queue(self, action, *args, **kwargs):
+        if isinstance(action, KalturaAsyncAction):
+            action = action.action
+        batchedCall = KalturaCallBatcher.queue(self, action, *args, **kwargs)
+        if len(self.pending) >= self.maxBatchSize:
+            self.startFlush()
+        elif len(self.pending) > 0 and self.flushTimer == None:
+            self.flushTimer = asyncio.get_event_loop().call_later(self.window, self.startFlush)
+        return batchedCall.future
+
+    def startFlush(self):
+        if self.flushTimer != None:
+            self.flushTimer.cancel()
+            self.flushTimer = None
+        batches = self.takeBatches()
+        if len(batches) > 0:
+            asyncio.ensure_future(asyncio.gather(*[self.send(batch) for batch in batches]))
+
+    # Sends the pending calls now; their futures are done once it returns
+    async def flush(self):
+        if self.flushTimer != None:
+            self.flushTimer.cancel()
+            self.flushTimer = None
+        await asyncio.gather(*[self.send(batch) for batch in self.takeBatches()])
+
+    async def send(self, batch):
+        client = batch[0].client
+        try:
+            client.multiRequest = len(batch) > 1
+            client.callsQueue = [batchedCall.call for batchedCall in batch]
+            (url, params, files) = client.getRequestParams()
+            requestTimeout = client.getRequestTimeout(client.callsQueue)
+            client.callsQueue = []
+            client.multiRequest = False
+            postResult = await client.sendRequest(url, params, files, requestTimeout)
+            if client.config.format == KALTURA_SERVICE_FORMAT_JSON:
+                resultNode = client.parseJsonPostResult(postResult)
+            else:
+                resultNode = client.parsePostResult(postResult)
+        except Exception as e:
+            client.callsQueue = []
+            client.multiRequest = False
+            for batchedCall in batch:
+                batchedCall.setException(e)
+            return
+        self.resolve(batch, resultNode)
+
+# A call queued on a KalturaAsyncCallBatcher, with the future its caller awaits
+class KalturaAsyncBatchedCall(KalturaBatchedCall):
+    def __init__(self, batcher, action, args, kwargs, call):
+        KalturaBatchedCall.__init__(self, batcher, action, args, kwargs, call)
+        self.future = asyncio.get_event_loop().create_future()
+
+    def setResult(self, result):
+        KalturaBatchedCall.setResult(self, result)
+        if not self.future.done():
+            self.future.set_result(result)
+
+    def setException(self, exception):
+        KalturaBatchedCall.setException(self, exception)
+        if not self.future.done():
+            self.future.set_exception(exception)
@@ -0,0 +1,238 @@
+import ssl
+import time
+import asyncio
+
+try:
+    from urllib.parse import urlparse
+except ImportError:
+    from urlparse import urlparse
+
+# Keep-alive HTTP/1.1 connections to the Kaltura API for asyncio, pooled per
+# host (Python 3 only)
+#
+# The asyncio counterpart of KalturaConnectionPool: a request takes an idle
+# connection or opens one, sends the body and reads the whole response
+# without blocking the event loop, then puts the connection back. Idle
+# connections are dropped after idleTimeout seconds or once the server has
+# closed them, and a request whose head (request line, headers and a body
+# sent with them) fails to go out on a reused connection is retried once on a
+# new connection; failures once the head went out are not retried, as the
+# server may have run the call already (see KalturaConnectionPool). At most
+# maxConnectionsPerHost requests are in flight per host; more wait for one
+# to finish. Connections belong to the event loop that opened them; a pool
+# used from another loop starts over with no connections.
+class KalturaAsyncConnectionPool:
+    def __init__(self, maxIdlePerHost = 16, idleTimeout = 30, maxConnectionsPerHost = 64):
+        self.maxIdlePerHost = maxIdlePerHost
+        self.idleTimeout = idleTimeout
+        self.maxConnectionsPerHost = maxConnectionsPerHost
+        # (scheme, host, port) -> [(reader, writer, idle since)]
+        self.idle = {}
+        # (scheme, host, port) -> semaphore limiting requests in flight
+        self.slots = {}
+        self.loop = None
+        self.sslContext = None
+        self.stats = {'opened': 0, 'reused': 0, 'retried': 0, 'expired': 0, 'stale': 0}
+
+    @staticmethod
+    def closeConnection(writer):
+        try:
+            writer.close()
+        except Exception:
+            pass
+
+    def checkLoop(self):
+        loop = asyncio.get_event_loop()
+        if self.loop is loop:
+            return
+        for connections in self.idle.values():
+            for (_, writer, _) in connections:
+                self.closeConnection(writer)
+        self.idle = {}
+        self.slots = {}
+        self.loop = loop
+
+    def getSlots(self, key):
+        slots = self.slots.get(key)
+        if slots == None:
+            slots = self.slots[key] = asyncio.Semaphore(self.maxConnectionsPerHost)
+        return slots
+
+    async def newConnection(self, key, connectTimeout):
+        (scheme, host, port) = key
+        sslContext = None
+        if scheme == 'https':
+            if self.sslContext == None:
+                self.sslContext = ssl.create_default_context()
+            sslContext = self.sslContext
+        try:
+            (reader, writer) = await asyncio.wait_for(
+                asyncio.open_connection(host, port, ssl = sslContext), connectTimeout)
+        except asyncio.TimeoutError:
+            # unlike read timeouts, which time out the whole request
+            raise ConnectionError('timed out connecting to %s:%s' % (host, port))
+        self.stats['opened'] += 1
+        return (reader, writer)
+
+    def getIdleConnection(self, key):
+        now = time.time()
+        connections = self.idle.get(key)
+        while connections:
+            (reader, writer, idleSince) = connections.pop()
+            if now - idleSince > self.idleTimeout:
+                self.stats['expired'] += 1
+            elif reader.at_eof() or writer.transport.is_closing():
+                # the server closed it while it sat idle
+                self.stats['stale'] += 1
+            else:
+                self.stats['reused'] += 1
+                return (reader, writer)
+            self.closeConnection(writer)
+        return None
+
+    def releaseConnection(self, key, reader, writer):
+        if self.loop is not asyncio.get_event_loop() or writer.transport.is_closing():
+            self.closeConnection(writer)
+            return
+        connections = self.idle.setdefault(key, [])
+        if len(connections) < self.maxIdlePerHost:
+            connections.append((reader, writer, time.time()))
+        else:
+            self.closeConnection(writer)
+
+    # Sends the request line, the headers and, for a body of one chunk, the
+    # body with them, in the same packet; returns the chunks left to send
+    @staticmethod
+    async def sendHead(writer, host, path, body, headers):
+        head = ['POST %s HTTP/1.1' % path, 'Host: %s' % host, 'Accept-Encoding: identity']
+        for (name, value) in headers.items():
+            head.append('%s: %s' % (name, value))
+        head = ('\r\n'.join(head) + '\r\n\r\n').encode('latin-1')
+        if isinstance(body, list) and len(body) == 1:
+            # small bodies go out in the same packet as the headers
+            writer.write(head + body[0])
+            body = []
+        else:
+            writer.write(head)
+        await writer.drain()
+        return body
+
+    @staticmethod
+    async def sendBody(writer, body):
+        for chunk in body:
+            if not isinstance(chunk, bytes):
+                chunk = chunk.encode('utf8')
+            writer.write(chunk)
+            await writer.drain()
+
+    @staticmethod
+    async def readResponse(reader, statusLine):
+        (version, status, reason) = (statusLine.decode('latin-1').rstrip('\r\n').split(' ', 2) + [''])[:3]
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            (name, _, value) = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        connection = headers.get('connection', '').lower()
+        willClose = connection == 'close' or (version == 'HTTP/1.0' and connection != 'keep-alive')
+        if 'chunked' in headers.get('transfer-encoding', '').lower():
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';', 1)[0], 16)
+                if size == 0:
+                    # skip trailers
+                    while not (await reader.readline()) in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            data = b''.join(chunks)
+        elif 'content-length' in headers:
+            data = await reader.readexactly(int(headers['content-length']))
+        else:
+            data = await reader.read()
+            willClose = True
+        return KalturaAsyncResponse(int(status), reason, headers, data, willClose)
+
+    # Sends the request and reads its response; returns None when a reused
+    # connection turns out to be closed before the head of the request went
+    # out, the only failure safe to retry
+    async def exchange(self, key, reader, writer, host, path, body, headers, reused):
+        response = None
+        try:
+            try:
+                rest = await self.sendHead(writer, host, path, body, headers)
+            except ConnectionError:
+                if not reused:
+                    raise
+                return None
+            await self.sendBody(writer, rest)
+            statusLine = await reader.readline()
+            if not statusLine:
+                raise ConnectionResetError('connection closed before the response')
+            response = await self.readResponse(reader, statusLine)
+        finally:
+            if response == None or response.willClose:
+                self.closeConnection(writer)
+            else:
+                self.releaseConnection(key, reader, writer)
+        return response
+
+    # POSTs the body chunks to url and returns the whole response; body may
+    # be a poster multipart generator, which is reset before a retry.
+    # connectTimeout applies to opening a connection, readTimeout to sending
+    # the request and reading its response.
+    async def request(self, url, body, headers, readTimeout = None, connectTimeout = None):
+        self.checkLoop()
+        parsedUrl = urlparse(url)
+        key = (parsedUrl.scheme, parsedUrl.hostname, parsedUrl.port or (443 if parsedUrl.scheme == 'https' else 80))
+        host = parsedUrl.netloc.rsplit('@', 1)[-1]
+        path = parsedUrl.path or '/'
+        if parsedUrl.query:
+            path += '?' + parsedUrl.query
+
+        slots = self.getSlots(key)
+        await slots.acquire()
+        try:
+            connection = self.getIdleConnection(key)
+            if connection != None:
+                (reader, writer) = connection
+                response = await asyncio.wait_for(
+                    self.exchange(key, reader, writer, host, path, body, headers, True), readTimeout)
+                if response != None:
+                    return response
+                # the server dropped the connection while it sat idle
+                self.stats['retried'] += 1
+                if hasattr(body, 'reset'):
+                    body.reset()
+            (reader, writer) = await self.newConnection(key, connectTimeout)
+            return await asyncio.wait_for(
+                self.exchange(key, reader, writer, host, path, body, headers, False), readTimeout)
+        finally:
+            slots.release()
+
+    def info(self):
+        stats = dict(self.stats)
+        requests = stats['opened'] + stats['reused']
+        stats['reuse_ratio'] = float(stats['reused']) / requests if requests else None
+        stats['idle'] = sum(len(connections) for connections in self.idle.values())
+        return stats
+
+    # closes the idle connections
+    def close(self):
+        for connections in self.idle.values():
+            for (_, writer, _) in connections:
+                self.closeConnection(writer)
+        self.idle = {}
+
+# A response read to the end
+class KalturaAsyncResponse:
+    def __init__(self, status, reason, headers, data, willClose):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.data = data
+        self.willClose = willClose
@@ -0,0 +1,171 @@
+from KalturaClientBase import KalturaClientException
+from KalturaClient import MultiRequestSubResult
+
+# Collects independent calls on a client and sends them together, as
+# multirequests of at most maxBatchSize calls:
+#
+#     batcher = KalturaCallBatcher(client)
+#     urls = [batcher.queue(client.thumbAsset.getUrl, thumbId) for thumbId in thumbIds]
+#     urls = [url.get() for url in urls]
+#
+# queue() takes an action of a generated service and its arguments, and
+# returns a KalturaBatchedCall instead of sending the call. Every call queued
+# so far is sent the first time one of their results is asked for, or by
+# flush(). Each result is decoded by its own action, as if the call had been
+# sent on its own: get() returns it, or raises the KalturaException the server
+# returned for that call alone (or the error that failed its whole request).
+# A batch of one call goes out as a plain request.
+#
+# The calls must not depend on each other's results (see KalturaCallPipeline
+# for calls that do). A batcher is meant for one thread, e.g. for the calls of
+# one KTS request.
+class KalturaCallBatcher:
+    def __init__(self, client, maxBatchSize = 50):
+        self.client = client
+        self.maxBatchSize = maxBatchSize
+        self.pending = []
+
+    # The client an action of a generated service queues its calls on: the
+    # client of its service, e.g. that of another request than the client the
+    # batcher was created with
+    def getActionClient(self, action):
+        service = getattr(action, '__self__', None)
+        client = getattr(service, 'client', None)
+        if client == None:
+            return self.client
+        return client
+
+    # Queues the call an action makes without sending it, and returns
+    # (call, None), or (None, result) for actions that make no request (serve
+    # actions return a url)
+    def queueCall(self, action, args, kwargs):
+        client = self.getActionClient(action)
+        if client.isMultiRequest():
+            raise KalturaClientException("calls can't be batched in a multirequest", KalturaClientException.ERROR_GENERIC)
+        client.multiRequest = True
+        try:
+            result = action(*args, **kwargs)
+            calls = client.callsQueue
+        finally:
+            client.callsQueue = []
+            client.multiRequest = False
+        if len(calls) == 0:
+            return (None, result)
+        return (calls[0], None)
+
+    def createCall(self, action, args, kwargs, call):
+        return KalturaBatchedCall(self, action, args, kwargs, call)
+
+    def queue(self, action, *args, **kwargs):
+        (call, result) = self.queueCall(action, args, kwargs)
+        batchedCall = self.createCall(action, args, kwargs, call)
+        if call == None:
+            batchedCall.setResult(result)
+        else:
+            self.pending.append(batchedCall)
+        return batchedCall
+
+    # The pending calls, taken off the queue in batches of maxBatchSize
+    def takeBatches(self):
+        pending = self.pending
+        self.pending = []
+        return [pending[i:i + self.maxBatchSize] for i in range(0, len(pending), self.maxBatchSize)]
+
+    def flush(self):
+        for batch in self.takeBatches():
+            try:
+                # each call carries its own ks; the batch goes out with the
+                # client of its first call
+                client = batch[0].client
+                client.multiRequest = len(batch) > 1
+                client.callsQueue = [batchedCall.call for batchedCall in batch]
+                resultNode = client.doQueue()
+            except Exception as e:
+                for batchedCall in batch:
+                    batchedCall.setException(e)
+                continue
+            self.resolve(batch, resultNode)
+
+    # Hands every call of a batch its result, from the response to the batch
+    def resolve(self, batch, resultNode):
+        if len(batch) == 1:
+            itemNodes = [resultNode]
+        else:
+            itemNodes = list(resultNode.childNodes)
+        if len(itemNodes) != len(batch):
+            e = KalturaClientException('%s results for %s calls' % (len(itemNodes), len(batch)), KalturaClientException.ERROR_RESULT_NOT_FOUND)
+            for batchedCall in batch:
+                batchedCall.setException(e)
+            return
+        for (batchedCall, itemNode) in zip(batch, itemNodes):
+            client = batchedCall.client
+            exceptionObj = client.getExceptionIfError(itemNode)
+            if exceptionObj != None:
+                batchedCall.setException(exceptionObj)
+                continue
+            try:
+                batchedCall.setResult(client.decodeActionResult(itemNode, batchedCall.action, batchedCall.args, batchedCall.kwargs))
+            except Exception as e:
+                batchedCall.setException(e)
+
+# A call queued on a KalturaCallBatcher, with the client of its action
+class KalturaBatchedCall:
+    def __init__(self, batcher, action, args, kwargs, call):
+        self.batcher = batcher
+        self.client = batcher.getActionClient(action)
+        self.action = action
+        self.args = args
+        self.kwargs = kwargs
+        self.call = call
+        self.done = False
+        self.result = None
+        self.exception = None
+        self.ref = None
+
+    def setResult(self, result):
+        self.done = True
+        self.result = result
+
+    def setException(self, exception):
+        self.done = True
+        self.exception = exception
+
+    def get(self):
+        if not self.done:
+            self.batcher.flush()
+        if self.exception != None:
+            raise self.exception
+        return self.result
+
+# Dependent calls sent together, in one multirequest: a call may take the
+# results of the calls queued before it as arguments, by reference, and the
+# server resolves the references as it runs the calls in order:
+#
+#     pipeline = KalturaCallPipeline(client)
+#     added = pipeline.queue(client.thumbAsset.add, entryId, KalturaThumbAsset())
+#     pipeline.queue(client.thumbAsset.setAsDefault, added.ref.id)
+#     thumbAsset = added.get()
+#
+# ref is the result of a queued call as a MultiRequestSubResult: added.ref.id
+# is sent as {1:result:id}. As with the batcher, each result is decoded by its
+# own action, to the type it has when the call is sent on its own, and get()
+# raises the KalturaException of its call; a call given a reference to a call
+# that failed fails too. Queue the whole pipeline before asking for a result:
+# the references count the calls from the first call sent with them.
+class KalturaCallPipeline(KalturaCallBatcher):
+    def __init__(self, client):
+        KalturaCallBatcher.__init__(self, client, None)
+
+    def createCall(self, action, args, kwargs, call):
+        pipelinedCall = KalturaBatchedCall(self, action, args, kwargs, call)
+        if call != None:
+            pipelinedCall.ref = MultiRequestSubResult('%s:result' % (len(self.pending) + 1))
+        return pipelinedCall
+
+    # All the pending calls, in one multirequest
+    def takeBatches(self):
+        pending = self.pending
+        self.pending = []
+        if len(pending) == 0:
+            return []
+        return [pending]
@@ -1,9 +1,10 @@
 from KalturaCoreClient import *
 from KalturaClientBase import *
-from xml.parsers.expat import ExpatError
-from xml.dom import minidom
-from threading import Timer
+import hashlib
+import base64
+import random
 import socket
+import threading
 import time
 import sys
 import os
@@ -21,7 +22,10 @@ if sys.version_info[0] > 2:
 else:
     import urllib
 
-from utils import urlencode
+from KalturaConnectionPool import KalturaConnectionPool, KalturaPooledResponse
+from KalturaXmlDecoder import createXmlDecoder, parseString, XML_PARSE_ERRORS
+from KalturaJsonDecoder import parseJson, getJsonError
+import KalturaPluginManifest
 
 # Register the streaming http handlers with urllib.request
 register_openers()
@@ -30,6 +34,19 @@ pluginsFolder = os.path.normpath(os.path.join(os.path.dirname(__file__), 'Kaltur
 if not pluginsFolder in sys.path:
     sys.path.append(pluginsFolder)
 
+# readHttpResponse bounds reads with socket timeouts and starts no timer
+# threads any more; count the timer threads alive in the process, so that
+# anything bringing them back shows up in /service/stats/. Should stay at 0.
+TimerThread = getattr(threading, '_Timer', threading.Timer)
+
+def readTimerStats():
+    pending = len([thread for thread in threading.enumerate() if isinstance(thread, TimerThread)])
+    return {'pending': pending}
+
+# enum and object factories are process wide, register plugin types once
+pluginObjectsLoaded = False
+pluginObjectsLock = threading.Lock()
+
 class MultiRequestSubResult:
     def __init__(self, value):
         self.value = value
@@ -44,18 +61,131 @@ class MultiRequestSubResult:
     def __getitem__(self, key):
         return MultiRequestSubResult('%s:%s' % (self.value, key))
 
+# Items of a list response, decoded one at a time while the response is read;
+# totalCount is set once all of them have been read. Json responses are
+# decoded whole and only their objects are created one at a time. With
+# propertyNames, items come as dicts of those properties (see
+# KalturaObjectFactory.project) instead of objects.
+class KalturaListIterator:
+    def __init__(self, client, f, url, format = KALTURA_SERVICE_FORMAT_XML, propertyNames = None):
+        self.client = client
+        self.f = f
+        self.url = url
+        self.propertyNames = propertyNames
+        self.totalCount = None
+        self.itemCount = 0
+        if format == KALTURA_SERVICE_FORMAT_JSON:
+            self.items = self.decodeJsonItems()
+        else:
+            self.items = self.decodeItems()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self.items)
+    next = __next__
+
+    def close(self):
+        self.items.close()
+        self.f.close()
+
+    def decodeItems(self):
+        startTime = time.time()
+        itemChildNames = None
+        if self.propertyNames != None:
+            # projected items only need the objectType and requested nodes
+            itemChildNames = ['objectType'] + list(self.propertyNames)
+        decoder = createXmlDecoder('xml/result/objects/item', itemChildNames)
+        try:
+            for itemNode in decoder.iterItems(self.f):
+                self.itemCount += 1
+                if self.propertyNames == None:
+                    yield KalturaObjectFactory.create(itemNode, KalturaObjectBase)
+                else:
+                    yield KalturaObjectFactory.project(itemNode, self.propertyNames)
+        except (KalturaClientException, KalturaException):
+            raise
+        except XML_PARSE_ERRORS as e:
+            raise KalturaClientException(e, KalturaClientException.ERROR_INVALID_XML)
+        except socket.timeout as e:
+            raise KalturaClientException(e, KalturaClientException.ERROR_READ_TIMEOUT)
+        except Exception as e:
+            raise KalturaClientException(e, KalturaClientException.ERROR_READ_FAILED)
+        finally:
+            self.f.close()
+
+        resultNode = getChildNodeByXPath(decoder.document, 'xml/result')
+        if resultNode == None:
+            raise KalturaClientException('Could not find result node in response xml', KalturaClientException.ERROR_RESULT_NOT_FOUND)
+        self.client.throwExceptionIfError(resultNode)
+        totalCountNode = getChildNodeByXPath(resultNode, 'totalCount')
+        if totalCountNode != None:
+            self.totalCount = getXmlNodeInt(totalCountNode)
+        self.client.log("streamed %s items in [%s]: [%s]" % (self.itemCount, self.url, time.time() - startTime))
+
+    def decodeJsonItems(self):
+        startTime = time.time()
+        try:
+            postResult = self.client.readHttpResponse(self.f)
+        finally:
+            self.f.close()
+        response = self.client.parseJsonPostResult(postResult).value
+        if not isinstance(response, dict):
+            raise KalturaClientException('Could not find list response in response json', KalturaClientException.ERROR_RESULT_NOT_FOUND)
+        self.totalCount = getJsonInt(response.get('totalCount'))
+        objects = response.get('objects') or []
+        # drop the decoded values as their objects are handed out
+        response.clear()
+        objects.reverse()
+        while len(objects) > 0:
+            self.itemCount += 1
+            if self.propertyNames == None:
+                yield KalturaObjectFactory.createFromJson(objects.pop(), KalturaObjectBase)
+            else:
+                yield KalturaObjectFactory.projectFromJson(objects.pop(), self.propertyNames)
+        self.client.log("decoded %s items in [%s]: [%s]" % (self.itemCount, self.url, time.time() - startTime))
+
 class PluginServicesProxy:
+    def __init__(self, client=None, pluginModule=None, services=None):
+        self.client = client
+        self.pluginModule = pluginModule
+        self.services = services or {}
+
     def addService(self, serviceName, serviceClass):
         setattr(self, serviceName, serviceClass)
 
-class KalturaClient:
+    def __getattr__(self, name):
+        # only called for services that were not created yet
+        services = self.__dict__.get('services') or {}
+        if not name in services:
+            raise AttributeError(name)
+        serviceFactory = getattr(__import__(self.pluginModule), services[name])
+        service = serviceFactory(self.client)
+        self.addService(name, service)
+        return service
+
+# The calls a thread is queueing on a client, whether they make up a
+# multirequest, and the result node the thread's actions are decoding. A
+# client keeps one per thread, so threads sharing a client (e.g. in
+# gunicorn's gthread workers) each build and send their own requests.
+class KalturaCallState(threading.local):
+    def __init__(self):
+        self.callsQueue = []
+        self.multiRequest = False
+        self.resultNode = None
+
+class KalturaClient(object):
+    # keep-alive connections, shared by every client in the process
+    connectionPool = KalturaConnectionPool()
+
     def __init__(self, config):
         self.apiVersion = API_VERSION
         self.config = None
         self.ks = NotImplemented
         self.shouldLog = False
-        self.multiRequest = False
-        self.callsQueue = []
+        self.callState = KalturaCallState()
+        self.staticParams = None
 
         self.config = config
         logger = self.config.getLogger()
@@ -64,29 +194,47 @@ class KalturaClient:
 
         self.loadPlugins()            
 
-    def loadPlugins(self):            
-        if not os.path.isdir(pluginsFolder):
+    def loadPlugins(self):
+        global pluginObjectsLoaded
+        if pluginObjectsLoaded:
             return
 
-        pluginList = ['KalturaCoreClient']
-        for fileName in os.listdir(pluginsFolder):
-            (pluginClass, fileExt) = os.path.splitext(fileName)
-            if fileExt.lower() != '.py':
-                continue
-            pluginList.append(pluginClass)
-
-        for pluginClass in pluginList:
-            self.loadPlugin(pluginClass)
-
-    def loadPlugin(self, pluginClass):
+        with pluginObjectsLock:
+            if pluginObjectsLoaded:
+                return
+            core = self.getPlugin('KalturaCoreClient')
+            if not os.path.isdir(pluginsFolder):
+                self.registerPluginObjects(core)
+            else:
+                # plugin modules are imported when one of their types is first
+                # seen; their types shadow core types of the same name
+                pluginTypes = KalturaPluginManifest.PLUGIN_TYPES
+                pluginEnums = KalturaPluginManifest.PLUGIN_ENUMS
+                KalturaEnumsFactory.registerEnums(dict(
+                    (name, enum) for (name, enum) in core.getEnums().items()
+                    if not name in pluginEnums))
+                KalturaObjectFactory.registerObjects(dict(
+                    (name, factory) for (name, factory) in core.getTypes().items()
+                    if not name in pluginTypes))
+                KalturaEnumsFactory.registerLazyEnums(pluginEnums)
+                KalturaObjectFactory.registerLazyObjects(pluginTypes)
+            pluginObjectsLoaded = True
+
+    def getPlugin(self, pluginClass):
         pluginModule = __import__(pluginClass)
         if not pluginClass in dir(pluginModule):
-            return
-        
+            return None
+
         pluginClassType = getattr(pluginModule, pluginClass)
 
         plugin = pluginClassType.get(self)
         if not isinstance(plugin, IKalturaClientPlugin):
+            return None
+        return plugin
+
+    def loadPlugin(self, pluginClass):
+        plugin = self.getPlugin(pluginClass)
+        if plugin == None:
             return
 
         self.registerPluginServices(plugin)
@@ -112,34 +260,88 @@ class KalturaClient:
     def addCoreService(self, serviceName, serviceClass):
         setattr(self, serviceName, serviceClass)
 
+    def getCallState(self):
+        return self.callState
+
+    # The queued calls and multirequest flag of the calling thread
+    def getCallsQueue(self):
+        return self.callState.callsQueue
+
+    def setCallsQueue(self, callsQueue):
+        self.callState.callsQueue = callsQueue
+
+    callsQueue = property(getCallsQueue, setCallsQueue)
+
+    def getMultiRequestFlag(self):
+        return self.callState.multiRequest
+
+    def setMultiRequestFlag(self, multiRequest):
+        self.callState.multiRequest = multiRequest
+
+    multiRequest = property(getMultiRequestFlag, setMultiRequestFlag)
+
+    def __getattr__(self, name):
+        # services are created on first access, from the plugin manifest;
+        # plugin names shadow core services of the same name
+        if name.startswith('__'):
+            raise AttributeError(name)
+        if name in KalturaPluginManifest.PLUGIN_SERVICES and \
+                os.path.isdir(pluginsFolder):
+            (pluginModule, services) = KalturaPluginManifest.PLUGIN_SERVICES[name]
+            service = PluginServicesProxy(self, pluginModule, services)
+        elif name in KalturaPluginManifest.CORE_SERVICES:
+            serviceFactory = globals()[KalturaPluginManifest.CORE_SERVICES[name]]
+            service = serviceFactory(self)
+        else:
+            raise AttributeError(name)
+        setattr(self, name, service)
+        return service
+
     def getServeUrl(self):
         if len(self.callsQueue) != 1:
             return None
 
+        # the url of the one call, also when a batcher queues it as in a
+        # multirequest
+        self.multiRequest = False
         (url, params, _) = self.getRequestParams()
 
         # reset state
         self.callsQueue = []
-        self.multiRequest = False
 
-        result = '%s&%s' % (url, urlencode(params.get()))
+        result = '%s&%s' % (url, params.encode().decode('ascii'))
         self.log("Returned url [%s]" % result)
         return result        
         
-    def queueServiceActionCall(self, service, action, params = KalturaParams(), files = KalturaFiles()):
+    def queueServiceActionCall(self, service, action, params = None, files = None):
+        if params == None:
+            params = KalturaParams()
+        if files == None:
+            files = KalturaFiles()
         # in start session partner id is optional (default -1). if partner id was not set, use the one in the config
-        if not "partnerId" in params.get() or params.get()["partnerId"] == -1:
-            params.put("partnerId", self.config.partnerId)
+        if params.getValue("partnerId") in (None, "-1"):
+            params.update(self.getStaticParams()[2])
         params.addStringIfDefined("ks", self.ks)
         call = KalturaServiceActionCall(service, action, params, files)
         self.callsQueue.append(call)
 
+    # (params sent with every request, partnerId param), encoded once for
+    # the current configuration
+    def getStaticParams(self):
+        staticKey = (self.apiVersion, self.config.format, self.config.clientTag, self.config.partnerId)
+        if self.staticParams == None or self.staticParams[0] != staticKey:
+            requestParams = KalturaParams()
+            requestParams.put("apiVersion", self.apiVersion)
+            requestParams.put("format", self.config.format)
+            requestParams.put("clientTag", self.config.clientTag)
+            partnerParams = KalturaParams()
+            partnerParams.put("partnerId", self.config.partnerId)
+            self.staticParams = (staticKey, requestParams, partnerParams)
+        return self.staticParams
+
     def getRequestParams(self):
-        params = KalturaParams()
+        params = self.getStaticParams()[1].copy()
         files = KalturaFiles()
-        params.put("apiVersion", self.apiVersion)
-        params.put("format", self.config.format)
-        params.put("clientTag", self.config.clientTag)
         url = self.config.serviceUrl + "/api_v3/index.php?service="
         if self.multiRequest:
             url += "multirequest"
@@ -155,8 +357,7 @@ class KalturaClient:
             params.update(call.params)
             files.update(call.files)
 
-        signature = params.signature()
-        params.put("kalsig", signature)
+        params.sign()
 
         self.log("request url: [%s]" % url)
 
@@ -167,74 +368,131 @@ class KalturaClient:
         fh.close()
 
     @staticmethod
-    def openRequestUrl(url, params, files):
+    def encodeParams(params):
+        return params.encode()
+
+    @staticmethod
+    def encodeMultipart(params, files):
+        return multipart_encode(list(params.get().items()) + list(files.get().items()))
+
+    @staticmethod
+    def openRequestUrl(url, params, files, requestTimeout = None):
+        # the timeout applies to the sockets of this request only
+        timeoutArgs = {}
+        if requestTimeout != None:
+            timeoutArgs['timeout'] = requestTimeout
         if len(files.get()) == 0:
             try:
-                paramsdict = params.get()
-                sanitized_params = {}
-                for k, v in paramsdict.items():
-                    if hasattr(k, 'encode'):
-                        key = k.encode('utf-8')
-                    elif hasattr(k, 'decode'):
-                        key = k.decode('utf-8').encode('utf-8')
-                    else:
-                        key = str(k).encode('utf-8')
-                    if hasattr(v, 'encode'):
-                        val = v.encode('utf-8')
-                    elif hasattr(k, 'decode'):
-                        val = v.decode('utf-8').encode('utf-8')
-                    else:
-                        val = str(v).encode('utf-8')
-                    sanitized_params[key] = val
-                f = urllib.urlopen(url, urlencode(sanitized_params))
+                f = urllib2.urlopen(url, KalturaClient.encodeParams(params), **timeoutArgs)
             #except Exception, e:
             except Exception as e:
                 raise KalturaClientException(e, KalturaClientException.ERROR_CONNECTION_FAILED)
         else:
-            fullParams = params
-            fullParams.update(files)
-            datagen, headers = multipart_encode(fullParams.get())
+            datagen, headers = KalturaClient.encodeMultipart(params, files)
             request = urllib2.Request(url, datagen, headers)
             try:
-                f = urllib2.urlopen(request)
+                f = urllib2.urlopen(request, **timeoutArgs)
             except Exception as e:
                 raise KalturaClientException(e, KalturaClientException.ERROR_CONNECTION_FAILED)
         return f
 
+    # Requests go through the keep-alive pool unless disabled in the config or
+    # a proxy is configured for the url, which only urllib knows how to use
+    def usePooledConnection(self, url):
+        if not getattr(self.config, 'keepAlive', True):
+            return False
+        (scheme, _, rest) = url.partition('://')
+        if not scheme in ('http', 'https'):
+            return False
+        if scheme in urllib2.getproxies():
+            host = rest.split('/', 1)[0]
+            return bool(urllib2.proxy_bypass(host))
+        return True
+
+    def openPooledRequestUrl(self, url, params, files, requestTimeout, connectTimeout = None):
+        if len(files.get()) == 0:
+            body = self.encodeParams(params)
+            headers = {'Content-Type': 'application/x-www-form-urlencoded',
+                       'Content-Length': str(len(body))}
+            body = [body]
+        else:
+            body, headers = self.encodeMultipart(params, files)
+        try:
+            f = self.connectionPool.request(url, body, headers, requestTimeout, connectTimeout)
+        except Exception as e:
+            raise KalturaClientException(e, KalturaClientException.ERROR_CONNECTION_FAILED)
+        if f.status >= 300:
+            # like urllib, which raises HTTPError for these
+            self.readHttpResponse(f, None)
+            raise KalturaClientException('HTTP Error %s: %s' % (f.status, f.reason), KalturaClientException.ERROR_CONNECTION_FAILED)
+        return f
+
+    # The socket a response is read from: the pooled connection's, or the
+    # one under a urllib response (fp.raw._sock on python 3, fp._sock on 2)
     @staticmethod
-    def readHttpResponse(f, requestTimeout):
+    def getResponseSocket(f):
+        if isinstance(f, KalturaPooledResponse):
+            return f.connection.sock
+        fp = getattr(f, 'fp', None)
+        return getattr(getattr(fp, 'raw', fp), '_sock', None)
+
+    # A timeout given here bounds every read on the response's socket, as the
+    # client's own requests are bounded, rather than closing the response
+    # from a timer thread, which blocks gevent workers
+    @staticmethod
+    def readHttpResponse(f, requestTimeout = None):
         if requestTimeout != None:
-            readTimer = Timer(requestTimeout, KalturaClient.closeHandle, [f])
-            readTimer.start()
+            sock = KalturaClient.getResponseSocket(f)
+            if sock != None:
+                sock.settimeout(requestTimeout)
         try:
-            try:
-                data = f.read()
-            except AttributeError as e:
-                raise KalturaClientException(e, KalturaClientException.ERROR_READ_TIMEOUT)
-            except Exception as e:
-                raise KalturaClientException(e, KalturaClientException.ERROR_READ_FAILED)
-        finally:
-            if requestTimeout != None:
-                readTimer.cancel()
+            data = f.read()
+        except (AttributeError, socket.timeout) as e:
+            raise KalturaClientException(e, KalturaClientException.ERROR_READ_TIMEOUT)
+        except Exception as e:
+            raise KalturaClientException(e, KalturaClientException.ERROR_READ_FAILED)
         return data
 
+    # Read timeout for a batch of calls: the config's timeout policy for the
+    # service.action or service, else uploadTimeout for calls sending files
+    # and requestTimeout for the rest. None means no timeout.
+    def getRequestTimeout(self, calls):
+        policies = getattr(self.config, 'timeoutPolicies', {})
+        requestTimeout = None
+        for call in calls:
+            if len(call.files.get()) == 0:
+                callTimeout = self.config.requestTimeout
+            else:
+                callTimeout = getattr(self.config, 'uploadTimeout', None)
+            service = call.service.lower()
+            callTimeout = policies.get(service, callTimeout)
+            callTimeout = policies.get('%s.%s' % (service, call.action.lower()), callTimeout)
+            if callTimeout == None:
+                return None
+            if requestTimeout == None or callTimeout > requestTimeout:
+                requestTimeout = callTimeout
+        return requestTimeout
+
     # Send http request
-    def doHttpRequest(self, url, params = KalturaParams(), files = KalturaFiles()):
-        if len(files.get()) == 0:
-            requestTimeout = self.config.requestTimeout
-        else:
-            requestTimeout = None
-            
-        if requestTimeout != None:
-            origSocketTimeout = socket.getdefaulttimeout()
-            socket.setdefaulttimeout(requestTimeout)
-        try:
-            f = self.openRequestUrl(url, params, files)
-            data = self.readHttpResponse(f, requestTimeout)
-        finally:
-            if requestTimeout != None:
-                socket.setdefaulttimeout(origSocketTimeout)
-        return data
+    def doHttpRequest(self, url, params = None, files = None, requestTimeout = NotImplemented):
+        if params == None:
+            params = KalturaParams()
+        if files == None:
+            files = KalturaFiles()
+        if requestTimeout is NotImplemented:
+            if len(files.get()) == 0:
+                requestTimeout = self.config.requestTimeout
+            else:
+                requestTimeout = getattr(self.config, 'uploadTimeout', None)
+
+        f = self.openHttpRequest(url, params, files, requestTimeout)
+        return self.readHttpResponse(f)
+
+    def openHttpRequest(self, url, params, files, requestTimeout):
+        connectTimeout = getattr(self.config, 'connectTimeout', requestTimeout)
+        if self.usePooledConnection(url):
+            return self.openPooledRequestUrl(url, params, files, requestTimeout, connectTimeout)
+        return self.openRequestUrl(url, params, files, requestTimeout)
         
     def parsePostResult(self, postResult):
         if len(postResult) > 1024:
@@ -243,8 +501,8 @@ class KalturaClient:
             self.log("result (xml): %s" % postResult)
 
         try:        
-            resultXml = minidom.parseString(postResult)
-        except ExpatError as e:
+            resultXml = parseString(postResult)
+        except XML_PARSE_ERRORS as e:
             raise KalturaClientException(e, KalturaClientException.ERROR_INVALID_XML)
             
         resultNode = getChildNodeByXPath(resultXml, 'xml/result')
@@ -254,36 +512,162 @@ class KalturaClient:
         self.throwExceptionIfError(resultNode)
 
         return resultNode        
+
+    def parseJsonPostResult(self, postResult):
+        if len(postResult) > 1024:
+            self.log("result (json): %s bytes" % len(postResult))
+        else:
+            self.log("result (json): %s" % postResult)
+
+        try:
+            resultNode = parseJson(postResult)
+        except ValueError as e:
+            raise KalturaClientException(e, KalturaClientException.ERROR_INVALID_JSON)
+
+        self.throwExceptionIfError(resultNode)
+
+        return resultNode
         
     # Call all API services that are in queue
     def doQueue(self):
+        if self.callState.resultNode != None:
+            # decoding a result already received, see decodeActionResult
+            resultNode = self.callState.resultNode
+            self.callState.resultNode = None
+            self.callsQueue = []
+            self.multiRequest = False
+            return resultNode
+
         if len(self.callsQueue) == 0:
             self.multiRequest = False
             return None
 
-        if self.config.format != KALTURA_SERVICE_FORMAT_XML:
-            raise KalturaClientException("unsupported format: %s" % (postResult), KalturaClientException.ERROR_FORMAT_NOT_SUPPORTED)
+        if not self.config.format in (KALTURA_SERVICE_FORMAT_XML, KALTURA_SERVICE_FORMAT_JSON):
+            raise KalturaClientException("unsupported format: %s" % self.config.format, KalturaClientException.ERROR_FORMAT_NOT_SUPPORTED)
             
         startTime = time.time()
 
         # get request params
         (url, params, files) = self.getRequestParams()        
+        requestTimeout = self.getRequestTimeout(self.callsQueue)
             
         # reset state
         self.callsQueue = []
         self.multiRequest = False
 
         # issue the request        
-        postResult = self.doHttpRequest(url, params, files)
+        postResult = self.doHttpRequest(url, params, files, requestTimeout)
 
         # parse the result            
-        resultNode = self.parsePostResult(postResult)
+        if self.config.format == KALTURA_SERVICE_FORMAT_JSON:
+            resultNode = self.parseJsonPostResult(postResult)
+        else:
+            resultNode = self.parsePostResult(postResult)
 
         endTime = time.time()
         self.log("execution time for [%s]: [%s]" % (url, endTime - startTime))
 
         return resultNode
 
+    # Runs an action again on the result node of its call, received in a
+    # multirequest, for the generated code to decode it (see
+    # KalturaCallBatcher)
+    def decodeActionResult(self, resultNode, action, args, kwargs):
+        state = self.getCallState()
+        state.resultNode = resultNode
+        try:
+            return action(*args, **kwargs)
+        finally:
+            state.resultNode = None
+            state.callsQueue = []
+            state.multiRequest = False
+
+    # Sends the call an action makes on its own, whatever the queue, and
+    # returns (url, response)
+    def openActionRequest(self, caller, action, args, kwargs):
+        if self.multiRequest:
+            raise KalturaClientException("%s can't be used in a multirequest" % caller, KalturaClientException.ERROR_GENERIC)
+        if not self.config.format in (KALTURA_SERVICE_FORMAT_XML, KALTURA_SERVICE_FORMAT_JSON):
+            raise KalturaClientException("unsupported format: %s" % self.config.format, KalturaClientException.ERROR_FORMAT_NOT_SUPPORTED)
+
+        # queue the call without sending it, as in a multirequest
+        self.multiRequest = True
+        try:
+            action(*args, **kwargs)
+        except:
+            self.callsQueue = []
+            raise
+        finally:
+            self.multiRequest = False
+
+        (url, params, files) = self.getRequestParams()
+        requestTimeout = self.getRequestTimeout(self.callsQueue)
+        self.callsQueue = []
+        return (url, self.openHttpRequest(url, params, files, requestTimeout))
+
+    # Sends a list call and returns a KalturaListIterator over its items, so
+    # they are decoded (and can be dropped) one at a time instead of holding
+    # the whole response:
+    #     for entry in client.iterateList(client.media.list, filter, pager):
+    def iterateList(self, listAction, *args, **kwargs):
+        (url, f) = self.openActionRequest('iterateList', listAction, args, kwargs)
+        return KalturaListIterator(self, f, url, self.config.format)
+
+    # Like iterateList, but the items come as dicts of the named properties,
+    # loaded without creating objects (enums come as their values):
+    #     for entry in client.projectList(['id', 'name'], client.media.list, filter):
+    def projectList(self, propertyNames, listAction, *args, **kwargs):
+        (url, f) = self.openActionRequest('projectList', listAction, args, kwargs)
+        return KalturaListIterator(self, f, url, self.config.format, propertyNames)
+
+    # Sends a call returning an object and returns a dict of the named
+    # properties of that object instead (see KalturaObjectFactory.project):
+    #     client.projectObject(['name', 'status'], client.media.get, entryId)
+    def projectObject(self, propertyNames, action, *args, **kwargs):
+        startTime = time.time()
+        (url, f) = self.openActionRequest('projectObject', action, args, kwargs)
+        postResult = self.readHttpResponse(f)
+        if self.config.format == KALTURA_SERVICE_FORMAT_JSON:
+            resultNode = self.parseJsonPostResult(postResult)
+        else:
+            resultNode = self.parsePostResult(postResult)
+        self.log("execution time for [%s]: [%s]" % (url, time.time() - startTime))
+        return KalturaObjectFactory.project(resultNode, propertyNames)
+
+    @staticmethod
+    def generateSession(adminSecretForSigning, userId, type, partnerId, expiry = 86400, privileges = ''):
+        """Build a KS locally, signed with the partner's admin secret, in the
+        same (v1) layout session.start returns - no round trip needed."""
+        rand = random.randint(0, 0x7fffffff)
+        expiry = int(time.time()) + int(expiry)
+        fields = [partnerId, partnerId, expiry, type, rand, userId, privileges, '', '']
+        info = ';'.join([str(field) for field in fields])
+        signature = hashlib.sha1((adminSecretForSigning + info).encode('utf-8')).hexdigest()
+        decodedKS = signature + '|' + info
+        return base64.b64encode(decodedKS.encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def decodeSession(ks):
+        """Split a v1 KS into (signature, fields); returns None for other KS versions."""
+        try:
+            decodedKS = base64.b64decode(ks).decode('utf-8')
+        except Exception:
+            return None
+        if not '|' in decodedKS or decodedKS.startswith('v2|'):
+            return None
+        (signature, info) = decodedKS.split('|', 1)
+        return (signature, info.split(';'))
+
+    @staticmethod
+    def verifySession(ks, adminSecretForSigning):
+        """Check a v1 KS was signed with the given admin secret."""
+        decoded = KalturaClient.decodeSession(ks)
+        if decoded == None:
+            return False
+        (signature, fields) = decoded
+        info = ';'.join(fields)
+        return hashlib.sha1((adminSecretForSigning + info).encode('utf-8')).hexdigest() == signature
+
     def getKs(self):
         return self.ks
         
@@ -300,6 +684,11 @@ class KalturaClient:
             self.shouldLog = True
         
     def getExceptionIfError(self, resultNode):
+        if isinstance(resultNode, KalturaJsonNode):
+            error = getJsonError(resultNode.value)
+            if error == None:
+                return None
+            return KalturaException(*error)
         errorNode = getChildNodeByXPath(resultNode, 'error')
         if errorNode == None:
             return None
@@ -345,9 +734,13 @@ class KalturaClient:
             self.config.getLogger().log(msg)
 
 class KalturaServiceActionCall:
-    def __init__(self, service, action, params = KalturaParams(), files = KalturaFiles()):
+    def __init__(self, service, action, params = None, files = None):
         self.service = service
         self.action = action
+        if params == None:
+            params = KalturaParams()
+        if files == None:
+            files = KalturaFiles()
         self.params = params
         self.files = files
         
@@ -356,6 +749,5 @@ class KalturaServiceActionCall:
         multiRequestParams = KalturaParams()
         multiRequestParams.put("%s:service" % multiRequestIndex, self.service)
         multiRequestParams.put("%s:action" % multiRequestIndex, self.action)
-        for (key, val) in self.params.get().items():
-            multiRequestParams.put("%s:%s" % (multiRequestIndex, key), val)
+        multiRequestParams.addParams(str(multiRequestIndex), self.params)
         return multiRequestParams
@@ -1,6 +1,9 @@
 import sys
+import inspect
 import hashlib
-from utils import rangegen, maybe_cast_to_unicode
+from utils import rangegen, text_type, quote_plus
+from KalturaJsonDecoder import KalturaJsonNode, getJsonText, getJsonBool, \
+    getJsonInt, getJsonFloat
 
 # Service response formats
 KALTURA_SERVICE_FORMAT_JSON = 1
@@ -41,6 +44,13 @@ def getXmlNodeFloat(xmlNode):
 
 def getChildNodeByXPath(node, nodePath):
     for curName in nodePath.split('/'):
+        # Kaltura xml and json nodes look their children up by name
+        getChild = getattr(node, 'getChild', None)
+        if getChild != None:
+            node = getChild(curName)
+            if node == None:
+                return None
+            continue
         nextChild = None
         for childNode in node.childNodes:
             if childNode.nodeName == curName:
@@ -52,33 +62,61 @@ def getChildNodeByXPath(node, nodePath):
     return node
 
 # Request parameters container
+#
+# Keys and values are kept utf-8 encoded, as they are sent: each value is
+# encoded once when put, and sign() builds the urlencoded body and the md5
+# signature (kalsig) together, in one pass over the sorted params.
 class KalturaParams:
     def __init__(self):
         self.params = {}
+        self.encoded = None
 
+    # The params as text, e.g. for multipart_encode
     def get(self):
-        return self.params
+        return dict((key.decode('utf-8'), value.decode('utf-8'))
+                    for (key, value) in self.params.items())
+
+    # The text value of key, or None if it isn't set
+    def getValue(self, key):
+        value = self.params.get(encodeParam(key))
+        if value == None:
+            return None
+        return value.decode('utf-8')
 
     def put(self, key, value = None):
+        self.encoded = None
         if value == None:
-            self.params[key + '__null'] = ''
+            self.params[encodeParam(key + '__null')] = b''
         else:
-            self.params[key] = maybe_cast_to_unicode(value)
+            self.params[encodeParam(key)] = encodeParam(value)
 
     def update(self, props):
-        self.params.update(props.get())
+        self.encoded = None
+        self.params.update(props.params)
+
+    def copy(self):
+        params = KalturaParams()
+        params.params = self.params.copy()
+        return params
 
     def add(self, key, objectProps):
         for (curKey, curValue) in objectProps.items():
             self.put('%s:%s' % (key, curKey), curValue)
 
+    # Adds the (already encoded) params of props under key
+    def addParams(self, key, props):
+        self.encoded = None
+        prefix = encodeParam(key) + b':'
+        for (curKey, curValue) in props.params.items():
+            self.params[prefix + curKey] = curValue
+
     def addObjectIfDefined(self, key, obj):
         if obj == NotImplemented:
             return
         if obj == None:
             self.put(key)
             return
-        self.add(key, obj.toParams().get())
+        self.addParams(key, obj.toParams())
 
     def addArrayIfDefined(self, key, array):
         if array == NotImplemented:
@@ -137,23 +175,66 @@ class KalturaParams:
         else:
             self.put(key, '0')
 
+    # The md5 of the sorted keys and values, as kalsig
     def signature(self):
-        params = list(self.params.items())
-        params.sort()
-        str = ""
-        for (k, v) in params:
-            str += '%s%s' % (k, v)
-        return self.md5(str.encode('utf-8'))
-
-    @staticmethod
-    def md5(str):
-        m = hashlib.md5()
-        m.update(str)
-        if sys.version_info[0] > 2:  # probably only > (3, 3)?
-            import codecs
-            return codecs.encode(m.digest(), 'hex_codec')
-        else:
-            return m.digest().encode('hex')
+        return self.encodeSigned()[1]
+
+    # Signs the params: puts kalsig and keeps the urlencoded body for encode()
+    def sign(self):
+        (self.encoded, signature) = self.encodeSigned()
+        self.params[b'kalsig'] = signature.encode('ascii')
+        return signature
+
+    # (urlencoded body including kalsig, signature), in one pass
+    def encodeSigned(self):
+        hasher = hashlib.md5()
+        body = []
+        for (key, value) in sorted(self.params.items()):
+            if key == b'kalsig':
+                continue
+            hasher.update(key)
+            hasher.update(value)
+            body.append(quoteParamKey(key) + '=' + quoteParam(value))
+        signature = hasher.hexdigest()
+        body.append('kalsig=' + signature)
+        return ('&'.join(body).encode('ascii'), signature)
+
+    # The urlencoded body
+    def encode(self):
+        if self.encoded == None:
+            self.encoded = '&'.join([quoteParamKey(key) + '=' + quoteParam(value)
+                                     for (key, value) in self.params.items()]).encode('ascii')
+        return self.encoded
+
+def encodeParam(value):
+    if isinstance(value, bytes):
+        return value
+    if not isinstance(value, text_type):
+        value = text_type(value)
+    return value.encode('utf-8')
+
+# Urlencoding of encoded params, as quote_plus does it: a table lookup per
+# byte, and none for values that need no quoting (ids, numbers...)
+PARAM_SAFE_BYTES = b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_.-~'
+PARAM_QUOTED_BYTES = [quote_plus(chr(byte)) if byte < 128 else '%%%02X' % byte
+                      for byte in rangegen(256)]
+
+def quoteParam(value):
+    if len(value.rstrip(PARAM_SAFE_BYTES)) == 0:
+        return value.decode('ascii')
+    return ''.join(map(PARAM_QUOTED_BYTES.__getitem__, bytearray(value)))
+
+# Param keys repeat from request to request (partnerId, 1:entryId...)
+quotedParamKeys = {}
+MAX_QUOTED_PARAM_KEYS = 10000
+
+def quoteParamKey(key):
+    quoted = quotedParamKeys.get(key)
+    if quoted == None:
+        quoted = quoteParam(key)
+        if len(quotedParamKeys) < MAX_QUOTED_PARAM_KEYS:
+            quotedParamKeys[key] = quoted
+    return quoted
 
 # Request files container
 class KalturaFiles:
@@ -169,8 +250,26 @@ class KalturaFiles:
     def update(self, props):
         self.params.update(props.get())
 
+# Metaclass of the client objects: a class declaring PROPERTY_LOADERS (as all
+# generated ones do) keeps those properties in __slots__ instead of a per
+# instance __dict__. Unset properties hold the shared NotImplemented. Classes
+# without PROPERTY_LOADERS, e.g. subclasses in application code, get a
+# __dict__ as usual.
+class KalturaObjectType(type):
+    def __new__(metacls, name, bases, namespace):
+        if 'PROPERTY_LOADERS' in namespace and not '__slots__' in namespace:
+            inherited = set()
+            for base in bases:
+                for cls in inspect.getmro(base):
+                    inherited.update(cls.__dict__.get('__slots__', ()))
+            namespace['__slots__'] = tuple([name for name in namespace['PROPERTY_LOADERS']
+                                            if not name in inherited])
+        return type.__new__(metacls, name, bases, namespace)
+
 # Abstract base class for all client objects
-class KalturaObjectBase:
+class KalturaObjectBase(KalturaObjectType('KalturaObjectRoot', (object,), {'__slots__': ()})):
+    __slots__ = ()
+
     def __init__(self):
         pass
 
@@ -224,6 +323,7 @@ class KalturaClientException(Exception):
     ERROR_INVALID_OBJECT_TYPE = -7
     ERROR_RESULT_NOT_FOUND = -8
     ERROR_READ_TIMEOUT = -9
+    ERROR_INVALID_JSON = -10
   
     def __init__(self, message, code):
         self.code = code
@@ -242,6 +342,13 @@ class KalturaConfiguration:
         self.format                     = KALTURA_SERVICE_FORMAT_XML
         self.clientTag                  = "python"
         self.requestTimeout             = 10
+        # read timeout for calls sending files; None for no timeout
+        self.uploadTimeout              = 3600
+        self.connectTimeout             = 10
+        # 'service' or 'service.action' (lower case) -> read timeout,
+        # overriding the two above
+        self.timeoutPolicies            = {}
+        self.keepAlive                  = True
         
         if type(partnerId) != int:
             raise KalturaClientException("Invalid partner id", KalturaClientException.ERROR_INVALID_PARTNER_ID)
@@ -275,15 +382,128 @@ class KalturaClientPlugin(IKalturaClientPlugin):
     def __init__(self, client):
         pass
 
+# The objects of a list response, each created from its node (or decoded json
+# value) the first time it is used. Reads like a list; consume() hands each
+# object out once and keeps no reference to it or its node, for a single
+# pass over a large listing.
+class KalturaLazyArray(object):
+    __slots__ = ('nodes', 'elements', 'create', 'expectedElemType')
+
+    NOT_CREATED = object()
+
+    def __init__(self, nodes, create, expectedElemType):
+        self.nodes = nodes
+        self.elements = [KalturaLazyArray.NOT_CREATED] * len(nodes)
+        self.create = create
+        self.expectedElemType = expectedElemType
+
+    def __len__(self):
+        return len(self.elements)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[curIndex] for curIndex in rangegen(*index.indices(len(self.elements)))]
+        element = self.elements[index]
+        if element is KalturaLazyArray.NOT_CREATED:
+            element = self.create(self.nodes[index], self.expectedElemType)
+            self.elements[index] = element
+            self.nodes[index] = None
+        return element
+
+    def __iter__(self):
+        for index in rangegen(len(self.elements)):
+            yield self[index]
+
+    def __eq__(self, other):
+        if isinstance(other, (list, KalturaLazyArray)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def consume(self):
+        (nodes, elements) = (self.nodes, self.elements)
+        self.nodes = []
+        self.elements = []
+        nodes.reverse()
+        elements.reverse()
+        while len(elements) > 0:
+            node = nodes.pop()
+            element = elements.pop()
+            if element is KalturaLazyArray.NOT_CREATED:
+                element = self.create(node, self.expectedElemType)
+            del node
+            yield element
+
+# Imports a client plugin module and registers its enums and types
+def loadPluginObjects(pluginModuleName):
+    pluginModule = __import__(pluginModuleName)
+    plugin = getattr(pluginModule, pluginModuleName).get(None)
+    KalturaEnumsFactory.registerEnums(plugin.getEnums())
+    KalturaObjectFactory.registerObjects(plugin.getTypes())
+
+# The class of the enum objects KalturaEnumsFactory shares: a subclass of the
+# generated enum class whose objects are read only. Like the generated enums
+# they compare and hash by identity, so a shared enum is not equal to an enum
+# of the same value built by application code; compare getValue() for that.
+def createSharedEnumClass(enumClass):
+    class KalturaSharedEnum(enumClass, object):
+        def __init__(self, value):
+            object.__setattr__(self, 'value', value)
+
+        def __setattr__(self, name, value):
+            raise AttributeError("%s objects loaded from responses are shared and read only" % enumClass.__name__)
+
+        def __delattr__(self, name):
+            raise AttributeError("%s objects loaded from responses are shared and read only" % enumClass.__name__)
+
+        # copies and pickles are plain, writable enums
+        def __reduce__(self):
+            return (enumClass, (self.value,))
+
+    KalturaSharedEnum.__name__ = enumClass.__name__
+    KalturaSharedEnum.__module__ = enumClass.__module__
+    return KalturaSharedEnum
+
 # Kaltura enums factory
 class KalturaEnumsFactory:
     enumFactories = {}
+    # enum type -> plugin module, imported the first time the enum is seen
+    lazyEnumModules = {}
+    # (enum type, value) -> the enum object handed out for it, shared between
+    # all the objects holding the same value (see createSharedEnumClass)
+    enumInstances = {}
+    MAX_ENUM_INSTANCES = 10000
+    # enum class -> the class of its shared objects
+    sharedEnumClasses = {}
 
     @staticmethod
     def create(enumValue, enumType):
+        key = (enumType, enumValue)
+        enumObj = KalturaEnumsFactory.enumInstances.get(key)
+        if enumObj is not None:
+            return enumObj
+        if not enumType in KalturaEnumsFactory.enumFactories and \
+                enumType in KalturaEnumsFactory.lazyEnumModules:
+            loadPluginObjects(KalturaEnumsFactory.lazyEnumModules[enumType])
         if not enumType in KalturaEnumsFactory.enumFactories:
             raise KalturaClientException("Unrecognized enum '%s'" % enumType, KalturaClientException.ERROR_INVALID_OBJECT_TYPE)
-        return KalturaEnumsFactory.enumFactories[enumType](enumValue)
+        enumClass = KalturaEnumsFactory.enumFactories[enumType]
+        sharedClass = KalturaEnumsFactory.sharedEnumClasses.get(enumClass)
+        if sharedClass is None:
+            sharedClass = createSharedEnumClass(enumClass)
+            KalturaEnumsFactory.sharedEnumClasses[enumClass] = sharedClass
+        enumObj = sharedClass(enumValue)
+        if len(KalturaEnumsFactory.enumInstances) < KalturaEnumsFactory.MAX_ENUM_INSTANCES:
+            KalturaEnumsFactory.enumInstances[key] = enumObj
+        return enumObj
 
     @staticmethod
     def createInt(enumNode, enumType):
@@ -299,39 +519,320 @@ class KalturaEnumsFactory:
             return None
         return KalturaEnumsFactory.create(enumValue, enumType)
 
+    # The value of the enum the node holds, without creating the enum
+    @staticmethod
+    def createIntValue(enumNode, enumType):
+        return getXmlNodeInt(enumNode)
+
+    @staticmethod
+    def createStringValue(enumNode, enumType):
+        enumValue = getXmlNodeText(enumNode)
+        if enumValue == '':
+            return None
+        return enumValue
+
+    @staticmethod
+    def createIntFromJson(value, enumType):
+        enumValue = getJsonInt(value)
+        if enumValue == None:
+            return None
+        return KalturaEnumsFactory.create(enumValue, enumType)
+
+    @staticmethod
+    def createStringFromJson(value, enumType):
+        enumValue = getJsonText(value)
+        if enumValue == '':
+            return None
+        return KalturaEnumsFactory.create(enumValue, enumType)
+
+    @staticmethod
+    def createIntValueFromJson(value, enumType):
+        return getJsonInt(value)
+
+    @staticmethod
+    def createStringValueFromJson(value, enumType):
+        enumValue = getJsonText(value)
+        if enumValue == '':
+            return None
+        return enumValue
+
     @staticmethod
     def registerEnums(objs):
-        KalturaEnumsFactory.enumFactories.update(objs)
+        enumFactories = KalturaEnumsFactory.enumFactories
+        # a plugin may replace the class of an enum: only the objects of the
+        # enums it replaces go, not those of every enum at each plugin load
+        replaced = set(enumType for (enumType, enumClass) in objs.items()
+                       if enumFactories.get(enumType, enumClass) is not enumClass)
+        enumFactories.update(objs)
+        if len(replaced) > 0:
+            enumInstances = KalturaEnumsFactory.enumInstances
+            for key in [key for key in enumInstances if key[0] in replaced]:
+                del enumInstances[key]
+
+    @staticmethod
+    def registerLazyEnums(enumModules):
+        KalturaEnumsFactory.lazyEnumModules.update(enumModules)
 
 # Kaltura objects factory
 class KalturaObjectFactory:
     objectFactories = {}
+    # object type -> plugin module, imported the first time the type is seen
+    lazyObjectModules = {}
+    # object class -> {property name: (loader, param)}, the PROPERTY_LOADERS
+    # of the class and all its bases, with the objects of list responses
+    # loaded by createLazyArray; param is None for one argument loaders
+    propertyLoaders = {}
+    # object class -> function(object, node) loading its properties from xml
+    xmlDeserializers = {}
+    # object class -> {property name: (json loader, param)}
+    jsonLoaders = {}
+    # object class -> {property name: (loader, param)} loading enums as their
+    # values, for project; and their json counterparts
+    projectionLoaders = {}
+    jsonProjectionLoaders = {}
+
+    @staticmethod
+    def getObjectFactory(objType):
+        if not objType in KalturaObjectFactory.objectFactories and \
+                objType in KalturaObjectFactory.lazyObjectModules:
+            loadPluginObjects(KalturaObjectFactory.lazyObjectModules[objType])
+        if not objType in KalturaObjectFactory.objectFactories:
+            raise KalturaClientException("Unrecognized object '%s'" % objType, KalturaClientException.ERROR_INVALID_OBJECT_TYPE)
+        return KalturaObjectFactory.objectFactories[objType]
 
     @staticmethod
     def create(objectNode, expectedType):
+        if isinstance(objectNode, KalturaJsonNode):
+            return KalturaObjectFactory.createFromJson(objectNode.value, expectedType)
         objTypeNode = getChildNodeByXPath(objectNode, 'objectType')
         if objTypeNode == None:
             return None
         objType = getXmlNodeText(objTypeNode)
-        if not objType in KalturaObjectFactory.objectFactories:
-            raise KalturaClientException("Unrecognized object '%s'" % objType, KalturaClientException.ERROR_INVALID_OBJECT_TYPE)
-        result = KalturaObjectFactory.objectFactories[objType]()
+        result = KalturaObjectFactory.getObjectFactory(objType)()
         if not isinstance(result, expectedType):
             raise KalturaClientException("Unexpected object type '%s'" % objType, KalturaClientException.ERROR_INVALID_OBJECT_TYPE)
-        result.fromXml(objectNode)
+        deserializer = KalturaObjectFactory.xmlDeserializers.get(result.__class__)
+        if deserializer == None:
+            deserializer = KalturaObjectFactory.getXmlDeserializer(result.__class__)
+        deserializer(result, objectNode)
         return result
 
     @staticmethod
     def createArray(arrayNode, expectedElemType):
-        results = []
-        for arrayElemNode in arrayNode.childNodes:
-            results.append(KalturaObjectFactory.create(arrayElemNode, expectedElemType))
-        return results
+        if isinstance(arrayNode, KalturaJsonNode):
+            return KalturaObjectFactory.createArrayFromJson(arrayNode.value, expectedElemType)
+        create = KalturaObjectFactory.create
+        return [create(arrayElemNode, expectedElemType) for arrayElemNode in arrayNode.childNodes]
+
+    # The objects of list responses are only created when used
+    @staticmethod
+    def createLazyArray(arrayNode, expectedElemType):
+        if isinstance(arrayNode, KalturaJsonNode):
+            return KalturaObjectFactory.createLazyArrayFromJson(arrayNode.value, expectedElemType)
+        return KalturaLazyArray(list(arrayNode.childNodes), KalturaObjectFactory.create, expectedElemType)
+
+    @staticmethod
+    def createLazyArrayFromJson(value, expectedElemType):
+        if isinstance(value, dict):
+            value = list(value.values())
+        elif not isinstance(value, list):
+            value = []
+        return KalturaLazyArray(value, KalturaObjectFactory.createFromJson, expectedElemType)
+
+    @staticmethod
+    def getPropertyLoaders(objectClass):
+        loaders = KalturaObjectFactory.propertyLoaders.get(objectClass)
+        if loaders != None:
+            return loaders
+        loaders = {}
+        # base classes first: fromXml loads a subclass's properties last
+        for cls in reversed(inspect.getmro(objectClass)):
+            for (name, propLoader) in cls.__dict__.get('PROPERTY_LOADERS', {}).items():
+                if type(propLoader) != tuple:
+                    propLoader = (propLoader, None)
+                if name == 'objects' and propLoader[0] == KalturaObjectFactory.createArray and \
+                        objectClass.__name__.endswith('ListResponse'):
+                    propLoader = (KalturaObjectFactory.createLazyArray, propLoader[1])
+                loaders[name] = propLoader
+        KalturaObjectFactory.propertyLoaders[objectClass] = loaders
+        return loaders
+
+    # Generated classes load their properties in fromXml by running
+    # fromXmlImpl with their own PROPERTY_LOADERS and then their base's
+    # fromXml, walking the children once per class in the chain. The
+    # deserializer does the same in one walk over the children with the
+    # merged loaders. Classes with a fromXml of their own (one that doesn't
+    # come with PROPERTY_LOADERS) keep using it.
+    @staticmethod
+    def getXmlDeserializer(objectClass):
+        deserializer = None
+        for cls in inspect.getmro(objectClass):
+            if cls is KalturaObjectBase:
+                break
+            if 'fromXml' in cls.__dict__ and not 'PROPERTY_LOADERS' in cls.__dict__:
+                deserializer = objectClass.fromXml
+                break
+        if deserializer == None:
+            deserializer = compileXmlDeserializer(KalturaObjectFactory.getPropertyLoaders(objectClass))
+        KalturaObjectFactory.xmlDeserializers[objectClass] = deserializer
+        return deserializer
+
+    # The properties of a json object are set with the json counterparts of
+    # the merged PROPERTY_LOADERS, so no xml nodes get built
+    @staticmethod
+    def getJsonLoaders(objectClass):
+        loaders = KalturaObjectFactory.jsonLoaders.get(objectClass)
+        if loaders != None:
+            return loaders
+        loaders = {}
+        for (name, propLoader) in KalturaObjectFactory.getPropertyLoaders(objectClass).items():
+            loaders[name] = getJsonPropertyLoader(name, propLoader)
+        KalturaObjectFactory.jsonLoaders[objectClass] = loaders
+        return loaders
+
+    @staticmethod
+    def createFromJson(value, expectedType):
+        if not isinstance(value, dict) or not 'objectType' in value:
+            return None
+        objType = value['objectType']
+        result = KalturaObjectFactory.getObjectFactory(objType)()
+        if not isinstance(result, expectedType):
+            raise KalturaClientException("Unexpected object type '%s'" % objType, KalturaClientException.ERROR_INVALID_OBJECT_TYPE)
+        loaders = KalturaObjectFactory.getJsonLoaders(result.__class__)
+        for (name, propValue) in value.items():
+            if not name in loaders:
+                continue
+            (func, param) = loaders[name]
+            if param == None:
+                setattr(result, name, func(propValue))
+            else:
+                setattr(result, name, func(propValue, param))
+        return result
+
+    @staticmethod
+    def getProjectionLoaders(objectClass):
+        loaders = KalturaObjectFactory.projectionLoaders.get(objectClass)
+        if loaders != None:
+            return loaders
+        loaders = {}
+        for (name, (func, param)) in KalturaObjectFactory.getPropertyLoaders(objectClass).items():
+            loaders[name] = (ENUM_VALUE_LOADERS.get(func, func), param)
+        KalturaObjectFactory.projectionLoaders[objectClass] = loaders
+        return loaders
+
+    @staticmethod
+    def getJsonProjectionLoaders(objectClass):
+        loaders = KalturaObjectFactory.jsonProjectionLoaders.get(objectClass)
+        if loaders != None:
+            return loaders
+        loaders = {}
+        for (name, propLoader) in KalturaObjectFactory.getProjectionLoaders(objectClass).items():
+            loaders[name] = getJsonPropertyLoader(name, propLoader)
+        KalturaObjectFactory.jsonProjectionLoaders[objectClass] = loaders
+        return loaders
+
+    # The named properties of the object a node holds, as a dict, without
+    # creating the object: values are what its getters would return, except
+    # that enums come as their values. Properties the node doesn't have are
+    # NotImplemented, as they would be on the object.
+    @staticmethod
+    def project(objectNode, propertyNames):
+        if isinstance(objectNode, KalturaJsonNode):
+            return KalturaObjectFactory.projectFromJson(objectNode.value, propertyNames)
+        objTypeNode = getChildNodeByXPath(objectNode, 'objectType')
+        if objTypeNode == None:
+            return None
+        objectClass = KalturaObjectFactory.getObjectFactory(getXmlNodeText(objTypeNode))
+        loaders = KalturaObjectFactory.getProjectionLoaders(objectClass)
+        result = dict.fromkeys(propertyNames, NotImplemented)
+        for childNode in objectNode.childNodes:
+            nodeName = childNode.nodeName
+            if not nodeName in result or not nodeName in loaders:
+                continue
+            (func, param) = loaders[nodeName]
+            if param is None:
+                result[nodeName] = func(childNode)
+            else:
+                result[nodeName] = func(childNode, param)
+        return result
+
+    @staticmethod
+    def projectFromJson(value, propertyNames):
+        if not isinstance(value, dict) or not 'objectType' in value:
+            return None
+        objectClass = KalturaObjectFactory.getObjectFactory(value['objectType'])
+        loaders = KalturaObjectFactory.getJsonProjectionLoaders(objectClass)
+        result = dict.fromkeys(propertyNames, NotImplemented)
+        for name in propertyNames:
+            if not name in value or not name in loaders:
+                continue
+            (func, param) = loaders[name]
+            if param == None:
+                result[name] = func(value[name])
+            else:
+                result[name] = func(value[name], param)
+        return result
+
+    @staticmethod
+    def createArrayFromJson(value, expectedElemType):
+        if isinstance(value, dict):
+            # maps come as objects keyed by the item keys
+            value = list(value.values())
+        elif not isinstance(value, list):
+            return []
+        return [KalturaObjectFactory.createFromJson(elemValue, expectedElemType) for elemValue in value]
 
     @staticmethod
     def registerObjects(objs):
         KalturaObjectFactory.objectFactories.update(objs)
 
+    @staticmethod
+    def registerLazyObjects(objectModules):
+        KalturaObjectFactory.lazyObjectModules.update(objectModules)
+
+# xml property loader -> the one taking the decoded json value instead
+JSON_PROPERTY_LOADERS = {
+    getXmlNodeText: getJsonText,
+    getXmlNodeBool: getJsonBool,
+    getXmlNodeInt: getJsonInt,
+    getXmlNodeFloat: getJsonFloat,
+    KalturaEnumsFactory.createInt: KalturaEnumsFactory.createIntFromJson,
+    KalturaEnumsFactory.createString: KalturaEnumsFactory.createStringFromJson,
+    KalturaObjectFactory.create: KalturaObjectFactory.createFromJson,
+    KalturaObjectFactory.createArray: KalturaObjectFactory.createArrayFromJson,
+    KalturaObjectFactory.createLazyArray: KalturaObjectFactory.createLazyArrayFromJson,
+    KalturaEnumsFactory.createIntValue: KalturaEnumsFactory.createIntValueFromJson,
+    KalturaEnumsFactory.createStringValue: KalturaEnumsFactory.createStringValueFromJson,
+}
+
+# enum loader -> the one loading just the value, for KalturaObjectFactory.project
+ENUM_VALUE_LOADERS = {
+    KalturaEnumsFactory.createInt: KalturaEnumsFactory.createIntValue,
+    KalturaEnumsFactory.createString: KalturaEnumsFactory.createStringValue,
+}
+
+def compileXmlDeserializer(loaders):
+    def deserialize(obj, node):
+        for childNode in node.childNodes:
+            nodeName = childNode.nodeName
+            if not nodeName in loaders:
+                continue
+            (func, param) = loaders[nodeName]
+            if param is None:
+                setattr(obj, nodeName, func(childNode))
+            else:
+                setattr(obj, nodeName, func(childNode, param))
+    return deserialize
+
+def getJsonPropertyLoader(name, propLoader):
+    (func, param) = propLoader
+    if func in JSON_PROPERTY_LOADERS:
+        return (JSON_PROPERTY_LOADERS[func], param)
+    # any other loader gets the value as a node
+    if param == None:
+        return (lambda value: func(KalturaJsonNode(value, name)), None)
+    return (lambda value, param: func(KalturaJsonNode(value, name), param), param)
+
 # Implement to get Kaltura Client logs
 class IKalturaLogger:
     def log(self, msg):
@@ -0,0 +1,222 @@
+import os
+import time
+import select
+import socket
+import threading
+
+try:
+    import httplib
+except ImportError:
+    import http.client as httplib
+try:
+    from urlparse import urlparse
+except ImportError:
+    from urllib.parse import urlparse
+
+from poster.streaminghttp import cooperative_pause
+
+# Keep-alive HTTP connections to the Kaltura API, pooled per host
+#
+# Connections are checked out for one request and put back once its response
+# has been read. Idle connections are dropped after idleTimeout seconds, or
+# when the server has closed them (the socket turns readable while idle).
+# A request whose head (request line, headers and a body sent with them) fails
+# to go out on a reused connection is retried once on a new connection: the
+# server closed the connection while it sat idle, and can't have acted on a
+# request it didn't get whole. Failures once the head went out, while the rest
+# of the body is sent or the response is read, are not retried: the server may
+# have run the call already, and add or upload calls must not run twice. Pools
+# don't survive fork: a process that inherits one starts over with no
+# connections.
+class KalturaConnectionPool:
+    def __init__(self, maxIdlePerHost = 4, idleTimeout = 30):
+        self.maxIdlePerHost = maxIdlePerHost
+        self.idleTimeout = idleTimeout
+        # (scheme, host, port) -> [(connection, idle since)]
+        self.idle = {}
+        self.lock = threading.Lock()
+        self.pid = os.getpid()
+        self.stats = {'opened': 0, 'reused': 0, 'retried': 0, 'expired': 0, 'stale': 0}
+
+    @staticmethod
+    def isStale(connection):
+        # an idle keep-alive socket only turns readable when the server closed
+        # it (or sent something it shouldn't have)
+        try:
+            (readable, _, _) = select.select([connection.sock], [], [], 0)
+        except (ValueError, select.error, socket.error):
+            return True
+        return len(readable) > 0
+
+    def checkFork(self):
+        if self.pid == os.getpid():
+            return
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+            for connections in self.idle.values():
+                for (connection, _) in connections:
+                    connection.close()
+            self.idle = {}
+            self.stats = dict((name, 0) for name in self.stats)
+            self.pid = os.getpid()
+
+    # connects within connectTimeout, then waits up to readTimeout for every
+    # read and write on the socket
+    def newConnection(self, key, connectTimeout, readTimeout):
+        (scheme, host, port) = key
+        if scheme == 'https':
+            connection = httplib.HTTPSConnection(host, port, timeout = connectTimeout)
+        else:
+            connection = httplib.HTTPConnection(host, port, timeout = connectTimeout)
+        try:
+            connection.connect()
+        except Exception:
+            connection.close()
+            raise
+        connection.sock.settimeout(readTimeout)
+        self.stats['opened'] += 1
+        return connection
+
+    def getConnection(self, key, connectTimeout, readTimeout):
+        self.checkFork()
+        now = time.time()
+        while True:
+            with self.lock:
+                connections = self.idle.get(key)
+                if not connections:
+                    break
+                (connection, idleSince) = connections.pop()
+            if now - idleSince > self.idleTimeout:
+                self.stats['expired'] += 1
+            elif connection.sock is None or self.isStale(connection):
+                self.stats['stale'] += 1
+            else:
+                connection.sock.settimeout(readTimeout)
+                self.stats['reused'] += 1
+                return (connection, True)
+            connection.close()
+        return (self.newConnection(key, connectTimeout, readTimeout), False)
+
+    def releaseConnection(self, key, connection):
+        if connection.sock is None or self.pid != os.getpid():
+            connection.close()
+            return
+        with self.lock:
+            connections = self.idle.setdefault(key, [])
+            if len(connections) < self.maxIdlePerHost:
+                connections.append((connection, time.time()))
+                return
+        connection.close()
+
+    # Sends the request line, the headers and, for a body of one chunk, the
+    # body with them, in the same packet; returns the chunks left to send
+    @staticmethod
+    def sendHead(connection, path, body, headers):
+        connection.putrequest('POST', path)
+        for (name, value) in headers.items():
+            connection.putheader(name, value)
+        if isinstance(body, list) and len(body) == 1:
+            # small bodies go out in the same packet as the headers
+            connection.endheaders(body[0])
+            return []
+        connection.endheaders()
+        return body
+
+    @staticmethod
+    def sendBody(connection, body):
+        # uploads let the other greenlets of a gevent worker run between
+        # blocks
+        pause = cooperative_pause()
+        for chunk in body:
+            if not isinstance(chunk, bytes):
+                chunk = chunk.encode('utf8')
+            connection.send(chunk)
+            if pause:
+                pause()
+
+    @classmethod
+    def sendRequest(cls, connection, path, body, headers):
+        cls.sendBody(connection, cls.sendHead(connection, path, body, headers))
+        return connection.getresponse()
+
+    # POSTs the body chunks to url; body may be a poster multipart generator,
+    # which is reset before a retry
+    def request(self, url, body, headers, readTimeout = None, connectTimeout = None):
+        parsedUrl = urlparse(url)
+        key = (parsedUrl.scheme, parsedUrl.hostname, parsedUrl.port)
+        path = parsedUrl.path or '/'
+        if parsedUrl.query:
+            path += '?' + parsedUrl.query
+
+        (connection, reused) = self.getConnection(key, connectTimeout, readTimeout)
+        try:
+            rest = self.sendHead(connection, path, body, headers)
+        except socket.timeout:
+            connection.close()
+            raise
+        except (socket.error, httplib.HTTPException):
+            connection.close()
+            if not reused:
+                raise
+            # the server dropped the connection while it sat idle
+            self.stats['retried'] += 1
+            if hasattr(body, 'reset'):
+                body.reset()
+            connection = self.newConnection(key, connectTimeout, readTimeout)
+            try:
+                response = self.sendRequest(connection, path, body, headers)
+            except Exception:
+                connection.close()
+                raise
+            return KalturaPooledResponse(self, key, connection, response)
+        try:
+            self.sendBody(connection, rest)
+            response = connection.getresponse()
+        except Exception:
+            connection.close()
+            raise
+        return KalturaPooledResponse(self, key, connection, response)
+
+    def info(self):
+        stats = dict(self.stats)
+        requests = stats['opened'] + stats['reused']
+        stats['reuse_ratio'] = float(stats['reused']) / requests if requests else None
+        with self.lock:
+            stats['idle'] = sum(len(connections) for connections in self.idle.values())
+        return stats
+
+# Response of a pooled request; reading it to the end hands the connection back
+class KalturaPooledResponse:
+    def __init__(self, pool, key, connection, response):
+        self.pool = pool
+        self.key = key
+        self.connection = connection
+        self.response = response
+        self.status = response.status
+        self.reason = response.reason
+        self.done = False
+
+    def read(self, size = None):
+        try:
+            if size == None:
+                data = self.response.read()
+            else:
+                data = self.response.read(size)
+        except Exception:
+            self.close()
+            raise
+        if not self.done and (size == None or self.response.isclosed()):
+            self.done = True
+            if self.response.will_close:
+                self.connection.close()
+            else:
+                self.pool.releaseConnection(self.key, self.connection)
+        return data
+
+    # a response dropped before the end leaves unread data on the
+    # connection, so it can't be reused
+    def close(self):
+        if not self.done:
+            self.done = True
+            self.connection.close()
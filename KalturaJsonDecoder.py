@@ -0,0 +1,110 @@
+import json
+import numbers
+
+from KalturaXmlDecoder import KalturaXmlNode
+
+# Decoding of Kaltura API json responses (format=1)
+#
+# The response body is decoded with the json module in one go and handed to
+# the service actions wrapped in a KalturaJsonNode. The object and enum
+# factories recognize these and build objects straight from the decoded
+# values (KalturaObjectFactory.createFromJson); for everything else the node
+# looks like an xml one: objects are elements with a child per property,
+# arrays elements with 'item' children and scalars elements with a text
+# child, so getChildNodeByXPath and the getXmlNode* functions work on it too.
+
+class KalturaJsonNode(object):
+    __slots__ = ('nodeName', 'value')
+
+    def __init__(self, value, nodeName = 'result'):
+        self.nodeName = nodeName
+        self.value = value
+
+    @property
+    def childNodes(self):
+        if isinstance(self.value, dict):
+            return [KalturaJsonNode(value, name) for (name, value) in self.value.items()]
+        if isinstance(self.value, list):
+            return [KalturaJsonNode(value, 'item') for value in self.value]
+        text = getJsonText(self.value)
+        if text == '':
+            return []
+        return [KalturaXmlNode('#text', text)]
+
+    def getChild(self, nodeName):
+        if isinstance(self.value, dict):
+            if not nodeName in self.value:
+                return None
+            return KalturaJsonNode(self.value[nodeName], nodeName)
+        for childNode in self.childNodes:
+            if childNode.nodeName == nodeName:
+                return childNode
+        return None
+
+    @property
+    def firstChild(self):
+        childNodes = self.childNodes
+        if len(childNodes) == 0:
+            return None
+        return childNodes[0]
+
+# Json values as the getXmlNode* functions would return them from the
+# equivalent xml, where booleans are 1/0 and null an empty element
+def getJsonText(value):
+    if value == None:
+        return ''
+    if isinstance(value, bool):
+        return value and '1' or '0'
+    if isinstance(value, (dict, list)):
+        return ''
+    if isinstance(value, numbers.Number):
+        return str(value)
+    return value
+
+def getJsonBool(value):
+    if isinstance(value, bool):
+        return value
+    text = getJsonText(value)
+    if text == '0':
+        return False
+    elif text == '1':
+        return True
+    return None
+
+def getJsonInt(value):
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, numbers.Integral):
+        return value
+    text = getJsonText(value)
+    if text == '':
+        return None
+    try:
+        return int(text)
+    except ValueError:
+        return None
+
+def getJsonFloat(value):
+    if isinstance(value, bool):
+        return float(value)
+    if isinstance(value, numbers.Number):
+        return float(value)
+    text = getJsonText(value)
+    if text == '':
+        return None
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+# (message, code) of an API error object, None for anything else
+def getJsonError(value):
+    if not isinstance(value, dict) or value.get('objectType') != 'KalturaAPIException':
+        return None
+    return (getJsonText(value.get('message')), getJsonText(value.get('code')))
+
+# Raises ValueError for anything that isn't json
+def parseJson(data):
+    if not isinstance(data, type(u'')):
+        data = data.decode('utf-8')
+    return KalturaJsonNode(json.loads(data))
@@ -0,0 +1,315 @@
+# Static registry of the client plugins and the services, object types and
+# enums they expose.
+#
+# KalturaClient uses it instead of scanning the KalturaPlugins folder, to
+# create service objects only when they are first accessed, and to import a
+# plugin module only when one of its types is first seen. Regenerate it
+# after updating the generated client libraries:
+#
+#     python KalturaPluginManifest.py
+
+# core service name -> service class in KalturaCoreClient
+CORE_SERVICES = {
+    'accessControl': 'KalturaAccessControlService',
+    'adminUser': 'KalturaAdminUserService',
+    'baseEntry': 'KalturaBaseEntryService',
+    'bulkUpload': 'KalturaBulkUploadService',
+    'category': 'KalturaCategoryService',
+    'conversionProfileAssetParams': 'KalturaConversionProfileAssetParamsService',
+    'conversionProfile': 'KalturaConversionProfileService',
+    'data': 'KalturaDataService',
+    'document': 'KalturaDocumentService',
+    'EmailIngestionProfile': 'KalturaEmailIngestionProfileService',
+    'flavorAsset': 'KalturaFlavorAssetService',
+    'flavorParams': 'KalturaFlavorParamsService',
+    'liveStream': 'KalturaLiveStreamService',
+    'mediaInfo': 'KalturaMediaInfoService',
+    'media': 'KalturaMediaService',
+    'mixing': 'KalturaMixingService',
+    'notification': 'KalturaNotificationService',
+    'partner': 'KalturaPartnerService',
+    'permissionItem': 'KalturaPermissionItemService',
+    'permission': 'KalturaPermissionService',
+    'playlist': 'KalturaPlaylistService',
+    'report': 'KalturaReportService',
+    'schema': 'KalturaSchemaService',
+    'search': 'KalturaSearchService',
+    'session': 'KalturaSessionService',
+    'stats': 'KalturaStatsService',
+    'storageProfile': 'KalturaStorageProfileService',
+    'syndicationFeed': 'KalturaSyndicationFeedService',
+    'system': 'KalturaSystemService',
+    'thumbAsset': 'KalturaThumbAssetService',
+    'thumbParams': 'KalturaThumbParamsService',
+    'uiConf': 'KalturaUiConfService',
+    'upload': 'KalturaUploadService',
+    'uploadToken': 'KalturaUploadTokenService',
+    'userRole': 'KalturaUserRoleService',
+    'user': 'KalturaUserService',
+    'widget': 'KalturaWidgetService',
+    'xInternal': 'KalturaXInternalService',
+}
+
+# client plugin modules, all found in KalturaPlugins
+PLUGIN_MODULES = [
+    'KalturaAdminConsoleClientPlugin',
+    'KalturaAnnotationClientPlugin',
+    'KalturaAuditClientPlugin',
+    'KalturaCaptionClientPlugin',
+    'KalturaCaptionSearchClientPlugin',
+    'KalturaContentDistributionClientPlugin',
+    'KalturaDocumentClientPlugin',
+    'KalturaFileSyncClientPlugin',
+    'KalturaKalturaInternalToolsClientPlugin',
+    'KalturaMetadataClientPlugin',
+    'KalturaShortLinkClientPlugin',
+    'KalturaStorageProfileClientPlugin',
+    'KalturaSystemPartnerClientPlugin',
+    'KalturaVirusScanClientPlugin',
+]
+
+# plugin name -> (plugin module, service name -> service class)
+PLUGIN_SERVICES = {
+    'adminConsole': ('KalturaAdminConsoleClientPlugin', {
+        'flavorParamsOutput': 'KalturaFlavorParamsOutputService',
+        'thumbParamsOutput': 'KalturaThumbParamsOutputService',
+        'mediaInfo': 'KalturaMediaInfoService',
+        'entryAdmin': 'KalturaEntryAdminService',
+        'uiConfAdmin': 'KalturaUiConfAdminService',
+    }),
+    'annotation': ('KalturaAnnotationClientPlugin', {
+        'annotation': 'KalturaAnnotationService',
+    }),
+    'audit': ('KalturaAuditClientPlugin', {
+        'auditTrail': 'KalturaAuditTrailService',
+    }),
+    'caption': ('KalturaCaptionClientPlugin', {
+        'captionAsset': 'KalturaCaptionAssetService',
+        'captionParams': 'KalturaCaptionParamsService',
+    }),
+    'captionSearch': ('KalturaCaptionSearchClientPlugin', {
+        'captionAssetItem': 'KalturaCaptionAssetItemService',
+    }),
+    'contentDistribution': ('KalturaContentDistributionClientPlugin', {
+        'distributionProfile': 'KalturaDistributionProfileService',
+        'entryDistribution': 'KalturaEntryDistributionService',
+        'distributionProvider': 'KalturaDistributionProviderService',
+        'genericDistributionProvider': 'KalturaGenericDistributionProviderService',
+        'genericDistributionProviderAction': 'KalturaGenericDistributionProviderActionService',
+    }),
+    'document': ('KalturaDocumentClientPlugin', {
+        'documents': 'KalturaDocumentsService',
+    }),
+    'fileSync': ('KalturaFileSyncClientPlugin', {}),
+    'KalturaInternalTools': ('KalturaKalturaInternalToolsClientPlugin', {
+        'KalturaInternalTools': 'KalturaKalturaInternalToolsService',
+        'KalturaInternalToolsSystemHelper': 'KalturaKalturaInternalToolsSystemHelperService',
+    }),
+    'metadata': ('KalturaMetadataClientPlugin', {
+        'metadata': 'KalturaMetadataService',
+        'metadataProfile': 'KalturaMetadataProfileService',
+    }),
+    'shortLink': ('KalturaShortLinkClientPlugin', {
+        'shortLink': 'KalturaShortLinkService',
+    }),
+    'storageProfile': ('KalturaStorageProfileClientPlugin', {
+        'storageProfile': 'KalturaStorageProfileService',
+    }),
+    'systemPartner': ('KalturaSystemPartnerClientPlugin', {
+        'systemPartner': 'KalturaSystemPartnerService',
+    }),
+    'virusScan': ('KalturaVirusScanClientPlugin', {
+        'virusScanProfile': 'KalturaVirusScanProfileService',
+    }),
+}
+
+# plugin object type -> plugin module
+PLUGIN_TYPES = {
+    'KalturaAnnotation': 'KalturaAnnotationClientPlugin',
+    'KalturaAnnotationBaseFilter': 'KalturaAnnotationClientPlugin',
+    'KalturaAnnotationFilter': 'KalturaAnnotationClientPlugin',
+    'KalturaAnnotationListResponse': 'KalturaAnnotationClientPlugin',
+    'KalturaAuditTrail': 'KalturaAuditClientPlugin',
+    'KalturaAuditTrailBaseFilter': 'KalturaAuditClientPlugin',
+    'KalturaAuditTrailFilter': 'KalturaAuditClientPlugin',
+    'KalturaAuditTrailInfo': 'KalturaAuditClientPlugin',
+    'KalturaAuditTrailListResponse': 'KalturaAuditClientPlugin',
+    'KalturaCaptionAsset': 'KalturaCaptionClientPlugin',
+    'KalturaCaptionAssetBaseFilter': 'KalturaCaptionClientPlugin',
+    'KalturaCaptionAssetFilter': 'KalturaCaptionClientPlugin',
+    'KalturaCaptionAssetItem': 'KalturaCaptionSearchClientPlugin',
+    'KalturaCaptionAssetItemFilter': 'KalturaCaptionSearchClientPlugin',
+    'KalturaCaptionAssetItemListResponse': 'KalturaCaptionSearchClientPlugin',
+    'KalturaCaptionAssetListResponse': 'KalturaCaptionClientPlugin',
+    'KalturaCaptionParams': 'KalturaCaptionClientPlugin',
+    'KalturaCaptionParamsBaseFilter': 'KalturaCaptionClientPlugin',
+    'KalturaCaptionParamsFilter': 'KalturaCaptionClientPlugin',
+    'KalturaCaptionParamsListResponse': 'KalturaCaptionClientPlugin',
+    'KalturaDistributionProfile': 'KalturaContentDistributionClientPlugin',
+    'KalturaDistributionProfileBaseFilter': 'KalturaContentDistributionClientPlugin',
+    'KalturaDistributionProfileFilter': 'KalturaContentDistributionClientPlugin',
+    'KalturaDistributionProfileListResponse': 'KalturaContentDistributionClientPlugin',
+    'KalturaDistributionProvider': 'KalturaContentDistributionClientPlugin',
+    'KalturaDistributionProviderBaseFilter': 'KalturaContentDistributionClientPlugin',
+    'KalturaDistributionProviderFilter': 'KalturaContentDistributionClientPlugin',
+    'KalturaDistributionProviderListResponse': 'KalturaContentDistributionClientPlugin',
+    'KalturaDistributionThumbDimensions': 'KalturaContentDistributionClientPlugin',
+    'KalturaDistributionValidationError': 'KalturaContentDistributionClientPlugin',
+    'KalturaDocumentEntry': 'KalturaDocumentClientPlugin',
+    'KalturaDocumentEntryBaseFilter': 'KalturaDocumentClientPlugin',
+    'KalturaDocumentEntryFilter': 'KalturaDocumentClientPlugin',
+    'KalturaDocumentListResponse': 'KalturaDocumentClientPlugin',
+    'KalturaEntryDistribution': 'KalturaContentDistributionClientPlugin',
+    'KalturaEntryDistributionBaseFilter': 'KalturaContentDistributionClientPlugin',
+    'KalturaEntryDistributionFilter': 'KalturaContentDistributionClientPlugin',
+    'KalturaEntryDistributionListResponse': 'KalturaContentDistributionClientPlugin',
+    'KalturaFlavorParamsOutputListResponse': 'KalturaAdminConsoleClientPlugin',
+    'KalturaGenericDistributionProvider': 'KalturaContentDistributionClientPlugin',
+    'KalturaGenericDistributionProviderAction': 'KalturaContentDistributionClientPlugin',
+    'KalturaGenericDistributionProviderActionBaseFilter': 'KalturaContentDistributionClientPlugin',
+    'KalturaGenericDistributionProviderActionFilter': 'KalturaContentDistributionClientPlugin',
+    'KalturaGenericDistributionProviderActionListResponse': 'KalturaContentDistributionClientPlugin',
+    'KalturaGenericDistributionProviderBaseFilter': 'KalturaContentDistributionClientPlugin',
+    'KalturaGenericDistributionProviderFilter': 'KalturaContentDistributionClientPlugin',
+    'KalturaGenericDistributionProviderListResponse': 'KalturaContentDistributionClientPlugin',
+    'KalturaInternalToolsSession': 'KalturaKalturaInternalToolsClientPlugin',
+    'KalturaMediaInfoListResponse': 'KalturaAdminConsoleClientPlugin',
+    'KalturaMetadata': 'KalturaMetadataClientPlugin',
+    'KalturaMetadataBaseFilter': 'KalturaMetadataClientPlugin',
+    'KalturaMetadataFilter': 'KalturaMetadataClientPlugin',
+    'KalturaMetadataListResponse': 'KalturaMetadataClientPlugin',
+    'KalturaMetadataProfile': 'KalturaMetadataClientPlugin',
+    'KalturaMetadataProfileBaseFilter': 'KalturaMetadataClientPlugin',
+    'KalturaMetadataProfileField': 'KalturaMetadataClientPlugin',
+    'KalturaMetadataProfileFieldListResponse': 'KalturaMetadataClientPlugin',
+    'KalturaMetadataProfileFilter': 'KalturaMetadataClientPlugin',
+    'KalturaMetadataProfileListResponse': 'KalturaMetadataClientPlugin',
+    'KalturaShortLink': 'KalturaShortLinkClientPlugin',
+    'KalturaShortLinkBaseFilter': 'KalturaShortLinkClientPlugin',
+    'KalturaShortLinkFilter': 'KalturaShortLinkClientPlugin',
+    'KalturaShortLinkListResponse': 'KalturaShortLinkClientPlugin',
+    'KalturaStorageProfile': 'KalturaStorageProfileClientPlugin',
+    'KalturaStorageProfileListResponse': 'KalturaStorageProfileClientPlugin',
+    'KalturaSystemPartnerConfiguration': 'KalturaSystemPartnerClientPlugin',
+    'KalturaSystemPartnerPackage': 'KalturaSystemPartnerClientPlugin',
+    'KalturaSystemPartnerUsageFilter': 'KalturaSystemPartnerClientPlugin',
+    'KalturaSystemPartnerUsageItem': 'KalturaSystemPartnerClientPlugin',
+    'KalturaSystemPartnerUsageListResponse': 'KalturaSystemPartnerClientPlugin',
+    'KalturaThumbParamsOutputListResponse': 'KalturaAdminConsoleClientPlugin',
+    'KalturaTrackEntry': 'KalturaAdminConsoleClientPlugin',
+    'KalturaTrackEntryListResponse': 'KalturaAdminConsoleClientPlugin',
+    'KalturaUiConfAdmin': 'KalturaAdminConsoleClientPlugin',
+    'KalturaUiConfAdminListResponse': 'KalturaAdminConsoleClientPlugin',
+    'KalturaVirusScanProfile': 'KalturaVirusScanClientPlugin',
+    'KalturaVirusScanProfileBaseFilter': 'KalturaVirusScanClientPlugin',
+    'KalturaVirusScanProfileFilter': 'KalturaVirusScanClientPlugin',
+    'KalturaVirusScanProfileListResponse': 'KalturaVirusScanClientPlugin',
+}
+
+# plugin enum type -> plugin module
+PLUGIN_ENUMS = {
+    'KalturaAnnotationOrderBy': 'KalturaAnnotationClientPlugin',
+    'KalturaAuditTrailAction': 'KalturaAuditClientPlugin',
+    'KalturaAuditTrailContext': 'KalturaAuditClientPlugin',
+    'KalturaAuditTrailObjectType': 'KalturaAuditClientPlugin',
+    'KalturaAuditTrailOrderBy': 'KalturaAuditClientPlugin',
+    'KalturaAuditTrailStatus': 'KalturaAuditClientPlugin',
+    'KalturaCaptionAssetOrderBy': 'KalturaCaptionClientPlugin',
+    'KalturaCaptionAssetStatus': 'KalturaCaptionClientPlugin',
+    'KalturaCaptionParamsOrderBy': 'KalturaCaptionClientPlugin',
+    'KalturaCaptionType': 'KalturaCaptionClientPlugin',
+    'KalturaDistributionAction': 'KalturaContentDistributionClientPlugin',
+    'KalturaDistributionErrorType': 'KalturaContentDistributionClientPlugin',
+    'KalturaDistributionProfileActionStatus': 'KalturaContentDistributionClientPlugin',
+    'KalturaDistributionProfileOrderBy': 'KalturaContentDistributionClientPlugin',
+    'KalturaDistributionProfileStatus': 'KalturaContentDistributionClientPlugin',
+    'KalturaDistributionProtocol': 'KalturaContentDistributionClientPlugin',
+    'KalturaDistributionProviderOrderBy': 'KalturaContentDistributionClientPlugin',
+    'KalturaDistributionProviderType': 'KalturaContentDistributionClientPlugin',
+    'KalturaDocumentEntryOrderBy': 'KalturaDocumentClientPlugin',
+    'KalturaDocumentType': 'KalturaDocumentClientPlugin',
+    'KalturaEntryDistributionFlag': 'KalturaContentDistributionClientPlugin',
+    'KalturaEntryDistributionOrderBy': 'KalturaContentDistributionClientPlugin',
+    'KalturaEntryDistributionStatus': 'KalturaContentDistributionClientPlugin',
+    'KalturaEntryDistributionSunStatus': 'KalturaContentDistributionClientPlugin',
+    'KalturaGenericDistributionProviderActionOrderBy': 'KalturaContentDistributionClientPlugin',
+    'KalturaGenericDistributionProviderOrderBy': 'KalturaContentDistributionClientPlugin',
+    'KalturaGenericDistributionProviderParser': 'KalturaContentDistributionClientPlugin',
+    'KalturaGenericDistributionProviderStatus': 'KalturaContentDistributionClientPlugin',
+    'KalturaMetadataObjectType': 'KalturaMetadataClientPlugin',
+    'KalturaMetadataOrderBy': 'KalturaMetadataClientPlugin',
+    'KalturaMetadataProfileOrderBy': 'KalturaMetadataClientPlugin',
+    'KalturaMetadataProfileStatus': 'KalturaMetadataClientPlugin',
+    'KalturaMetadataStatus': 'KalturaMetadataClientPlugin',
+    'KalturaShortLinkOrderBy': 'KalturaShortLinkClientPlugin',
+    'KalturaShortLinkStatus': 'KalturaShortLinkClientPlugin',
+    'KalturaStorageProfileProtocol': 'KalturaStorageProfileClientPlugin',
+    'KalturaStorageProfileStatus': 'KalturaStorageProfileClientPlugin',
+    'KalturaStorageServePriority': 'KalturaStorageProfileClientPlugin',
+    'KalturaTrackEntryEventType': 'KalturaAdminConsoleClientPlugin',
+    'KalturaVirusFoundAction': 'KalturaVirusScanClientPlugin',
+    'KalturaVirusScanEngineType': 'KalturaVirusScanClientPlugin',
+    'KalturaVirusScanProfileOrderBy': 'KalturaVirusScanClientPlugin',
+    'KalturaVirusScanProfileStatus': 'KalturaVirusScanClientPlugin',
+}
+
+
+def buildManifest(pluginsFolder):
+    import os
+    import KalturaCoreClient
+
+    def serviceNames(plugin):
+        return dict((name, factory.__name__)
+                    for (name, factory) in plugin.getServices().items())
+
+    core = serviceNames(KalturaCoreClient.KalturaCoreClient(None))
+    modules = sorted(os.path.splitext(fileName)[0]
+                     for fileName in os.listdir(pluginsFolder)
+                     if os.path.splitext(fileName)[1].lower() == '.py')
+    plugins = {}
+    types = {}
+    enums = {}
+    for moduleName in modules:
+        pluginModule = __import__(moduleName)
+        plugin = getattr(pluginModule, moduleName)(None)
+        plugins[plugin.getName()] = (moduleName, serviceNames(plugin))
+        types.update((name, moduleName) for name in plugin.getTypes())
+        enums.update((name, moduleName) for name in plugin.getEnums())
+    return core, modules, plugins, types, enums
+
+def renderManifest(core, modules, plugins, types, enums):
+    def renderDict(items, indent):
+        return ''.join('%s%r: %r,\n' % (' ' * indent, key, value)
+                       for (key, value) in items)
+
+    lines = ['CORE_SERVICES = {\n', renderDict(core.items(), 4), '}\n\n']
+    lines.append('# client plugin modules, all found in KalturaPlugins\n')
+    lines.append('PLUGIN_MODULES = [\n')
+    lines.extend('    %r,\n' % moduleName for moduleName in modules)
+    lines.append(']\n\n')
+    lines.append('# plugin name -> (plugin module, service name -> service class)\n')
+    lines.append('PLUGIN_SERVICES = {\n')
+    for (pluginName, (moduleName, services)) in sorted(plugins.items(), key=lambda item: item[1][0]):
+        if services:
+            lines.append('    %r: (%r, {\n%s    }),\n' % (pluginName, moduleName, renderDict(services.items(), 8)))
+        else:
+            lines.append('    %r: (%r, {}),\n' % (pluginName, moduleName))
+    lines.append('}\n\n')
+    lines.append('# plugin object type -> plugin module\n')
+    lines.extend(['PLUGIN_TYPES = {\n', renderDict(sorted(types.items()), 4), '}\n\n'])
+    lines.append('# plugin enum type -> plugin module\n')
+    lines.extend(['PLUGIN_ENUMS = {\n', renderDict(sorted(enums.items()), 4), '}\n'])
+    return ''.join(lines)
+
+if __name__ == '__main__':
+    import os
+    import sys
+    here = os.path.dirname(os.path.abspath(__file__))
+    pluginsFolder = os.path.join(here, 'KalturaPlugins')
+    sys.path[:0] = [here, pluginsFolder]
+    source = open(__file__).read()
+    start = source.index('CORE_SERVICES = {')
+    end = source.index('\n\ndef buildManifest')
+    manifest = renderManifest(*buildManifest(pluginsFolder))
+    with open(__file__, 'w') as f:
+        f.write(source[:start] + manifest + source[end:])
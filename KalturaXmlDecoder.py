@@ -0,0 +1,240 @@
+import os
+import threading
+from collections import deque
+from xml.parsers import expat
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+# Incremental decoding of Kaltura API xml responses
+#
+# The decoder is fed the response body in chunks and builds lightweight nodes
+# that look enough like minidom ones (nodeName, childNodes, firstChild,
+# nodeValue) for getChildNodeByXPath, the getXmlNode* functions and the
+# generated PROPERTY_LOADERS to work on them unchanged. Elements found at
+# itemPath (e.g. the items of a list response) are not attached to their
+# parent: each is handed out once complete and dropped after, so decoding a
+# list never holds more than one item's nodes. With itemChildNames, only
+# the item children of those names are kept (e.g. the properties a
+# projection reads); the others are parsed but no nodes are made for them.
+#
+# Two parser backends build these nodes: lxml (libxml2) when it is installed,
+# otherwise the stdlib expat parser. Both give the same node trees; the
+# backend is picked once per process (KALTURA_XML_BACKEND=lxml|expat in the
+# environment, or setXmlBackend) and used by parseString and
+# createXmlDecoder.
+
+class KalturaXmlNode(object):
+    __slots__ = ('nodeName', 'childNodes', 'nodeValue', 'childIndex')
+
+    def __init__(self, nodeName, nodeValue = None):
+        self.nodeName = nodeName
+        self.childNodes = []
+        self.nodeValue = nodeValue
+        self.childIndex = None
+
+    @property
+    def firstChild(self):
+        if len(self.childNodes) == 0:
+            return None
+        return self.childNodes[0]
+
+    # The first child named nodeName, or None. The name index is built on
+    # the first lookup, once the node is complete
+    def getChild(self, nodeName):
+        if self.childIndex == None:
+            self.childIndex = dict((childNode.nodeName, childNode) for childNode in reversed(self.childNodes))
+        return self.childIndex.get(nodeName)
+
+class KalturaXmlDecoder(object):
+    def __init__(self, itemPath = None, itemChildNames = None):
+        self.itemPath = None
+        if itemPath != None:
+            self.itemPath = itemPath.split('/')
+        self.itemChildNames = None
+        if self.itemPath != None and itemChildNames != None:
+            self.itemChildNames = frozenset(itemChildNames)
+            self.itemChildDepth = len(self.itemPath) + 1
+        self.document = KalturaXmlNode('#document')
+        self.items = deque()
+        # open elements, from the document node down
+        self.stack = [self.document]
+        self.path = []
+        self.text = []
+        self.parser = expat.ParserCreate('utf-8')
+        self.parser.buffer_text = True
+        self.parser.StartElementHandler = self.startElement
+        self.parser.EndElementHandler = self.endElement
+        self.parser.CharacterDataHandler = self.characterData
+
+    def startElement(self, name, attributes):
+        self.text = []
+        self.path.append(name)
+        self.stack.append(KalturaXmlNode(name))
+
+    def endElement(self, name):
+        node = self.stack.pop()
+        # text is only kept for leaf elements; whitespace between elements
+        # is dropped
+        if len(node.childNodes) == 0 and len(self.text) > 0:
+            node.childNodes.append(KalturaXmlNode('#text', ''.join(self.text)))
+        self.text = []
+        if self.path == self.itemPath:
+            self.items.append(node)
+        elif (self.itemChildNames == None or
+              len(self.path) != self.itemChildDepth or
+              name in self.itemChildNames or
+              self.path[:-1] != self.itemPath):
+            self.stack[-1].childNodes.append(node)
+        self.path.pop()
+
+    def characterData(self, data):
+        self.text.append(data)
+
+    def feed(self, data, final = False):
+        self.parser.Parse(data, final)
+
+    # Reads f to the end in chunks, yielding each item node as soon as it
+    # has been parsed
+    def iterItems(self, f, chunkSize = 65536):
+        while True:
+            chunk = f.read(chunkSize)
+            self.feed(chunk, not chunk)
+            while len(self.items) > 0:
+                yield self.items.popleft()
+            if not chunk:
+                return
+
+# Responses come off the network: lxml keeps libxml2's size and depth limits
+# (no huge_tree), doesn't expand entities and never fetches anything
+LXML_PARSER_OPTIONS = dict(remove_comments = True, remove_pis = True, resolve_entities = False, no_network = True)
+
+# Same as KalturaXmlDecoder, parsing with lxml: items are picked from the
+# parser's end events, and their elements freed once turned into nodes
+class KalturaLxmlDecoder(KalturaXmlDecoder):
+    def __init__(self, itemPath = None, itemChildNames = None):
+        self.itemPath = None
+        self.itemChildNames = None
+        self.document = KalturaXmlNode('#document')
+        self.items = deque()
+        self.lastItem = None
+        if itemPath == None:
+            self.parser = etree.XMLPullParser(events = (), **LXML_PARSER_OPTIONS)
+            return
+        self.itemPath = itemPath.split('/')
+        if itemChildNames != None:
+            self.itemChildNames = frozenset(itemChildNames)
+        self.parser = etree.XMLPullParser(events = ('end',), tag = self.itemPath[-1], **LXML_PARSER_OPTIONS)
+
+    def isItem(self, element):
+        for name in reversed(self.itemPath):
+            if element is None or element.tag != name:
+                return False
+            element = element.getparent()
+        return element is None
+
+    def readItems(self):
+        for (event, element) in self.parser.read_events():
+            if not self.isItem(element):
+                continue
+            self.items.append(fromLxmlElement(element, self.itemChildNames))
+            # the parser may still append to the parent, so only the
+            # previous items are removed from it
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+            self.lastItem = element
+
+    def feed(self, data, final = False):
+        if len(data) > 0:
+            self.parser.feed(data)
+        if not final:
+            self.readItems()
+            return
+        root = self.parser.close()
+        self.readItems()
+        if self.lastItem is not None:
+            self.lastItem.getparent().remove(self.lastItem)
+            self.lastItem = None
+        self.document.childNodes.append(fromLxmlElement(root))
+
+# Builds the nodes of an lxml element and its children, with the text of
+# leaf elements, as KalturaXmlDecoder does. With childNames, only the
+# children of those names are kept. Entity references, which the parser
+# leaves unresolved, are dropped and the text around them kept
+def fromLxmlElement(element, childNames = None):
+    node = KalturaXmlNode(element.tag)
+    childNodes = node.childNodes
+    if len(element) == 0 or all(child.tag is etree.Entity for child in element):
+        text = element.text
+        if len(element) > 0:
+            text = (text or '') + ''.join(child.tail or '' for child in element)
+        if text:
+            childNodes.append(KalturaXmlNode('#text', text))
+        return node
+    for child in element:
+        if child.tag is etree.Entity:
+            continue
+        if childNames == None or child.tag in childNames:
+            childNodes.append(fromLxmlElement(child))
+    return node
+
+# lxml parsers can't be shared between threads
+lxmlParsers = threading.local()
+
+def getLxmlParser():
+    parser = getattr(lxmlParsers, 'parser', None)
+    if parser == None:
+        parser = etree.XMLParser(**LXML_PARSER_OPTIONS)
+        lxmlParsers.parser = parser
+    return parser
+
+def parseStringExpat(data):
+    decoder = KalturaXmlDecoder()
+    decoder.feed(data, True)
+    return decoder.document
+
+def parseStringLxml(data):
+    if not isinstance(data, bytes):
+        data = data.encode('utf-8')
+    document = KalturaXmlNode('#document')
+    document.childNodes.append(fromLxmlElement(etree.fromstring(data, getLxmlParser())))
+    return document
+
+# Parser backends: name -> (parseString function, streaming decoder class)
+XML_BACKEND_LXML = 'lxml'
+XML_BACKEND_EXPAT = 'expat'
+
+xmlBackends = {XML_BACKEND_EXPAT: (parseStringExpat, KalturaXmlDecoder)}
+XML_PARSE_ERRORS = (expat.ExpatError,)
+if etree != None:
+    xmlBackends[XML_BACKEND_LXML] = (parseStringLxml, KalturaLxmlDecoder)
+    XML_PARSE_ERRORS += (etree.XMLSyntaxError,)
+
+def getXmlBackends():
+    return sorted(xmlBackends.keys())
+
+def getXmlBackend():
+    return xmlBackend
+
+def setXmlBackend(backend):
+    global xmlBackend
+    if not backend in xmlBackends:
+        raise ValueError('xml backend %s is not available (available: %s)' % (backend, ', '.join(getXmlBackends())))
+    xmlBackend = backend
+
+xmlBackend = XML_BACKEND_EXPAT
+if etree != None:
+    xmlBackend = XML_BACKEND_LXML
+if os.environ.get('KALTURA_XML_BACKEND'):
+    setXmlBackend(os.environ['KALTURA_XML_BACKEND'])
+
+# Parses a whole response into nodes, returning the document node
+def parseString(data, backend = None):
+    return xmlBackends[backend or xmlBackend][0](data)
+
+# A streaming decoder (see KalturaXmlDecoder) for the given backend
+def createXmlDecoder(itemPath = None, itemChildNames = None, backend = None):
+    return xmlBackends[backend or xmlBackend][1](itemPath, itemChildNames)
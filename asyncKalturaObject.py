@@ -0,0 +1,219 @@
+"""Async versions of the myKalturaObject calls that runtornado.py serves
+natively (Python 3 only).
+
+They make their Kaltura calls through KalturaAsyncClient, so one worker can
+wait on many of them at once. Each returns the same result as the
+myKalturaObject function of the same name.
+"""
+import sys
+import asyncio
+
+import myKalturaObject
+from myKalturaObject import KalturaClientPool, search_filter, \
+    search_projection, search_entries_data, default_thumb_request, \
+    entry_data, thumbnail_dictify, caption_dictify, sort_by_field, \
+    GET_ENTRY_PROPERTIES, HTTP_POOL_IDLE_TIMEOUT, SERVER_SETTINGS, \
+    BATCH_CALLS, BATCH_MAX_SIZE
+from KalturaAsyncClient import KalturaAsyncClient, KalturaAsyncCallBatcher
+from KalturaAsyncConnectionPool import KalturaAsyncConnectionPool
+from KalturaCoreClient import KalturaAssetFilter, KalturaMediaEntry, \
+    KalturaMediaType
+from KalturaClientBase import KalturaClientException
+
+import properties
+
+# idle keep-alive connections kept per Kaltura host, and how many calls may
+# wait on one host at once; requests past that queue for a connection
+ASYNC_HTTP_POOL_MAX_IDLE = 32
+ASYNC_HTTP_POOL_MAX_CONNECTIONS = 128
+
+KalturaAsyncClient.connectionPool = KalturaAsyncConnectionPool(
+    ASYNC_HTTP_POOL_MAX_IDLE, HTTP_POOL_IDLE_TIMEOUT,
+    ASYNC_HTTP_POOL_MAX_CONNECTIONS)
+
+client_pool = KalturaClientPool(client_class=KalturaAsyncClient)
+
+# KTS_BATCH_WINDOW_MS: how long a batched call waits for others, from any
+# request of the worker, to go out with
+BATCH_WINDOW = SERVER_SETTINGS['BATCH_WINDOW']
+# one batcher per Kaltura instance configuration; calls carry their own KS
+call_batchers = {}
+
+
+async def get_cached_session_key(kaltura_id, privileges=""):
+    settings = myKalturaObject.get_kaltura_settings(kaltura_id)
+    if not settings:
+        raise Exception("Kaltura ID %s Settings %s" % (kaltura_id, settings))
+    ks = myKalturaObject.ks_cache.peek(kaltura_id, settings, privileges)
+    if ks is None:
+        # reads the shared store and may call session.start: keep it off
+        # the event loop
+        ks = await asyncio.get_event_loop().run_in_executor(
+            None, myKalturaObject.ks_cache.get, kaltura_id, settings,
+            privileges)
+    return ks
+
+
+async def create_session(kaltura_id, ks=None):
+    """Return a pooled KalturaAsyncClient for the instance; hand it back
+    with release_session once the request is done with it."""
+    settings = properties.load_kaltura_settings().get(kaltura_id)
+    if not settings:
+        raise Exception("Kaltura ID %s Settings %s" % (kaltura_id, settings))
+    if not ks:
+        ks = await get_cached_session_key(kaltura_id)
+    return client_pool.acquire(settings, ks)
+
+
+def release_session(client):
+    client_pool.release(client)
+
+
+async def call_all(client, calls):
+    """Results of the (action, args) calls, in order, sent at the same time.
+
+    With KTS_BATCH_CALLS set they go out together, as multirequests, with
+    those of other requests of the worker made within KTS_BATCH_WINDOW_MS.
+    """
+    if not BATCH_CALLS:
+        return await asyncio.gather(*[action(*args)
+                                      for (action, args) in calls])
+    batcher = call_batchers.get(client.config)
+    if batcher is None:
+        batcher = call_batchers[client.config] = KalturaAsyncCallBatcher(
+            client, BATCH_MAX_SIZE, BATCH_WINDOW)
+    return await asyncio.gather(*[batcher.queue(action, *args)
+                                  for (action, args) in calls])
+
+
+async def pullVideo(pull_path,
+                    media_name,
+                    media_tags=None,
+                    media_description=None,
+                    client=None,
+                    media_type=None):
+    try:
+        if client is None:
+            raise Exception("Client can not be None")
+        mediaEntry = KalturaMediaEntry()
+        mediaEntry.setName(media_name)
+        if media_tags:
+            mediaEntry.setTags(media_tags)
+        if media_description:
+            mediaEntry.setDescription(media_description)
+        if not media_type:
+            media_type = KalturaMediaType(KalturaMediaType.VIDEO)
+        mediaEntry.setMediaType(media_type)
+        mediaEntry = await client.media.addFromUrl(mediaEntry, pull_path)
+        return (True, mediaEntry.id)
+    except:
+        return (False,
+                "Unexpected error:" + "<p>" + repr(sys.exc_info()) + "</p>")
+
+
+async def uploadVideo(file_path,
+                      media_name,
+                      media_tags=None,
+                      media_description=None,
+                      client=None,
+                      media_type=None):
+    try:
+        if client is None:
+            raise Exception("Client can not be None")
+        with open(file_path, 'rb') as media_file:
+            uploadTokenId = await client.media.upload(media_file)
+        mediaEntry = KalturaMediaEntry()
+        mediaEntry.setName(media_name)
+        if media_tags:
+            mediaEntry.setTags(media_tags)
+        if media_description:
+            mediaEntry.setDescription(media_description)
+        if not media_type:
+            mediaEntry.setMediaType(KalturaMediaType(KalturaMediaType.VIDEO))
+        else:
+            mediaEntry.setMediaType(KalturaMediaType(media_type))
+        mediaEntry = await client.media.addFromUploadedFile(
+            mediaEntry, uploadTokenId)
+        return (True, mediaEntry.id)
+    except Exception as e:
+        return (False,
+                "Unexpected error:" + "<p>" + str(e) + "</p>")
+
+
+async def thumbnail_list(client, entry_id, in_dict=True):
+    try:
+        kfilter = KalturaAssetFilter()
+        kfilter.entryIdEqual = entry_id
+        pager = None
+        response = await client.thumbAsset.list(kfilter, pager)
+        if not in_dict:
+            return sort_by_field(list(response.objects), "created_at",
+                                 ascending=False)
+        thumbnail_list = [thumbnail_dictify(thumbnail)
+                          for thumbnail in response.objects]
+        # one getUrl per thumbnail, all waited on at once
+        urls = await call_all(client, [
+            (client.thumbAsset.getUrl, (thumbinfo['id'], None))
+            for thumbinfo in thumbnail_list])
+        for thumbinfo, url in zip(thumbnail_list, urls):
+            thumbinfo['url'] = url
+        thumbnail_list = sort_by_field(thumbnail_list,
+                                       "created_at", ascending=False)
+        return thumbnail_list
+    except:
+        return (False,
+                "Unexpected error retrieving thumbnail list:" + "<p>" + repr(
+                    sys.exc_info()) + "</p>")
+
+
+async def searchVideos(client,
+                       kaltura_id=None,
+                       composite=False,
+                       page_size=None,
+                       page_index=None,
+                       fields=None):
+    search, pager = search_filter(page_size, page_index)
+    projection = search_projection(fields)
+    entries = await client.projectList(projection[0], client.media.list,
+                                       search, pager)
+    return search_entries_data(entries, projection, kaltura_id, composite)
+
+
+async def get_entry(media_id, kaltura_id, client=None, width=120, height=120):
+    settings = properties.load_kaltura_settings().get(kaltura_id)
+    try:
+        entry = await client.projectObject(GET_ENTRY_PROPERTIES,
+                                           client.media.get, media_id)
+    except Exception as inst:
+        return {'success': False, 'message': str(inst)}
+    url, data = default_thumb_request(settings, media_id)
+    headers = {'Content-Type': 'application/x-www-form-urlencoded',
+               'Content-Length': str(len(data))}
+    response = await KalturaAsyncClient.connectionPool.request(
+        url, [data], headers, client.config.requestTimeout,
+        client.config.connectTimeout)
+    if response.status >= 300:
+        raise KalturaClientException(
+            'HTTP Error %s: %s' % (response.status, response.reason),
+            KalturaClientException.ERROR_CONNECTION_FAILED)
+    return entry_data(entry, media_id, settings, client.getKs(),
+                      response.data, width, height)
+
+
+async def get_entry_captions(entry_id, client, in_dict=True):
+    caption_asset_service = client.caption.captionAsset
+    listfilter = KalturaAssetFilter()
+    listfilter.entryIdEqual = entry_id
+    pager = None
+    response = await caption_asset_service.list(listfilter, pager)
+    if not in_dict:
+        return sort_by_field(list(response.objects), "created_at",
+                             ascending=False)
+    caption_list = [caption_dictify(caption) for caption in response.objects]
+    urls = await call_all(client, [(caption_asset_service.getUrl,
+                                    (caption['id'],))
+                                   for caption in caption_list])
+    for caption_entry, url in zip(caption_list, urls):
+        caption_entry['url'] = url
+    caption_list = sort_by_field(caption_list, "created_at", ascending=False)
+    return caption_list
@@ -0,0 +1,27 @@
+@py3
+Feature: Asyncio Kaltura client
+    KalturaAsyncClient sends the calls of the generated services without
+    blocking the event loop, over pooled keep-alive connections, and decodes
+    their results and errors as KalturaClient does.
+    Needs Python 3 (skipped otherwise).
+
+    Scenario: calls fanned out with asyncio.gather
+        Given a local Kaltura stub answering in 200 ms
+          And a KalturaAsyncClient on the stub
+         When 20 media.get calls are awaited with asyncio.gather
+         Then every call gets its own entry
+          And the calls took less than 1 second together
+          And the stub served 20 requests
+
+    Scenario: a multirequest
+        Given a local Kaltura stub answering in 0 ms
+          And a KalturaAsyncClient on the stub
+         When a media.get, a media.count and a media.get of a missing entry are sent as a multirequest
+         Then the stub served 1 requests
+          And the multirequest results are the entry, the count and the KalturaException
+
+    Scenario: an error result
+        Given a local Kaltura stub answering in 0 ms
+          And a KalturaAsyncClient on the stub
+         When media.get of a missing entry is awaited
+         Then it raises a KalturaException ENTRY_ID_NOT_FOUND
@@ -0,0 +1,46 @@
+"""The coroutines of the asyncio scenarios (Python 3 only).
+
+behave imports every module in steps/, so the async steps keep their
+`async def`s here, imported only by scenarios tagged @py3, and the suite
+still loads on Python 2.
+"""
+import asyncio
+
+from KalturaCoreClient import KalturaMediaEntry
+from KalturaClientBase import KalturaException
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+async def gather_gets(client, entry_ids):
+    return await asyncio.gather(*[client.media.get(entry_id)
+                                  for entry_id in entry_ids])
+
+
+async def multirequest(client):
+    client.startMultiRequest()
+    await client.media.get('0_entry')
+    await client.media.count()
+    await client.media.get('missing')
+    return await client.doMultiRequest()
+
+
+async def get_missing(client):
+    try:
+        await client.media.get('missing')
+    except KalturaException as e:
+        return e
+
+
+async def add_entries(client, count):
+    """The entries of `count` media.add calls, or what each raised; in one
+    event loop, for the calls after the first to reuse its connection."""
+    outcomes = []
+    for _ in range(count):
+        try:
+            outcomes.append(await client.media.add(KalturaMediaEntry()))
+        except Exception as e:
+            outcomes.append(e)
+    return outcomes
@@ -0,0 +1,33 @@
+Feature: Batched Kaltura calls
+    KalturaCallBatcher sends independent calls together, as multirequests,
+    and hands each caller the result its call would have had on its own.
+
+    Scenario: calls batched into one multirequest
+        Given a local Kaltura stub answering multirequests
+          And a KalturaCallBatcher of at most 50 calls
+         When 20 getUrl calls, a count and a media.get are batched
+         Then the stub served 1 requests
+          And every call gets the result it gets on its own
+
+    Scenario: batches split at the maximum size
+        Given a local Kaltura stub answering multirequests
+          And a KalturaCallBatcher of at most 8 calls
+         When 20 getUrl calls, a count and a media.get are batched
+         Then the stub served 3 requests
+          And every call gets the result it gets on its own
+
+    Scenario: a failing call among batched calls
+        Given a local Kaltura stub answering multirequests
+          And a KalturaCallBatcher of at most 50 calls
+         When 5 getUrl calls are batched with one for a missing asset
+         Then the call for the missing asset raises its KalturaException
+          And the other calls get their results
+          And the stub served 1 requests
+
+    Scenario: calls of concurrent tornado requests batched together
+        Given a local Kaltura stub answering every call after 100 ms
+          And KTS served by runtornado.py without batching
+          And KTS served by runtornado.py with KTS_BATCH_CALLS=1 and a 50 ms window
+         When 20 clients request thumbnail_list and list_captions at once
+         Then every client gets the response KTS gives without batching
+          And the asset urls of concurrent requests went out together
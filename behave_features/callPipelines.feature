@@ -0,0 +1,19 @@
+Feature: Pipelined Kaltura calls
+    KalturaCallPipeline sends calls that take the results of the calls
+    before them together, as one multirequest, with the results passed by
+    reference, and hands each caller the result of its own call.
+
+    Scenario: dependent calls in one multirequest
+        Given a local Kaltura stub answering multirequests
+          And a KalturaCallPipeline
+         When a thumbAsset is added, its content set and set as default
+         Then the stub served 1 requests
+          And the dependent calls were given {1:result:id}
+          And every pipelined call gets the result of its action
+
+    Scenario: a failing call in a pipeline
+        Given a local Kaltura stub answering multirequests
+          And a KalturaCallPipeline
+         When a thumbAsset is added to a missing entry and its content set
+         Then the stub served 1 requests
+          And both pipelined calls raise their KalturaException
@@ -0,0 +1,17 @@
+Feature: Shared Kaltura clients
+    Threads can share KalturaClient instances, as in gunicorn's gthread
+    workers: each thread queues and sends its own calls and multirequests
+    and gets back only its own results.
+
+    Scenario: threads sharing one client
+        Given a local Kaltura stub
+          And 1 Kaltura client shared by 16 threads
+         When every thread makes 50 media.get calls and multirequests
+         Then every thread gets back only its own entries
+          And the stub served 1600 requests
+
+    Scenario: threads sharing clients of different partners
+        Given a local Kaltura stub
+          And 4 Kaltura clients shared by 16 threads
+         When every thread makes 50 calls without params
+         Then every call is sent with its own client's partner and KS
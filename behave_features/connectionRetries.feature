@@ -0,0 +1,22 @@
+Feature: Retries on pooled Kaltura connections
+    A call on a reused keep-alive connection is sent again on a new one only
+    when its request did not go out; once the server got it whole, the
+    failure is the caller's, so that calls such as adds and uploads never
+    run twice.
+
+    Scenario: a reused connection dropped after the request went out
+        Given a Kaltura server that drops the connection after request 2
+          And a Kaltura client on the server
+         When the client makes 2 media.add calls
+         Then the first call gets its entry
+          And the second call fails
+          And the server got 2 requests
+
+    @py3
+    Scenario: a reused asyncio connection dropped after the request went out
+        Given a Kaltura server that drops the connection after request 2
+          And a KalturaAsyncClient on the server
+         When the client makes 2 media.add calls
+         Then the first call gets its entry
+          And the second call fails
+          And the server got 2 requests
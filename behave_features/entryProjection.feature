@@ -0,0 +1,42 @@
+Feature: Projected media entries
+    searchVideos (search_video, get_excel) and get_entry (get_media) load
+    only the media entry properties their fields need, straight into a dict,
+    instead of decoding a KalturaMediaEntry and reading it back through its
+    getters. Their output is the same as the getter-based one, in the xml
+    and the json response formats.
+
+    Scenario Outline: search_video output
+        Given a local Kaltura stub serving <entries> in <format>
+         When searchVideos lists them with every field
+         Then every entry is as read through the KalturaMediaEntry getters
+
+    Examples:
+        | entries                     | format |
+        | entries of every status     | xml    |
+        | entries of every status     | json   |
+        | entries with unset fields   | xml    |
+        | entries with unset fields   | json   |
+
+    Scenario Outline: get_excel output
+        Given a local Kaltura stub serving <entries> in <format>
+         When searchVideos lists them with the get_excel fields
+         Then every entry has the get_excel fields as read through the KalturaMediaEntry getters
+
+    Examples:
+        | entries                     | format |
+        | entries of every status     | xml    |
+        | entries of every status     | json   |
+        | entries with unset fields   | xml    |
+        | entries with unset fields   | json   |
+
+    Scenario Outline: get_media output
+        Given a local Kaltura stub serving <entries> in <format>
+         When get_entry gets each of them
+         Then every entry data is as read through the KalturaMediaEntry getters
+
+    Examples:
+        | entries                     | format |
+        | entries of every status     | xml    |
+        | entries of every status     | json   |
+        | entries with unset fields   | xml    |
+        | entries with unset fields   | json   |
@@ -1,3 +1,4 @@
+import sys
 import logging
 
 import simplejson
@@ -38,6 +39,13 @@ def before_all(context):
     logging.info(context.config.userdata['behave_debug_on_error'])
 
 
+def before_scenario(context, scenario):
+    # the asyncio scenarios' coroutines are in asyncio_calls, which python 2
+    # can't import
+    if 'py3' in scenario.effective_tags and sys.version_info[0] < 3:
+        scenario.skip('needs Python 3')
+
+
 def before_tag(context, tag):
     if tag == 'uploads':
         context.uploads = []
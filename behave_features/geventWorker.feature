@@ -0,0 +1,13 @@
+Feature: Cooperative gevent workers
+    With KTS_WORKER_CLASS=gevent, gunicorn_conf.py runs gevent workers: each
+    request is a greenlet, and Kaltura calls, their timeouts and uploads
+    yield to the other requests of the worker instead of blocking it.
+    Needs gevent installed (skipped otherwise).
+
+    Scenario: concurrent get_media requests on one gevent worker
+        Given a local Kaltura stub answering every call after 200 ms
+          And KTS served by 1 gevent worker
+         When 300 clients request get_media at once
+         Then every client gets the media entry
+          And the stub served 600 requests
+          And the requests took under a tenth of their time one after another
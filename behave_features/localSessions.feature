@@ -0,0 +1,25 @@
+Feature: Locally generated Kaltura sessions
+    With KS_MODE local or validate, KTS signs a v1 KS with the instance's
+    ADMIN_SECRET itself, in the layout session.start returns, and checks
+    it against the KS of session.start.
+
+    Scenario: a local KS agrees with the KS of session.start
+        Given an instance of partner 1234567 for user kts
+          And the KS session.start returned for it
+         When a KS with privileges disableentitlement is generated locally
+         Then the local KS is signed with the ADMIN_SECRET
+          And it has the fields of the session.start KS
+          And checking it against the session.start KS finds no problems
+
+    Scenario: a KS signed with another secret
+        Given an instance of partner 1234567 for user kts
+          And the KS session.start returned for it
+          And the instance has another ADMIN_SECRET
+         When a KS with privileges disableentitlement is generated locally
+         Then checking it against the session.start KS finds "remote KS is not signed with ADMIN_SECRET"
+
+    Scenario: a session.start KS with too few fields
+        Given an instance of partner 1234567 for user kts
+          And a session.start KS of 4 fields
+         When a KS with privileges disableentitlement is generated locally
+         Then checking it against the session.start KS finds "remote KS has 4 fields, not 7 or more"
@@ -0,0 +1,17 @@
+Feature: Shared enums
+    KalturaEnumsFactory hands out one read only enum object per enum type and
+    value for the responses it decodes. Like the generated enums they compare
+    and hash by identity, so they mix with the enums application code builds
+    in sets and dicts.
+
+    Scenario: an enum value decoded twice
+        When KalturaEntryStatus 2 is decoded twice
+        Then both are the same KalturaEntryStatus object
+          And its value can't be changed
+
+    Scenario: shared and built enums in a set and a dict
+        Given a decoded KalturaEntryStatus 2 and two built with KalturaEntryStatus('2')
+         When they are put in a set and used as dict keys
+         Then the set holds 3 enums
+          And every enum finds its own dict entry only
+          And the enums that compare equal have the same hash
@@ -0,0 +1,96 @@
+import time
+
+from behave import given, when, then
+
+from KalturaClient import KalturaConfiguration
+from KalturaClientBase import KalturaException
+from KalturaCoreClient import KalturaMediaEntry
+from benchmarks.kaltura_stub import KalturaStub, media_entry, \
+    multirequest_responder
+
+MISSING_ENTRY_ERROR = (
+    '<error><objectType>KalturaAPIException</objectType>'
+    '<code>ENTRY_ID_NOT_FOUND</code>'
+    '<message>Entry id "missing" not found</message></error>')
+
+
+def call_responder(service, action, params):
+    if action == 'get':
+        if params['entryId'] == 'missing':
+            return MISSING_ENTRY_ERROR
+        return media_entry(params['entryId'])
+    if action == 'count':
+        return '42'
+    return ''
+
+
+@given(u'a local Kaltura stub answering in {delay:d} ms')
+def given_stub(context, delay):
+    context.stub = KalturaStub(multirequest_responder(call_responder),
+                               delay=delay / 1000.0).start()
+    context.add_cleanup(context.stub.stop)
+
+
+@given(u'a KalturaAsyncClient on the stub')
+def given_async_client(context):
+    from KalturaAsyncClient import KalturaAsyncClient
+    config = KalturaConfiguration(99)
+    config.serviceUrl = context.stub.url
+    context.client = KalturaAsyncClient(config)
+    context.client.setKs('stub-ks')
+
+
+@when(u'{count:d} media.get calls are awaited with asyncio.gather')
+def gather_gets(context, count):
+    from behave_features import asyncio_calls
+    context.entry_ids = ['0_%07d' % i for i in range(count)]
+    context.stub.stats['requests'] = 0
+    start = time.time()
+    context.entries = asyncio_calls.run(
+        asyncio_calls.gather_gets(context.client, context.entry_ids))
+    context.seconds = time.time() - start
+
+
+@then(u'every call gets its own entry')
+def own_entries(context):
+    for (entry_id, entry) in zip(context.entry_ids, context.entries):
+        assert isinstance(entry, KalturaMediaEntry), entry
+        assert entry.getId() == entry_id, (entry.getId(), entry_id)
+
+
+@then(u'the calls took less than {seconds:d} second together')
+def took_less(context, seconds):
+    assert context.seconds < seconds, context.seconds
+
+
+@when(u'a media.get, a media.count and a media.get of a missing entry are '
+      u'sent as a multirequest')
+def multirequest(context):
+    from behave_features import asyncio_calls
+    context.stub.stats['requests'] = 0
+    context.results = asyncio_calls.run(
+        asyncio_calls.multirequest(context.client))
+
+
+@then(u'the multirequest results are the entry, the count and the '
+      u'KalturaException')
+def multirequest_results(context):
+    (entry, count, error) = context.results
+    assert isinstance(entry, KalturaMediaEntry), entry
+    assert entry.getId() == '0_entry', entry.getId()
+    assert count == '42', count
+    assert isinstance(error, KalturaException), error
+    assert error.code == 'ENTRY_ID_NOT_FOUND', error.code
+
+
+@when(u'media.get of a missing entry is awaited')
+def get_missing(context):
+    from behave_features import asyncio_calls
+    context.error = asyncio_calls.run(
+        asyncio_calls.get_missing(context.client))
+
+
+@then(u'it raises a KalturaException {code}')
+def raises(context, code):
+    assert isinstance(context.error, KalturaException), context.error
+    assert context.error.code == code, context.error.code
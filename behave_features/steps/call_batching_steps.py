@@ -0,0 +1,182 @@
+import shutil
+import tempfile
+import threading
+
+from behave import given, when, then
+
+try:
+    import urllib2
+except ImportError:
+    import urllib.request as urllib2
+
+from KalturaClient import KalturaClient, KalturaConfiguration
+from KalturaClientBase import KalturaException
+from KalturaCallBatcher import KalturaCallBatcher
+from benchmarks.kaltura_stub import KalturaStub, media_entry, \
+    multirequest_responder
+from benchmarks.kts_server import kts_env, start_server, stop_server
+
+MISSING_ASSET_ERROR = (
+    '<error><objectType>KalturaAPIException</objectType>'
+    '<code>THUMB_ASSET_ID_NOT_FOUND</code>'
+    '<message>Thumbnail asset id "%s" not found</message></error>')
+
+
+def call_responder(service, action, params):
+    if action == 'getUrl':
+        if params['id'] == 'missing':
+            return MISSING_ASSET_ERROR % params['id']
+        return 'http://cdn.example.edu/%s/%s' % (service, params['id'])
+    if action == 'count':
+        return '42'
+    if action == 'get':
+        return media_entry(params['entryId'])
+    return ''
+
+
+@given(u'a local Kaltura stub answering multirequests')
+def given_multirequest_stub(context):
+    context.stub = KalturaStub(
+        multirequest_responder(call_responder)).start()
+    context.add_cleanup(context.stub.stop)
+
+
+@given(u'a KalturaCallBatcher of at most {size:d} calls')
+def given_batcher(context, size):
+    config = KalturaConfiguration(99)
+    config.serviceUrl = context.stub.url
+    context.client = KalturaClient(config)
+    context.client.setKs('stub-ks')
+    context.batcher = KalturaCallBatcher(context.client, size)
+
+
+@when(u'{count:d} getUrl calls, a count and a media.get are batched')
+def batch_calls(context, count):
+    client = context.client
+    context.stub.stats['requests'] = 0
+    context.calls = [(client.thumbAsset.getUrl, ('0_th%d' % i,))
+                     for i in range(count)]
+    context.calls += [(client.media.count, ()),
+                      (client.media.get, ('0_entry',))]
+    context.batched = [context.batcher.queue(action, *args)
+                       for (action, args) in context.calls]
+    context.results = [batched.get() for batched in context.batched]
+
+
+@when(u'{count:d} getUrl calls are batched with one for a missing asset')
+def batch_calls_with_missing(context, count):
+    client = context.client
+    context.stub.stats['requests'] = 0
+    ids = ['0_th%d' % i for i in range(count)]
+    ids.insert(count // 2, 'missing')
+    context.ids = ids
+    context.batched = [context.batcher.queue(client.thumbAsset.getUrl, id)
+                       for id in ids]
+    context.batcher.flush()
+
+
+@then(u'every call gets the result it gets on its own')
+def results_as_alone(context):
+    alone = [action(*args) for (action, args) in context.calls]
+    assert context.results[:-1] == alone[:-1], \
+        'batched %s, alone %s' % (context.results[:-1], alone[:-1])
+    assert isinstance(context.results[-2], int), context.results[-2]
+    (batched_entry, entry) = (context.results[-1], alone[-1])
+    assert type(batched_entry) == type(entry), type(batched_entry)
+    assert batched_entry.getId() == entry.getId() == '0_entry'
+
+
+@then(u'the call for the missing asset raises its KalturaException')
+def missing_raises(context):
+    missing = context.batched[context.ids.index('missing')]
+    try:
+        missing.get()
+    except KalturaException as e:
+        assert e.code == 'THUMB_ASSET_ID_NOT_FOUND', e.code
+    else:
+        raise AssertionError('no KalturaException for the missing asset')
+
+
+@then(u'the other calls get their results')
+def others_get_results(context):
+    for (id, batched) in zip(context.ids, context.batched):
+        if id != 'missing':
+            assert batched.get() == \
+                'http://cdn.example.edu/thumbasset/%s' % id, batched.get()
+
+
+def start_tornado(context, **overrides):
+    workdir = tempfile.mkdtemp(prefix='kts-batching-')
+    context.add_cleanup(shutil.rmtree, workdir)
+    env = kts_env(context.stub.url, workdir, **overrides)
+    process, port = start_server('tornado', workdir, env, workers=1)
+    context.add_cleanup(stop_server, process)
+    return 'http://127.0.0.1:%d' % port
+
+
+@given(u'KTS served by runtornado.py without batching')
+def given_tornado_unbatched(context):
+    context.unbatched_url = start_tornado(context)
+
+
+@given(u'KTS served by runtornado.py with KTS_BATCH_CALLS=1 and a '
+       u'{window:d} ms window')
+def given_tornado_batched(context, window):
+    context.kts_url = start_tornado(context, KTS_BATCH_CALLS='1',
+                                    KTS_BATCH_WINDOW_MS=str(window))
+
+
+SERVICES = ['thumbnail_list', 'list_captions']
+
+
+def get_service(kts_url, service, index):
+    url = '%s/service/%s/?id=1:0_%07d' % (kts_url, service, index)
+    return urllib2.urlopen(url, timeout=60).read()
+
+
+@when(u'{count:d} clients request thumbnail_list and list_captions at once')
+def request_concurrently(context, count):
+    context.expected = dict(
+        ((service, index), get_service(context.unbatched_url, service, index))
+        for service in SERVICES for index in range(count))
+    context.bodies = {}
+    context.errors = []
+    start = threading.Event()
+
+    def run(service, index):
+        start.wait()
+        try:
+            context.bodies[(service, index)] = get_service(
+                context.kts_url, service, index)
+        except Exception as e:
+            context.errors.append('%s %d: %r' % (service, index, e))
+
+    threads = [threading.Thread(target=run, args=(service, index))
+               for service in SERVICES for index in range(count)]
+    for thread in threads:
+        thread.start()
+    context.stub.stats['requests'] = 0
+    start.set()
+    for thread in threads:
+        thread.join()
+    context.request_count = len(threads)
+
+
+@then(u'every client gets the response KTS gives without batching')
+def responses_as_unbatched(context):
+    assert context.errors == [], '\n'.join(context.errors[:10])
+    for (key, body) in context.expected.items():
+        # failed calls come back as [false, "Unexpected error..."]
+        assert not body.startswith(b'[false'), body[:300]
+        assert context.bodies[key] == body, (key, context.bodies[key][:300])
+
+
+@then(u'the asset urls of concurrent requests went out together')
+def urls_batched(context):
+    # unbatched, every request makes a list call and one getUrl call per
+    # asset; batched, the getUrl calls of all requests share a few
+    # multirequests
+    requests = context.stub.stats['requests']
+    assert requests < context.request_count * 2, \
+        '%d Kaltura requests for %d KTS requests' % (
+            requests, context.request_count)
@@ -0,0 +1,97 @@
+from behave import given, when, then
+
+from KalturaClient import KalturaClient, KalturaConfiguration
+from KalturaClientBase import KalturaException
+from KalturaCoreClient import KalturaThumbAsset, KalturaUrlResource
+from KalturaCallBatcher import KalturaCallPipeline
+from benchmarks import payloads
+from benchmarks.kaltura_stub import KalturaStub, multirequest_responder
+
+ERROR = ('<error><objectType>KalturaAPIException</objectType>'
+         '<code>%s</code><message>%s</message></error>')
+
+
+def call_responder(service, action, params):
+    if service != 'thumbasset':
+        return ''
+    if action == 'add':
+        if params['entryId'] == 'missing':
+            return ERROR % ('ENTRY_ID_NOT_FOUND', 'Entry id "missing" not found')
+        return payloads.item_xml(payloads.thumb_asset_fields(7))
+    if not params.get('id', params.get('thumbAssetId')):
+        return ERROR % ('MISSING_MANDATORY_PARAMETER', 'Missing parameter "id"')
+    if action == 'setContent':
+        return payloads.item_xml(payloads.thumb_asset_fields(7))
+    return '1'
+
+
+def recording_responder(context):
+    respond = multirequest_responder(call_responder)
+
+    def record(service, action, params):
+        context.requests.append(dict(params))
+        return respond(service, action, params)
+    return record
+
+
+@given(u'a KalturaCallPipeline')
+def given_pipeline(context):
+    context.requests = []
+    context.stub.responder = recording_responder(context)
+    config = KalturaConfiguration(99)
+    config.serviceUrl = context.stub.url
+    context.client = KalturaClient(config)
+    context.client.setKs('stub-ks')
+    context.pipeline = KalturaCallPipeline(context.client)
+
+
+def queue_thumbnail(context, entry_id):
+    context.stub.stats['requests'] = 0
+    thumb_asset = context.client.thumbAsset
+    context.added = context.pipeline.queue(thumb_asset.add, entry_id,
+                                           KalturaThumbAsset())
+    context.content_set = context.pipeline.queue(
+        thumb_asset.setContent, context.added.ref.id,
+        KalturaUrlResource(url='http://cdn.example.edu/a.jpg'))
+
+
+@when(u'a thumbAsset is added, its content set and set as default')
+def pipeline_thumbnail(context):
+    queue_thumbnail(context, '0_entry')
+    context.set_default = context.pipeline.queue(
+        context.client.thumbAsset.setAsDefault, context.added.ref.id)
+    context.added.get()
+
+
+@when(u'a thumbAsset is added to a missing entry and its content set')
+def pipeline_thumbnail_missing(context):
+    queue_thumbnail(context, 'missing')
+    context.pipeline.flush()
+
+
+@then(u'the dependent calls were given {reference}')
+def given_reference(context, reference):
+    (params,) = context.requests
+    assert params['2:id'] == params['3:thumbAssetId'] == reference, params
+
+
+@then(u'every pipelined call gets the result of its action')
+def pipelined_results(context):
+    thumb_asset = context.added.get()
+    assert isinstance(thumb_asset, KalturaThumbAsset), thumb_asset
+    assert thumb_asset.getId() == '0_th000007', thumb_asset.getId()
+    assert context.content_set.get().getId() == '0_th000007'
+    # setAsDefault returns nothing, as it does on its own
+    assert context.set_default.get() is None, context.set_default.get()
+
+
+@then(u'both pipelined calls raise their KalturaException')
+def pipelined_exceptions(context):
+    for (call, code) in ((context.added, 'ENTRY_ID_NOT_FOUND'),
+                         (context.content_set, 'MISSING_MANDATORY_PARAMETER')):
+        try:
+            call.get()
+        except KalturaException as e:
+            assert e.code == code, e.code
+        else:
+            raise AssertionError('no KalturaException for %s' % code)
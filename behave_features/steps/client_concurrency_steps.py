@@ -0,0 +1,126 @@
+import sys
+import threading
+
+from behave import given, when, then
+
+from KalturaClient import KalturaClient, KalturaConfiguration
+from KalturaClientBase import getXmlNodeText
+from benchmarks.kaltura_stub import KalturaStub, media_entry
+
+
+def stub_responder(service, action, params):
+    if service == 'multirequest':
+        entries = []
+        index = 1
+        while '%d:entryId' % index in params:
+            entries.append('<item>%s</item>'
+                           % media_entry(params['%d:entryId' % index]))
+            index += 1
+        return ''.join(entries)
+    if action == 'get':
+        return media_entry(params['entryId'])
+    # echo who the call was made for
+    return '%s|%s' % (params.get('partnerId'), params.get('ks'))
+
+
+def run_threads(context, work):
+    """Runs work(thread index, client) in every thread, all at once."""
+    context.errors = []
+    start = threading.Event()
+
+    def run(index):
+        start.wait()
+        client = context.clients[index % len(context.clients)]
+        try:
+            work(index, client)
+        except Exception as e:
+            context.errors.append('thread %d: %r' % (index, e))
+
+    threads = [threading.Thread(target=run, args=(index,))
+               for index in range(context.thread_count)]
+    # switch threads as often as possible, so they interleave between
+    # queueing calls and sending them
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for thread in threads:
+            thread.start()
+        start.set()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+
+@given(u'a local Kaltura stub')
+def given_stub(context):
+    context.stub = KalturaStub(stub_responder).start()
+    context.add_cleanup(context.stub.stop)
+
+
+@given(u'{client_count:d} Kaltura client shared by {thread_count:d} threads')
+@given(u'{client_count:d} Kaltura clients shared by {thread_count:d} threads')
+def given_shared_clients(context, client_count, thread_count):
+    context.clients = []
+    for index in range(client_count):
+        config = KalturaConfiguration(100 + index)
+        config.serviceUrl = context.stub.url
+        client = KalturaClient(config)
+        client.setKs('ks-of-client-%d' % index)
+        context.clients.append(client)
+    context.thread_count = thread_count
+
+
+@when(u'every thread makes {count:d} media.get calls and multirequests')
+def make_calls_and_multirequests(context, count):
+    context.calls = count
+
+    def work(index, client):
+        for call in range(count):
+            entry_id = '%d_%d' % (index, call)
+            entry = client.media.get(entry_id)
+            assert entry.getId() == entry_id, \
+                'asked for %s, got %s' % (entry_id, entry.getId())
+            client.startMultiRequest()
+            for part in range(3):
+                client.media.get('%s_%d' % (entry_id, part))
+            entries = client.doMultiRequest()
+            got = [entry.getId() for entry in entries]
+            expected = ['%s_%d' % (entry_id, part) for part in range(3)]
+            assert got == expected, 'asked for %s, got %s' % (expected, got)
+
+    run_threads(context, work)
+
+
+@when(u'every thread makes {count:d} calls without params')
+def make_calls_without_params(context, count):
+    context.echoes = {}
+
+    def work(index, client):
+        echoes = []
+        for call in range(count):
+            client.queueServiceActionCall('system', 'ping')
+            echoes.append(getXmlNodeText(client.doQueue()))
+        context.echoes[index] = (client, echoes)
+
+    run_threads(context, work)
+
+
+@then(u'every thread gets back only its own entries')
+def own_entries(context):
+    assert context.errors == [], '\n'.join(context.errors[:10])
+
+
+@then(u'the stub served {count:d} requests')
+def stub_requests(context, count):
+    assert context.stub.stats['requests'] == count, context.stub.stats
+
+
+@then(u"every call is sent with its own client's partner and KS")
+def own_partner_and_ks(context):
+    assert context.errors == [], '\n'.join(context.errors[:10])
+    assert len(context.echoes) == context.thread_count
+    for (client, echoes) in context.echoes.values():
+        expected = '%s|%s' % (client.getConfig().partnerId, client.getKs())
+        assert set(echoes) == set([expected]), \
+            'expected %s, got %s' % (expected, sorted(set(echoes)))
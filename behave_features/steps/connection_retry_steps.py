@@ -0,0 +1,129 @@
+import socket
+import threading
+
+from behave import given, when, then
+
+from KalturaClient import KalturaClient, KalturaConfiguration
+from KalturaCoreClient import KalturaMediaEntry
+from benchmarks.kaltura_stub import RESPONSE_TEMPLATE, media_entry
+
+
+class DroppingServer(object):
+    """Answers the requests of one keep-alive connection with media
+    entries, up to the request `drop_at`: that one is read whole, then the
+    connection is closed without a response."""
+
+    def __init__(self, drop_at):
+        self.drop_at = drop_at
+        self.requests = 0
+        self.sock = socket.socket()
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.listen(8)
+        self.url = 'http://127.0.0.1:%d' % self.sock.getsockname()[1]
+        thread = threading.Thread(target=self.serve)
+        thread.daemon = True
+        thread.start()
+
+    def serve(self):
+        while True:
+            try:
+                (connection, _) = self.sock.accept()
+            except socket.error:
+                return
+            thread = threading.Thread(target=self.serve_connection,
+                                      args=(connection,))
+            thread.daemon = True
+            thread.start()
+
+    def read_request(self, stream):
+        length = 0
+        while True:
+            line = stream.readline()
+            if not line:
+                return False
+            if line in (b'\r\n', b'\n'):
+                break
+            (name, _, value) = line.decode('latin-1').partition(':')
+            if name.strip().lower() == 'content-length':
+                length = int(value)
+        stream.read(length)
+        return True
+
+    def serve_connection(self, connection):
+        stream = connection.makefile('rb')
+        try:
+            while self.read_request(stream):
+                self.requests += 1
+                if self.requests >= self.drop_at:
+                    break
+                payload = (RESPONSE_TEMPLATE % media_entry('0_added%d' %
+                                                           self.requests))
+                payload = payload.encode('utf8')
+                connection.sendall(
+                    b'HTTP/1.1 200 OK\r\nContent-Type: text/xml\r\n'
+                    b'Content-Length: ' + str(len(payload)).encode('ascii') +
+                    b'\r\n\r\n' + payload)
+        finally:
+            stream.close()
+            connection.close()
+
+    def stop(self):
+        self.sock.close()
+
+
+@given(u'a Kaltura server that drops the connection after request {count:d}')
+def given_dropping_server(context, count):
+    context.server = DroppingServer(count)
+    context.add_cleanup(context.server.stop)
+
+
+@given(u'a Kaltura client on the server')
+def given_client(context):
+    config = KalturaConfiguration(99)
+    config.serviceUrl = context.server.url
+    context.client = KalturaClient(config)
+    context.client.setKs('stub-ks')
+    context.is_async = False
+
+
+@given(u'a KalturaAsyncClient on the server')
+def given_async_client(context):
+    from KalturaAsyncClient import KalturaAsyncClient
+    config = KalturaConfiguration(99)
+    config.serviceUrl = context.server.url
+    context.client = KalturaAsyncClient(config)
+    context.client.setKs('stub-ks')
+    context.is_async = True
+
+
+@when(u'the client makes {count:d} media.add calls')
+def add_entries(context, count):
+    if context.is_async:
+        from behave_features import asyncio_calls
+        context.outcomes = asyncio_calls.run(
+            asyncio_calls.add_entries(context.client, count))
+        return
+    context.outcomes = []
+    for _ in range(count):
+        try:
+            context.outcomes.append(context.client.media.add(
+                KalturaMediaEntry()))
+        except Exception as e:
+            context.outcomes.append(e)
+
+
+@then(u'the first call gets its entry')
+def first_gets_entry(context):
+    entry = context.outcomes[0]
+    assert isinstance(entry, KalturaMediaEntry), entry
+    assert entry.getId() == '0_added1', entry.getId()
+
+
+@then(u'the second call fails')
+def second_fails(context):
+    assert isinstance(context.outcomes[1], Exception), context.outcomes[1]
+
+
+@then(u'the server got {count:d} requests')
+def server_requests(context, count):
+    assert context.server.requests == count, context.server.requests
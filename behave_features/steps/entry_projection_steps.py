@@ -0,0 +1,192 @@
+import json
+
+from behave import given, when, then
+
+import myKalturaObject
+from KalturaClient import KalturaClient, KalturaConfiguration
+from KalturaClientBase import KALTURA_SERVICE_FORMAT_JSON
+from KalturaCoreClient import KalturaMediaEntryFilter
+from benchmarks import payloads
+from benchmarks.kaltura_stub import KalturaStub
+from benchmarks.kts_server import entry_fields
+from benchmarks.entry_projection import object_entry
+
+KALTURA_ID = 1
+
+# every value the name tables know, and one they don't
+STATUSES = sorted(myKalturaObject.ENTRY_STATUS_NAMES) + ['99']
+MEDIA_TYPES = sorted(myKalturaObject.MEDIA_TYPE_NAMES) + [99]
+SOURCE_TYPES = sorted(myKalturaObject.SOURCE_TYPE_NAMES) + ['99']
+
+# properties the server leaves out of an entry when they were never set
+UNSET_PROPERTIES = set([
+    'dataUrl', 'plays', 'rank', 'totalRank', 'width', 'searchText',
+    'startDate', 'endDate', 'conversionQuality', 'creditUrl', 'mediaDate',
+    'userId'])
+
+
+def every_status_fields(i):
+    values = {
+        'status': STATUSES[i % len(STATUSES)],
+        'mediaType': str(MEDIA_TYPES[i % len(MEDIA_TYPES)]),
+        'sourceType': SOURCE_TYPES[i % len(SOURCE_TYPES)],
+        'rank': '%d.5' % (i % 5),
+        'totalRank': str(i * 3),
+    }
+    return [(name, values.get(name, value))
+            for (name, value) in entry_fields(i)]
+
+
+def unset_fields(i):
+    return [(name, value) for (name, value) in every_status_fields(i)
+            if name not in UNSET_PROPERTIES]
+
+
+ENTRIES = {
+    'entries of every status': every_status_fields,
+    'entries with unset fields': unset_fields,
+}
+
+
+def entry_responder(fields, count):
+    def respond(service, action, params):
+        json_format = params.get('format') == str(KALTURA_SERVICE_FORMAT_JSON)
+        if service == 'media' and action == 'list':
+            if json_format:
+                return payloads.list_response_json('media', count, fields)
+            return payloads.list_response_xml('media', count, fields)
+        if service == 'media' and action == 'get':
+            item = fields(int(params['entryId'].split('_')[1]))
+            if json_format:
+                return json.dumps(payloads.item_json(item)).encode('utf8')
+            return payloads.item_xml(item)
+        return ''
+    return respond
+
+
+def getter_entry_data(entry):
+    """The get_entry fields read from a KalturaMediaEntry, as it did."""
+    return {
+        'media_type': myKalturaObject.MEDIA_TYPE_NAMES[
+            entry.getMediaType().getValue()],
+        'url': entry.getDataUrl(),
+        'thumbnail_url_old': entry.getThumbnailUrl(),
+        'download_url': entry.getDownloadUrl(),
+        'plays': entry.getPlays(),
+        'views': entry.getViews(),
+        'rank': (entry.getRank(), entry.getTotalRank()),
+        'width': entry.getWidth(),
+        'height': entry.getHeight(),
+        'duration': entry.getDuration(),
+        'created': entry.getCreatedAt(),
+        'updated': entry.getUpdatedAt(),
+        'name': entry.getName(),
+        'description': entry.getDescription(),
+        'tags': entry.getTags(),
+        'searchtext': entry.getSearchText(),
+        'startDate': entry.getStartDate(),
+        'endDate': entry.getEndDate(),
+    }
+
+
+def typed(data):
+    # 1 == 1.0 == True; the output has to keep the types too
+    return dict((name, (type(value), value)) for (name, value) in data.items())
+
+
+def getter_entries(context):
+    entries = context.client.iterateList(context.client.media.list,
+                                         KalturaMediaEntryFilter())
+    return [object_entry(entry, KALTURA_ID) for entry in entries]
+
+
+@given(u'a local Kaltura stub serving {entries} in {format}')
+def given_stub(context, entries, format):
+    fields = ENTRIES[entries]
+    context.entry_count = max(len(STATUSES), len(MEDIA_TYPES),
+                              len(SOURCE_TYPES))
+    context.stub = KalturaStub(entry_responder(fields, context.entry_count))
+    context.stub.start()
+    context.add_cleanup(context.stub.stop)
+    config = KalturaConfiguration(99)
+    config.serviceUrl = context.stub.url
+    if format == 'json':
+        config.format = KALTURA_SERVICE_FORMAT_JSON
+    context.client = KalturaClient(config)
+    context.client.setKs('stub-ks')
+
+
+@when(u'searchVideos lists them with every field')
+def search_every_field(context):
+    context.entries = myKalturaObject.searchVideos(context.client, KALTURA_ID,
+                                                   True)
+
+
+@when(u'searchVideos lists them with the get_excel fields')
+def search_excel_fields(context):
+    # as get_excel asks for them, media_type for the types it skips
+    context.fields = list(myKalturaObject.DEFAULT_SEARCH_FIELD_LIST)
+    context.entries = myKalturaObject.searchVideos(
+        context.client, KALTURA_ID, True, fields=context.fields +
+        ['media_type'])
+
+
+@then(u'every entry is as read through the KalturaMediaEntry getters')
+def same_as_getters(context):
+    expected = getter_entries(context)
+    assert len(context.entries) == context.entry_count, context.entries
+    for (entry, old_entry) in zip(context.entries, expected):
+        assert typed(entry) == typed(old_entry), (entry, old_entry)
+
+
+@then(u'every entry has the get_excel fields as read through the '
+      u'KalturaMediaEntry getters')
+def excel_same_as_getters(context):
+    expected = getter_entries(context)
+    assert len(context.entries) == context.entry_count, context.entries
+    for (entry, old_entry) in zip(context.entries, expected):
+        for field in context.fields + ['media_type']:
+            assert typed(entry).get(field) == typed(old_entry).get(field), \
+                (field, entry.get(field), old_entry.get(field))
+
+
+def outcome(func, *args):
+    """What func returns, or the type of the exception it raises."""
+    try:
+        return func(*args)
+    except Exception as inst:
+        return type(inst)
+
+
+@when(u'get_entry gets each of them')
+def get_entries(context):
+    # get_entry without the settings of a Kaltura instance: the same calls
+    settings = {'SERVICE_URL': context.stub.url, 'PARTNER_ID': '99'}
+    thumbs_content = payloads.list_response_xml('thumbAsset', 4)
+    client = context.client
+    context.entries = []
+    context.getter_entries = []
+    for i in range(context.entry_count):
+        media_id = '0_%07d' % i
+        entry = client.projectObject(myKalturaObject.GET_ENTRY_PROPERTIES,
+                                     client.media.get, media_id)
+        context.entries.append(outcome(
+            myKalturaObject.entry_data, entry, media_id, settings,
+            client.getKs(), thumbs_content))
+        context.getter_entries.append(
+            outcome(getter_entry_data, client.media.get(media_id)))
+
+
+@then(u'every entry data is as read through the KalturaMediaEntry getters')
+def entry_data_same_as_getters(context):
+    for (entry, old_entry) in zip(context.entries, context.getter_entries):
+        if not isinstance(old_entry, dict):
+            # a media type without a name raised, and still does
+            assert entry == old_entry, (entry, old_entry)
+            continue
+        assert entry['success'], entry
+        # success, the ks and the thumbnail fields don't come from the entry
+        assert set(entry) - set(old_entry) == set(
+            ['success', 'ks', 'thumbnail_url', 'thumb_id']), entry
+        entry = dict((name, entry[name]) for name in old_entry)
+        assert typed(entry) == typed(old_entry), (entry, old_entry)
@@ -0,0 +1,85 @@
+import time
+import shutil
+import tempfile
+import threading
+
+import simplejson
+from behave import given, when, then
+
+try:
+    import urllib2
+except ImportError:
+    import urllib.request as urllib2
+
+from benchmarks.kaltura_stub import KalturaStub
+from benchmarks.kts_server import responder, entry_fields, kts_env, \
+    start_server, stop_server
+
+
+@given(u'a local Kaltura stub answering every call after {delay:d} ms')
+def given_delayed_stub(context, delay):
+    context.stub_delay = delay / 1000.0
+    context.stub = KalturaStub(responder, delay=context.stub_delay).start()
+    context.add_cleanup(context.stub.stop)
+
+
+@given(u'KTS served by {workers:d} gevent worker')
+@given(u'KTS served by {workers:d} gevent workers')
+def given_gevent_workers(context, workers):
+    try:
+        import gevent
+    except ImportError:
+        context.scenario.skip('gevent is not installed')
+        return
+    workdir = tempfile.mkdtemp(prefix='kts-gevent-')
+    context.add_cleanup(shutil.rmtree, workdir)
+    env = kts_env(context.stub.url, workdir, KTS_WORKER_CLASS='gevent')
+    process, port = start_server('gunicorn', workdir, env, workers)
+    context.add_cleanup(stop_server, process)
+    context.kts_url = 'http://127.0.0.1:%d' % port
+
+
+@when(u'{count:d} clients request get_media at once')
+def request_get_media(context, count):
+    url = '%s/service/get_media/?id=1:0_0000001' % context.kts_url
+    context.responses = []
+    context.errors = []
+    start = threading.Event()
+
+    def run(index):
+        start.wait()
+        try:
+            context.responses.append(
+                simplejson.loads(urllib2.urlopen(url, timeout=120).read()))
+        except Exception as e:
+            context.errors.append('client %d: %r' % (index, e))
+
+    threads = [threading.Thread(target=run, args=(index,))
+               for index in range(count)]
+    for thread in threads:
+        thread.start()
+    # the stub counts from here, not the calls of earlier steps
+    context.stub.stats['requests'] = 0
+    started = time.time()
+    start.set()
+    for thread in threads:
+        thread.join()
+    context.seconds = time.time() - started
+    context.request_count = count
+
+
+@then(u'every client gets the media entry')
+def every_client_gets_entry(context):
+    assert context.errors == [], '\n'.join(context.errors[:10])
+    name = dict(entry_fields(1))['name']
+    for response in context.responses:
+        assert response.get('success') is True, response
+        assert response['name'] == name, response
+
+
+@then(u'the requests took under a tenth of their time one after another')
+def requests_overlapped(context):
+    # get_media makes two Kaltura calls: media.get and thumbAsset.list
+    serial = context.request_count * 2 * context.stub_delay
+    assert context.seconds < serial / 10, \
+        'took %.1fs, one after another %.1fs' % (context.seconds, serial)
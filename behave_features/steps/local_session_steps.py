@@ -0,0 +1,76 @@
+from behave import given, when, then
+
+from KalturaClient import KalturaClient
+from KalturaCoreClient import KalturaSessionType
+import myKalturaObject
+
+ADMIN_SECRET = '0123456789abcdef0123456789abcdef'
+
+# session.start KSs of partner 1234567 signed with ADMIN_SECRET: an admin
+# KS of user kts with privileges disableentitlement, expiring 2030-01-01,
+# and one cut short after its type
+SESSION_START_KS = (
+    'NmZmNzliMTQ3MDFiOTYzZGFkNTdlNzNlNTM5MWRiNjZiMTY4NWU0ZnwxMjM0NTY3OzEy'
+    'MzQ1Njc7MTg5MzQ1NjAwMDsyOzE4MDQyODkzODM7a3RzO2Rpc2FibGVlbnRpdGxlbWVu'
+    'dDs7')
+SHORT_KS = (
+    'OTY3ZDA1NTM0ZjhhMzljMzU3YjBmOTcwYmRiOGVmZjk5YWQ2ODNmNHwxMjM0NTY3OzEy'
+    'MzQ1Njc7MTg5MzQ1NjAwMDsy')
+
+
+@given(u'an instance of partner {partner_id:d} for user {user}')
+def given_instance(context, partner_id, user):
+    context.settings = {'PARTNER_ID': str(partner_id), 'USER_NAME': user,
+                        'ADMIN_SECRET': ADMIN_SECRET}
+
+
+@given(u'the KS session.start returned for it')
+def given_remote_ks(context):
+    context.remote_ks = SESSION_START_KS
+
+
+@given(u'a session.start KS of 4 fields')
+def given_short_remote_ks(context):
+    context.remote_ks = SHORT_KS
+
+
+@given(u'the instance has another ADMIN_SECRET')
+def given_other_secret(context):
+    context.settings['ADMIN_SECRET'] = 'fedcba9876543210fedcba9876543210'
+
+
+@when(u'a KS with privileges {privileges} is generated locally')
+def generate_ks(context, privileges):
+    context.local_ks = myKalturaObject.generate_session_key(
+        context.settings, privileges)
+
+
+@then(u'the local KS is signed with the ADMIN_SECRET')
+def local_ks_signed(context):
+    assert KalturaClient.verifySession(context.local_ks, ADMIN_SECRET)
+    assert not KalturaClient.verifySession(context.local_ks, 'x' + ADMIN_SECRET)
+
+
+@then(u'it has the fields of the session.start KS')
+def local_ks_fields(context):
+    (_, remote) = KalturaClient.decodeSession(context.remote_ks)
+    (_, local) = KalturaClient.decodeSession(context.local_ks)
+    assert len(local) == len(remote), (local, remote)
+    # all but the expiry and the random number
+    for index in (0, 1, 3, 5, 6, 7, 8):
+        assert local[index] == remote[index], (index, local, remote)
+    assert local[3] == str(KalturaSessionType.ADMIN), local[3]
+
+
+@then(u'checking it against the session.start KS finds no problems')
+def no_problems(context):
+    problems = myKalturaObject.check_local_session_key(
+        context.settings, context.remote_ks, context.local_ks)
+    assert problems == [], problems
+
+
+@then(u'checking it against the session.start KS finds "{problem}"')
+def finds_problem(context, problem):
+    problems = myKalturaObject.check_local_session_key(
+        context.settings, context.remote_ks, context.local_ks)
+    assert problem in problems, problems
@@ -0,0 +1,73 @@
+from behave import given, when, then
+
+from KalturaClientBase import KalturaEnumsFactory
+from KalturaCoreClient import KalturaEntryStatus
+
+
+@when(u'KalturaEntryStatus {value} is decoded twice')
+def decode_twice(context, value):
+    context.enums = [KalturaEnumsFactory.create(value, 'KalturaEntryStatus')
+                     for _ in range(2)]
+
+
+@then(u'both are the same KalturaEntryStatus object')
+def same_object(context):
+    (first, second) = context.enums
+    assert first is second, (first, second)
+    assert isinstance(first, KalturaEntryStatus), first
+
+
+@then(u"its value can't be changed")
+def read_only(context):
+    enum = context.enums[0]
+    try:
+        enum.value = KalturaEntryStatus.DELETED
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError('a shared enum was changed')
+    assert enum.getValue() == KalturaEntryStatus.READY, enum.getValue()
+
+
+@given(u"a decoded KalturaEntryStatus {value} and two built with "
+       u"KalturaEntryStatus('{built}')")
+def given_enums(context, value, built):
+    context.enums = [KalturaEnumsFactory.create(value, 'KalturaEntryStatus'),
+                     KalturaEntryStatus(built), KalturaEntryStatus(built)]
+
+
+@when(u'they are put in a set and used as dict keys')
+def set_and_dict(context):
+    # the decoded enum again, as the next response would give it
+    context.enums.append(KalturaEnumsFactory.create(
+        context.enums[0].getValue(), 'KalturaEntryStatus'))
+    context.set = set(context.enums)
+    context.dict = dict((enum, index)
+                        for (index, enum) in enumerate(context.enums))
+
+
+@then(u'the set holds {count:d} enums')
+def set_size(context, count):
+    assert len(context.set) == count, context.set
+
+
+@then(u'every enum finds its own dict entry only')
+def own_entries(context):
+    (decoded, built, other_built, decoded_again) = context.enums
+    assert context.dict[decoded] == context.dict[decoded_again] == 3, \
+        context.dict
+    assert context.dict[built] == 1, context.dict
+    assert context.dict[other_built] == 2, context.dict
+    assert KalturaEntryStatus('2') not in context.dict
+    assert KalturaEntryStatus('2') not in context.set
+
+
+@then(u'the enums that compare equal have the same hash')
+def eq_hash_contract(context):
+    for first in context.enums:
+        for second in context.enums:
+            if first == second:
+                assert hash(first) == hash(second), (first, second)
+            assert (first == second) == (first is second), (first, second)
+            assert (first != second) == (first is not second), \
+                (first, second)
@@ -0,0 +1,54 @@
+import shutil
+import tempfile
+
+import simplejson
+from behave import given, when, then
+
+try:
+    import urllib2
+except ImportError:
+    import urllib.request as urllib2
+
+from benchmarks.kts_server import kts_env, start_server, stop_server
+
+WARMUP = {'skipped': '0', 'run': '1'}
+
+
+@given(u'KTS served by runtornado.py with the warm-up {warmup}')
+def given_tornado(context, warmup):
+    workdir = tempfile.mkdtemp(prefix='kts-warmup-')
+    context.add_cleanup(shutil.rmtree, workdir)
+    env = kts_env(context.stub.url, workdir, KTS_WARMUP=WARMUP[warmup])
+    process, port = start_server('tornado', workdir, env, workers=1)
+    context.add_cleanup(stop_server, process)
+    context.kts_url = 'http://127.0.0.1:%d' % port
+
+
+@when(u'/service/health is requested')
+def request_health(context):
+    url = '%s/service/health' % context.kts_url
+    try:
+        response = urllib2.urlopen(url, timeout=30)
+    except urllib2.HTTPError as e:
+        response = e
+    context.status = response.code
+    context.health = simplejson.loads(response.read())
+
+
+@then(u'it answers 200 and ready')
+def answers_ready(context):
+    assert context.status == 200, (context.status, context.health)
+    assert context.health['ready'] is True, context.health
+
+
+@then(u'no warm-up time is reported')
+def no_warmup_time(context):
+    assert context.health['warmup_seconds'] is None, context.health
+    assert context.health['instances'] == 0, context.health
+
+
+@then(u'the warm-up of {count:d} instance is reported, without errors')
+def warmup_reported(context, count):
+    assert context.health['warmup_seconds'] is not None, context.health
+    assert context.health['instances'] == count, context.health
+    assert context.health['errors'] == [], context.health
@@ -0,0 +1,142 @@
+import io
+import os
+
+from behave import given, when, then
+
+from KalturaClient import KalturaClient, KalturaConfiguration
+from KalturaClientBase import KalturaObjectBase, KalturaException
+from KalturaCaptionClientPlugin import KalturaCaptionAssetService
+import KalturaXmlDecoder
+
+RESPONSES_PATH = 'testing_assets/responses'
+
+
+class RecordedResponseClient(KalturaClient):
+    """A client answering every request with one recorded response."""
+
+    def __init__(self, response):
+        KalturaClient.__init__(self, KalturaConfiguration(99))
+        self.response = response
+
+    def openHttpRequest(self, url, params, files, requestTimeout):
+        return io.BytesIO(self.response)
+
+
+def multirequest(client):
+    client.startMultiRequest()
+    client.media.get('0_0000001')
+    client.media.get('0_missing')
+    KalturaCaptionAssetService(client).getUrl('0_cp00001')
+    return client.doMultiRequest()
+
+
+ACTIONS = {
+    'media.list': lambda client: client.media.list,
+    'media.get': lambda client: lambda: client.media.get('0_0000001'),
+    'thumbAsset.list': lambda client: client.thumbAsset.list,
+    'thumbAsset.getUrl':
+        lambda client: lambda: client.thumbAsset.getUrl('0_th00002'),
+    'captionAsset.list':
+        lambda client: KalturaCaptionAssetService(client).list,
+    'multirequest': lambda client: lambda: multirequest(client),
+}
+
+
+def describe(value):
+    """A comparable form of a decoded result."""
+    if isinstance(value, KalturaException):
+        return ('KalturaException', value.code, str(value))
+    if isinstance(value, KalturaObjectBase):
+        properties = {}
+        for cls in type(value).__mro__:
+            for name in cls.__dict__.get('PROPERTY_LOADERS', {}):
+                properties[name] = describe(getattr(value, name))
+        return (type(value).__name__, properties)
+    if hasattr(value, 'getValue'):
+        return (type(value).__name__, value.getValue())
+    if isinstance(value, (list, tuple)) or hasattr(value, 'consume'):
+        return [describe(item) for item in value]
+    return value
+
+
+def decode_with_every_backend(context, decode):
+    default_backend = KalturaXmlDecoder.getXmlBackend()
+    context.results = {}
+    try:
+        for backend in KalturaXmlDecoder.getXmlBackends():
+            KalturaXmlDecoder.setXmlBackend(backend)
+            client = RecordedResponseClient(context.response)
+            try:
+                result = decode(client)
+            except KalturaException as e:
+                result = e
+            context.results[backend] = (result, describe(result))
+    finally:
+        KalturaXmlDecoder.setXmlBackend(default_backend)
+
+
+@given(u'the recorded Kaltura response {response}')
+def given_recorded_response(context, response):
+    with open(os.path.join(RESPONSES_PATH, response), 'rb') as f:
+        context.response = f.read()
+
+
+@when(u'{action} is answered with it by every xml backend')
+def answer_action(context, action):
+    decode_with_every_backend(context,
+                              lambda client: ACTIONS[action](client)())
+
+
+@when(u'{action} is iterated over it by every xml backend')
+def iterate_action(context, action):
+    decode_with_every_backend(
+        context,
+        lambda client: list(client.iterateList(ACTIONS[action](client))))
+
+
+@then(u'every xml backend gives the same result')
+def same_results(context):
+    descriptions = [description for (result, description)
+                    in context.results.values()]
+    assert len(descriptions) > 0
+    for description in descriptions[1:]:
+        assert description == descriptions[0], \
+            'xml backends disagree: %s' % sorted(context.results.keys())
+
+
+@then(u'the result is a {kind} of {count:d} objects')
+def result_is_list_response(context, kind, count):
+    for (result, description) in context.results.values():
+        assert type(result).__name__ == kind
+        assert len(result.objects) == count == result.totalCount
+
+
+@then(u'the result is a list of {count:d} results')
+def result_is_list(context, count):
+    for (result, description) in context.results.values():
+        assert isinstance(result, list) and len(result) == count
+
+
+@then(u'the result is a string')
+def result_is_string(context):
+    for (result, description) in context.results.values():
+        assert result.startswith('http://')
+
+
+@then(u'the result is a KalturaException {code}')
+def result_is_exception(context, code):
+    for (result, description) in context.results.values():
+        assert isinstance(result, KalturaException) and result.code == code
+
+
+@then(u'the result is a {kind}')
+def result_is_object(context, kind):
+    for (result, description) in context.results.values():
+        assert type(result).__name__ == kind
+
+
+@then(u'no xml backend read the file of the entity')
+def entity_not_read(context):
+    for (result, description) in context.results.values():
+        assert result.getName() == 'Introduction  overview', result.getName()
+        assert result.getDescription() in (None, ''), result.getDescription()
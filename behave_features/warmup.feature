@@ -0,0 +1,18 @@
+Feature: Warm-up and readiness
+    KTS warms up its Kaltura instances when the app is imported, unless
+    KTS_WARMUP=0, and /service/health answers 503 until it is ready to take
+    traffic. Without a warm-up it is ready straight away.
+
+    Scenario: warm-up skipped
+        Given a local Kaltura stub answering every call after 0 ms
+          And KTS served by runtornado.py with the warm-up skipped
+         When /service/health is requested
+         Then it answers 200 and ready
+          And no warm-up time is reported
+
+    Scenario: warm-up run
+        Given a local Kaltura stub answering every call after 0 ms
+          And KTS served by runtornado.py with the warm-up run
+         When /service/health is requested
+         Then it answers 200 and ready
+          And the warm-up of 1 instance is reported, without errors
@@ -0,0 +1,38 @@
+Feature: XML parser backends
+    The Kaltura client parses xml responses with lxml when it is installed
+    and with the stdlib expat parser otherwise. Recorded responses replayed
+    through the service actions decode to the same results with either.
+
+    Scenario Outline: recorded response decoded by every backend
+        Given the recorded Kaltura response <response>
+         When <action> is answered with it by every xml backend
+         Then every xml backend gives the same result
+          And the result is <result>
+
+    Examples:
+        | response              | action            | result                                    |
+        | media_list.xml        | media.list        | a KalturaMediaListResponse of 3 objects   |
+        | media_get.xml         | media.get         | a KalturaMediaEntry                       |
+        | thumbasset_list.xml   | thumbAsset.list   | a KalturaThumbAssetListResponse of 3 objects |
+        | captionasset_list.xml | captionAsset.list | a KalturaCaptionAssetListResponse of 2 objects |
+        | thumbasset_geturl.xml | thumbAsset.getUrl | a string                                  |
+        | multirequest.xml      | multirequest      | a list of 3 results                       |
+        | error.xml             | media.get         | a KalturaException ENTRY_ID_NOT_FOUND     |
+
+    Scenario Outline: recorded list response streamed by every backend
+        Given the recorded Kaltura response <response>
+         When <action> is iterated over it by every xml backend
+         Then every xml backend gives the same result
+          And the result is a list of <count> results
+
+    Examples:
+        | response              | action            | count |
+        | media_list.xml        | media.list        | 3     |
+        | thumbasset_list.xml   | thumbAsset.list   | 3     |
+        | captionasset_list.xml | captionAsset.list | 2     |
+
+    Scenario: an external entity in a response
+        Given the recorded Kaltura response external_entity.xml
+         When media.get is answered with it by every xml backend
+         Then every xml backend gives the same result
+          And no xml backend read the file of the entity
@@ -0,0 +1,95 @@
+"""Benchmark of KalturaAsyncClient fanning calls out with asyncio.gather.
+
+Runs media.get calls against the local stub server
+(benchmarks/kaltura_stub), which waits --delay-ms before every response,
+standing in for the latency of a remote Kaltura API: one after another
+through KalturaClient, one after another through KalturaAsyncClient, and
+all at once through KalturaAsyncClient and asyncio.gather.  Reports the
+wall time and connections used for each.
+
+Usage (from the repository root):
+
+    python benchmarks/async_fanout.py --calls 100 --delay-ms 50
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from KalturaClient import KalturaClient, KalturaConfiguration
+from KalturaAsyncClient import KalturaAsyncClient
+from benchmarks.kaltura_stub import KalturaStub
+
+
+def make_client(client_class, stub):
+    config = KalturaConfiguration(99)
+    config.serviceUrl = stub.url
+    client = client_class(config)
+    client.setKs('stub-ks')
+    return client
+
+
+def run_sync(stub, calls):
+    client = make_client(KalturaClient, stub)
+    return [client.media.get('0_%d' % i) for i in range(calls)]
+
+
+async def get_sequential(client, calls):
+    return [await client.media.get('0_%d' % i) for i in range(calls)]
+
+
+async def get_gathered(client, calls):
+    return await asyncio.gather(*[client.media.get('0_%d' % i)
+                                  for i in range(calls)])
+
+
+def run_async(stub, calls, gather):
+    client = make_client(KalturaAsyncClient, stub)
+    if gather:
+        return asyncio.run(get_gathered(client, calls))
+    return asyncio.run(get_sequential(client, calls))
+
+
+def measure(stub, func, *args):
+    before = stub.stats['connections']
+    start = time.time()
+    entries = func(stub, *args)
+    seconds = time.time() - start
+    return (seconds, stub.stats['connections'] - before, entries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--calls', type=int, default=100)
+    parser.add_argument('--delay-ms', type=float, default=50.0)
+    args = parser.parse_args()
+
+    stub = KalturaStub(delay=args.delay_ms / 1000.0).start()
+    try:
+        timings = [
+            ('sync, sequential', measure(stub, run_sync, args.calls)),
+            ('async, sequential', measure(stub, run_async, args.calls,
+                                          False)),
+            ('async, gather', measure(stub, run_async, args.calls, True))]
+    finally:
+        stub.stop()
+
+    expected = ['0_%d' % i for i in range(args.calls)]
+    for (_, (_, _, entries)) in timings:
+        assert [entry.getId() for entry in entries] == expected
+
+    print ('%d media.get calls, %.0f ms per call upstream'
+           % (args.calls, args.delay_ms))
+    print ('%-18s %10s %12s %12s' % ('client', 'wall ms', 'ms/call',
+                                     'connections'))
+    for (name, (seconds, connections, _)) in timings:
+        print ('%-18s %10.1f %12.2f %12d' % (name, seconds * 1000,
+                                             seconds * 1000 / args.calls,
+                                             connections))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""Benchmark of KalturaCallBatcher sending independent calls as multirequests.
+
+Gets the url of --assets thumbnails from the local stub server
+(benchmarks/kaltura_stub), which waits --delay-ms before every response,
+standing in for the round trip to a remote Kaltura API: with one
+thumbAsset.getUrl request after another, as thumbnail_list does by default,
+and with the calls queued on a KalturaCallBatcher, in multirequests of at
+most --batch-size calls; then through KalturaAsyncClient, all at once with
+asyncio.gather and queued on a KalturaAsyncCallBatcher.  Reports the wall
+time and requests the stub served for each.
+
+Usage (from the repository root):
+
+    python benchmarks/call_batching.py --assets 20 --delay-ms 50
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from KalturaClient import KalturaClient, KalturaConfiguration
+from KalturaCallBatcher import KalturaCallBatcher
+from benchmarks.kaltura_stub import KalturaStub, multirequest_responder
+
+
+def responder(service, action, params):
+    return 'http://cdn.example.edu/%s/%s' % (service, params.get('id'))
+
+
+def make_client(client_class, stub):
+    config = KalturaConfiguration(99)
+    config.serviceUrl = stub.url
+    client = client_class(config)
+    client.setKs('stub-ks')
+    return client
+
+
+def run_sequential(stub, assets, batch_size):
+    client = make_client(KalturaClient, stub)
+    return [client.thumbAsset.getUrl('0_th%d' % i) for i in range(assets)]
+
+
+def run_batched(stub, assets, batch_size):
+    client = make_client(KalturaClient, stub)
+    batcher = KalturaCallBatcher(client, batch_size)
+    urls = [batcher.queue(client.thumbAsset.getUrl, '0_th%d' % i)
+            for i in range(assets)]
+    return [url.get() for url in urls]
+
+
+def run_async(stub, assets, batch_size, batched):
+    import asyncio
+    from KalturaAsyncClient import KalturaAsyncClient, \
+        KalturaAsyncCallBatcher
+
+    async def get_urls():
+        client = make_client(KalturaAsyncClient, stub)
+        if batched:
+            batcher = KalturaAsyncCallBatcher(client, batch_size)
+            action = batcher.queue
+        else:
+            action = lambda action, *args: action(*args)
+        return await asyncio.gather(*[
+            action(client.thumbAsset.getUrl, '0_th%d' % i)
+            for i in range(assets)])
+    return asyncio.run(get_urls())
+
+
+def measure(stub, func, *args):
+    before = stub.stats['requests']
+    start = time.time()
+    urls = func(stub, *args)
+    seconds = time.time() - start
+    return (seconds, stub.stats['requests'] - before, urls)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--assets', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--delay-ms', type=float, default=50.0)
+    args = parser.parse_args()
+
+    stub = KalturaStub(multirequest_responder(responder),
+                       delay=args.delay_ms / 1000.0).start()
+    try:
+        timings = [
+            ('sync, one by one', measure(stub, run_sequential, args.assets,
+                                         args.batch_size)),
+            ('sync, batched', measure(stub, run_batched, args.assets,
+                                      args.batch_size))]
+        if sys.version_info[0] > 2:
+            timings += [
+                ('async, gather', measure(stub, run_async, args.assets,
+                                          args.batch_size, False)),
+                ('async, batched', measure(stub, run_async, args.assets,
+                                           args.batch_size, True))]
+    finally:
+        stub.stop()
+
+    expected = ['http://cdn.example.edu/thumbasset/0_th%d' % i
+                for i in range(args.assets)]
+    for (_, (_, _, urls)) in timings:
+        assert list(urls) == expected
+
+    print ('%d thumbAsset.getUrl calls, %.0f ms per request upstream'
+           % (args.assets, args.delay_ms))
+    print ('%-18s %10s %10s' % ('calls', 'wall ms', 'requests'))
+    for (name, (seconds, requests, _)) in timings:
+        print ('%-18s %10.1f %10d' % (name, seconds * 1000, requests))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark of KalturaClient construction cost, with and without the pool.
+
+"before" builds a KalturaConfiguration and a KalturaClient per request, as
+create_session used to; "after" takes a client from
+myKalturaObject.client_pool and gives it back.  No network calls are made.
+
+Usage (from the repository root):
+
+    python benchmarks/client_construction.py --iterations 2000
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def timed(func, iterations):
+    start = time.time()
+    for _ in range(iterations):
+        func()
+    return (time.time() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='kts-client-bench-')
+    os.chdir(workdir)
+    os.environ['KALTURA_DEFINITIONS_DB'] = os.path.join(workdir, 'kaldefs.db')
+    start = time.time()
+    import myKalturaObject
+    import_seconds = time.time() - start
+    settings = myKalturaObject.get_kaltura_settings('1')
+    # GetConfig prints on every call; keep the output readable
+    devnull = open(os.devnull, 'w')
+
+    start = time.time()
+    myKalturaObject.KalturaClient(myKalturaObject.GetConfig(settings))
+    first_seconds = time.time() - start
+
+    def before():
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            myKalturaObject.KalturaClient(myKalturaObject.GetConfig(settings))
+        finally:
+            sys.stdout = stdout
+
+    def after():
+        client = myKalturaObject.client_pool.acquire(settings, 'ks')
+        myKalturaObject.client_pool.release(client)
+
+    before_seconds = timed(before, args.iterations)
+    after_seconds = timed(after, args.iterations)
+    shutil.rmtree(workdir)
+
+    print ('import myKalturaObject:     %8.1f ms' % (import_seconds * 1000))
+    print ('first client (cold):       %8.1f ms' % (first_seconds * 1000))
+    print ('per request, new client:   %8.1f us' % (before_seconds * 1e6))
+    print ('per request, pooled:       %8.1f us' % (after_seconds * 1e6))
+    print ('speedup:                   %8.1fx' % (before_seconds /
+                                                  after_seconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Concurrency benchmark for the Kaltura configurations store.
+
+Starts N reader processes that keep reading the configurations table through
+properties.read_kaltura_settings (the uncached path every worker falls back
+to after a config change) while one writer process keeps calling
+update_kaltura.  Reports reader throughput and latency percentiles, and the
+writer's commit rate.
+
+Usage (from the repository root):
+
+    python benchmarks/config_store_concurrency.py --readers 8 --seconds 5
+    KTS_CONFIG_WAL=0 python benchmarks/config_store_concurrency.py
+
+The second form runs the same load with readers on shared locks instead of
+WAL snapshots.  Everything runs in a scratch directory.
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * fraction))
+    return sorted_values[index]
+
+
+def reader(properties, deadline, results):
+    latencies = []
+    while time.time() < deadline:
+        start = time.time()
+        properties.read_kaltura_settings()
+        latencies.append(time.time() - start)
+    results.put(latencies)
+
+
+def writer(properties, deadline, pause, results):
+    commits = 0
+    while time.time() < deadline:
+        values = ['bench', 'www.example.com', '99', '1', '2', 'admin',
+                  'secret', 'bench@example.com', str(commits)]
+        properties.update_kaltura('1', values)
+        commits += 1
+        time.sleep(pause)
+    results.put(commits)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--write-pause', type=float, default=0.01,
+                        help='sleep between writer commits, in seconds')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='kts-config-bench-')
+    os.chdir(workdir)
+    os.environ['KALTURA_DEFINITIONS_DB'] = os.path.join(workdir, 'kaldefs.db')
+    import properties
+    properties.load_kaltura_settings()
+
+    deadline = time.time() + args.seconds
+    reader_results = multiprocessing.Queue()
+    writer_results = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=reader,
+                                     args=(properties, deadline,
+                                           reader_results))
+             for _ in range(args.readers)]
+    procs.append(multiprocessing.Process(target=writer,
+                                         args=(properties, deadline,
+                                               args.write_pause,
+                                               writer_results)))
+    for proc in procs:
+        proc.start()
+    latencies = []
+    for _ in range(args.readers):
+        latencies.extend(reader_results.get())
+    commits = writer_results.get()
+    for proc in procs:
+        proc.join()
+    shutil.rmtree(workdir)
+
+    latencies.sort()
+    print ('mode:            %s' % ('WAL snapshots' if properties.config_use_wal
+                                    else 'shared locks'))
+    print ('readers:         %d' % args.readers)
+    print ('reads/s (total): %.0f' % (len(latencies) / args.seconds))
+    print ('read p50:        %.3f ms' % (percentile(latencies, 0.50) * 1000))
+    print ('read p99:        %.3f ms' % (percentile(latencies, 0.99) * 1000))
+    print ('read max:        %.3f ms' % (percentile(latencies, 1.0) * 1000))
+    print ('writer commits:  %d' % commits)
+
+
+if __name__ == '__main__':
+    main()
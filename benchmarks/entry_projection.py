@@ -0,0 +1,140 @@
+"""Benchmark of searchVideos: Kaltura objects vs projected properties.
+
+Runs myKalturaObject.searchVideos over a synthetic media.list page
+(benchmarks/payloads), which loads only the properties its fields need
+straight into a dict per entry (client.projectList), against the same
+output built the way it used to be: a KalturaMediaEntry per item, read back
+through its getters, with the enum name tables built for every entry.  Also
+times searchVideos with the column list get_excel asks for by default.  No
+network calls are made: the client reads the page from memory, in the xml
+or the json response format.
+
+Usage (from the repository root):
+
+    python benchmarks/entry_projection.py --entries 500 --format json
+"""
+import io
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import payloads
+
+
+def object_entry(entry, kaltura_id):
+    """One searchVideos entry as it was built from a KalturaMediaEntry."""
+    import myKalturaObject
+    entryData = {}
+    status_codes = dict(myKalturaObject.ENTRY_STATUS_NAMES)
+    entryData['status'] = status_codes.get(entry.getStatus().getValue(),
+                                           'UNKNOWN')
+    entryData['url'] = entry.getDataUrl()
+    entryData['download_url'] = entry.getDownloadUrl()
+    entryData['thumbnail_url'] = entry.getThumbnailUrl()
+    typelist = dict(myKalturaObject.MEDIA_TYPE_NAMES)
+    sourcetypelist = dict(myKalturaObject.SOURCE_TYPE_NAMES)
+    entryData['media_type'] = typelist.get(entry.getMediaType().getValue(),
+                                           'UNKNOWN')
+    entryData['source_type'] = sourcetypelist.get(
+        entry.getSourceType().getValue(), 'UNKNOWN')
+    entryData['plays'] = entry.getPlays()
+    entryData['views'] = entry.getViews()
+    entryData['rank'] = '%s, %s' % (entry.getRank(), entry.getTotalRank())
+    entryData['width'] = entry.getWidth()
+    entryData['height'] = entry.getHeight()
+    entryData['duration'] = entry.getDuration()
+    entryData['created'] = entry.getCreatedAt()
+    entryData['updated'] = entry.getUpdatedAt()
+    entryData['name'] = entry.getName()
+    entryData['description'] = entry.getDescription()
+    entryData['tags'] = entry.getTags()
+    entryData['searchtext'] = entry.getSearchText()
+    entryData['startDate'] = entry.getStartDate()
+    entryData['endDate'] = entry.getEndDate()
+    entryData['conversionQuality'] = entry.getConversionQuality()
+    entryData['creditUrl'] = entry.getCreditUrl()
+    entryData['creditUserName'] = entry.getCreditUserName()
+    entryData['flavorParamsId'] = entry.getFlavorParamsIds()
+    entryData['mediaDate'] = entry.getMediaDate()
+    entryData['partner_id'] = entry.getPartnerId()
+    entryData['user_id'] = entry.getUserId()
+    entryData['id'] = 'kal:' + str(kaltura_id) + ':' + entry.getId()
+    return entryData
+
+
+def search_objects(client, kaltura_id):
+    from KalturaCoreClient import KalturaMediaEntryFilter
+    entries = client.iterateList(client.media.list, KalturaMediaEntryFilter())
+    return [object_entry(entry, kaltura_id) for entry in entries]
+
+
+def measure(func, repeat):
+    start = time.time()
+    for _ in range(repeat):
+        func()
+    return (time.time() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--entries', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--format', choices=['xml', 'json'], default='xml')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='kts-projection-bench-')
+    os.chdir(workdir)
+    os.environ['KALTURA_DEFINITIONS_DB'] = os.path.join(workdir, 'kaldefs.db')
+    import myKalturaObject
+    from KalturaClient import KalturaClient, KalturaConfiguration
+    from KalturaClientBase import KALTURA_SERVICE_FORMAT_JSON
+
+    config = KalturaConfiguration(99)
+    if args.format == 'json':
+        config.format = KALTURA_SERVICE_FORMAT_JSON
+        body = payloads.list_response_json('media', args.entries)
+    else:
+        body = payloads.list_response_xml('media', args.entries)
+
+    class PageClient(KalturaClient):
+        """Answers every action with the same media.list page."""
+
+        def openActionRequest(self, caller, action, args, kwargs):
+            return ('media.list', io.BytesIO(body))
+
+    client = PageClient(config)
+    # searchVideos prints on every call; keep the output readable
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        excel_fields = (list(myKalturaObject.DEFAULT_SEARCH_FIELD_LIST) +
+                        ['media_type'])
+        assert (search_objects(client, 1) ==
+                myKalturaObject.searchVideos(client, 1, True))
+        timings = [
+            ('objects', measure(lambda: search_objects(client, 1),
+                                args.repeat)),
+            ('projected', measure(
+                lambda: myKalturaObject.searchVideos(client, 1, True),
+                args.repeat)),
+            ('excel fields', measure(
+                lambda: myKalturaObject.searchVideos(
+                    client, 1, True, fields=excel_fields),
+                args.repeat))]
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+    print ('media.list page: %d entries, %s' % (args.entries, args.format))
+    print ('%-14s %10s %12s' % ('searchVideos', 'ms/page', 'us/entry'))
+    for (name, seconds) in timings:
+        print ('%-14s %10.1f %12.1f' % (name, seconds * 1000,
+                                        seconds / args.entries * 1e6))
+
+
+if __name__ == '__main__':
+    main()
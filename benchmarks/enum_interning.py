@@ -0,0 +1,129 @@
+"""Benchmark of enum allocation when decoding a list response.
+
+Decodes a synthetic media.list page (benchmarks/payloads) with
+KalturaEnumsFactory handing out one shared enum object per (type, value),
+and with a new enum object for every enum field as it used to.  Reports the
+enum objects the entries end up referencing, the memory blocks allocated
+for the decoded page (tracemalloc) and the time per page.  Then decodes
+--pages pages with a client plugin registering its types between two pages,
+as they do when a worker first meets them, with the shared enums dropped at
+every registration as they first were, and with only those of the enums a
+plugin replaces dropped; and reports the enum objects all the pages
+reference.
+
+Usage (from the repository root):
+
+    python benchmarks/enum_interning.py --entries 500 --pages 20
+"""
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+from xml.dom import minidom
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from KalturaClient import KalturaClient, KalturaConfiguration
+from KalturaClientBase import KalturaObjectFactory, KalturaEnumsFactory, \
+    getChildNodeByXPath, loadPluginObjects
+from KalturaCoreClient import KalturaMediaEntry
+from benchmarks import payloads
+
+interned_create = KalturaEnumsFactory.create
+
+
+def uninterned_create(enumValue, enumType):
+    """KalturaEnumsFactory.create without the shared instances."""
+    return KalturaEnumsFactory.enumFactories[enumType](enumValue)
+
+
+register_enums = KalturaEnumsFactory.registerEnums
+
+
+def clearing_register_enums(objs):
+    """KalturaEnumsFactory.registerEnums dropping every shared enum."""
+    KalturaEnumsFactory.enumFactories.update(objs)
+    KalturaEnumsFactory.enumInstances.clear()
+
+
+def decode(objects_node):
+    return KalturaObjectFactory.createArray(objects_node, KalturaMediaEntry)
+
+
+def enum_objects(entries):
+    found = set()
+    for entry in entries:
+        for name in KalturaObjectFactory.getPropertyLoaders(entry.__class__):
+            value = getattr(entry, name)
+            if hasattr(value, 'getValue'):
+                found.add(id(value))
+    return len(found)
+
+
+def measure_with_plugins(objects_node, pages):
+    """Enum objects referenced by `pages` decoded pages, with a plugin
+    registered after each."""
+    plugins = sorted(set(KalturaEnumsFactory.lazyEnumModules.values()))
+    entries = []
+    for page in range(pages):
+        entries.extend(decode(objects_node))
+        loadPluginObjects(plugins[page % len(plugins)])
+    return enum_objects(entries)
+
+
+def measure(objects_node, repeat):
+    decode(objects_node)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    entries = decode(objects_node)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, 'lineno'))
+    start = time.time()
+    for _ in range(repeat):
+        decode(objects_node)
+    return (enum_objects(entries), blocks, (time.time() - start) / repeat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--entries', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--pages', type=int, default=20)
+    args = parser.parse_args()
+
+    # registers the core types
+    KalturaClient(KalturaConfiguration(99))
+    document = minidom.parseString(
+        payloads.list_response_xml('media', args.entries))
+    objects_node = getChildNodeByXPath(document, 'xml/result/objects')
+
+    print ('media.list page: %d entries' % args.entries)
+    print ('%-12s %12s %16s %10s' % ('enums', 'enum objects',
+                                     'blocks allocated', 'ms/page'))
+    for (name, create) in (('new each', uninterned_create),
+                           ('interned', interned_create)):
+        KalturaEnumsFactory.create = staticmethod(create)
+        try:
+            (enums, blocks, seconds) = measure(objects_node, args.repeat)
+        finally:
+            KalturaEnumsFactory.create = staticmethod(interned_create)
+        print ('%-12s %12d %16d %10.1f' % (name, enums, blocks,
+                                           seconds * 1000))
+
+    print ('%d pages, a plugin registered after each' % args.pages)
+    print ('%-24s %12s' % ('on registration', 'enum objects'))
+    for (name, register) in (('all dropped', clearing_register_enums),
+                             ('replaced ones dropped', register_enums)):
+        KalturaEnumsFactory.enumInstances.clear()
+        KalturaEnumsFactory.registerEnums = staticmethod(register)
+        try:
+            enums = measure_with_plugins(objects_node, args.pages)
+        finally:
+            KalturaEnumsFactory.registerEnums = staticmethod(register_enums)
+        print ('%-24s %12d' % (name, enums))
+
+
+if __name__ == '__main__':
+    main()
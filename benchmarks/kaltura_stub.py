@@ -0,0 +1,170 @@
+"""A local stand-in for the Kaltura API server, for benchmarks.
+
+Answers POSTs to /api_v3/index.php with the XML envelope the client expects,
+over HTTP/1.1 keep-alive.  Responses come from a responder function taking
+(service, action, params) and returning the inner XML of <result> (or a
+complete response body, as bytes).  The
+defaults cover session.start and single media entries.  Optional delays
+simulate connection setup (DNS/TCP/TLS) and server round trips, and the stub
+counts the connections and requests it served.
+
+    stub = KalturaStub(setup_delay=0.02)
+    stub.start()
+    ... point a KalturaConfiguration at stub.url ...
+    stub.stop()
+"""
+import re
+import sys
+import time
+import socket
+import threading
+
+try:
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+    from SocketServer import ThreadingMixIn
+    from urlparse import urlparse, parse_qsl
+except ImportError:
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    from socketserver import ThreadingMixIn
+    from urllib.parse import urlparse, parse_qsl
+
+RESPONSE_TEMPLATE = ('<?xml version="1.0" encoding="utf-8"?><xml>'
+                     '<result>%s</result><executionTime>0.001</executionTime>'
+                     '</xml>')
+
+REFERENCE_PATTERN = re.compile(r'^\{(\d+):result(?::(\w+))?\}$')
+
+MEDIA_ENTRY_TEMPLATE = (
+    '<objectType>KalturaMediaEntry</objectType><id>%(id)s</id>'
+    '<name>Entry %(id)s</name><description>stub entry</description>'
+    '<partnerId>99</partnerId><userId>stub</userId><tags>a,b</tags>'
+    '<status>2</status><type>1</type><createdAt>1400000000</createdAt>'
+    '<updatedAt>1400000000</updatedAt><thumbnailUrl>http://stub/thumb'
+    '</thumbnailUrl><downloadUrl>http://stub/download</downloadUrl>'
+    '<plays>10</plays><views>20</views><duration>60</duration>'
+    '<mediaType>1</mediaType><width>640</width><height>360</height>')
+
+
+def media_entry(entry_id):
+    return MEDIA_ENTRY_TEMPLATE % {'id': entry_id}
+
+
+def default_responder(service, action, params):
+    if service == 'session' and action == 'start':
+        return 'stub-ks-%s' % params.get('partnerId', '')
+    if action == 'get':
+        return media_entry(params.get('entryId', '0_stub'))
+    return ''
+
+
+def resolve_reference(value, results):
+    """The value of a `{N:result:name}` param, from the result of call N, as
+    the Kaltura server resolves it: its <name> (the whole result for
+    `{N:result}`); other values as they are."""
+    match = REFERENCE_PATTERN.match(value)
+    if match is None:
+        return value
+    (index, name) = match.groups()
+    result = results[int(index) - 1]
+    if name is None:
+        return result
+    field = re.search('<%s>(.*?)</%s>' % (name, name), result)
+    return field.group(1) if field else ''
+
+
+def multirequest_responder(responder):
+    """Wrap a responder of single calls to also answer multirequests, with
+    an <item> per call; `{N:result...}` params are resolved first."""
+    def respond(service, action, params):
+        if service != 'multirequest':
+            return responder(service, action, params)
+        results = []
+        index = 1
+        while '%d:service' % index in params:
+            prefix = '%d:' % index
+            call_params = dict((name[len(prefix):],
+                                resolve_reference(value, results))
+                               for (name, value) in params.items()
+                               if name.startswith(prefix))
+            results.append(responder(call_params.pop('service'),
+                                     call_params.pop('action'), call_params))
+            index += 1
+        return ''.join('<item>%s</item>' % result for result in results)
+    return respond
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        # headers and body go out in separate writes; don't let Nagle and
+        # delayed ACKs add 40ms to every keep-alive response
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.server.count('connections')
+        if self.server.setup_delay:
+            time.sleep(self.server.setup_delay)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length)
+        query = dict(parse_qsl(urlparse(self.path).query))
+        params = {}
+        if self.headers.get('Content-Type', '').startswith(
+                'application/x-www-form-urlencoded'):
+            params = dict(parse_qsl(body.decode('utf8')))
+        self.server.count('requests')
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        result = self.server.responder(query.get('service'),
+                                       query.get('action'), params)
+        if isinstance(result, bytes):
+            # a complete response body, e.g. from benchmarks.payloads
+            payload = result
+        else:
+            payload = (RESPONSE_TEMPLATE % result).encode('utf8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/xml; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class KalturaStub(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    # many clients connect at once in the concurrency tests; the default
+    # listen backlog of 5 makes the kernel reset some of them
+    request_queue_size = 128
+
+    def __init__(self, responder=default_responder, delay=0.0,
+                 setup_delay=0.0, port=0):
+        HTTPServer.__init__(self, ('127.0.0.1', port), StubHandler)
+        self.responder = responder
+        self.delay = delay
+        self.setup_delay = setup_delay
+        self.stats = {'connections': 0, 'requests': 0}
+        self._stats_lock = threading.Lock()
+        self.url = 'http://127.0.0.1:%d' % self.server_address[1]
+
+    def handle_error(self, request, client_address):
+        # clients hanging up mid-response (timeouts) are expected here
+        if not isinstance(sys.exc_info()[1], socket.error):
+            HTTPServer.handle_error(self, request, client_address)
+
+    def count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever,
+                                  name='kaltura-stub')
+        thread.daemon = True
+        thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,67 @@
+"""Benchmark of the Kaltura transport with and without keep-alive.
+
+Runs media.get calls against the local stub server (benchmarks/kaltura_stub),
+once through urllib with a new connection per call and once through
+KalturaClient's keep-alive pool.  --setup-ms adds a delay to every new
+connection, standing in for DNS, TCP and TLS setup to a remote API node.
+
+Usage (from the repository root):
+
+    python benchmarks/keepalive_transport.py --calls 500 --setup-ms 20
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from KalturaClient import KalturaClient, KalturaConfiguration
+from benchmarks.kaltura_stub import KalturaStub
+
+
+def run(stub, calls, keep_alive):
+    config = KalturaConfiguration(99)
+    config.serviceUrl = stub.url
+    config.keepAlive = keep_alive
+    client = KalturaClient(config)
+    client.setKs('stub-ks')
+    before = dict(stub.stats)
+    latencies = []
+    for i in range(calls):
+        start = time.time()
+        client.media.get('0_%d' % i)
+        latencies.append(time.time() - start)
+    latencies.sort()
+    return {
+        'avg_ms': sum(latencies) / len(latencies) * 1000,
+        'p99_ms': latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        'connections': stub.stats['connections'] - before['connections'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--calls', type=int, default=500)
+    parser.add_argument('--setup-ms', type=float, default=20.0)
+    args = parser.parse_args()
+
+    stub = KalturaStub(setup_delay=args.setup_ms / 1000.0).start()
+    try:
+        without = run(stub, args.calls, False)
+        pooled = run(stub, args.calls, True)
+    finally:
+        stub.stop()
+
+    print ('%-24s %10s %10s %12s' % ('transport', 'avg ms', 'p99 ms',
+                                     'connections'))
+    for (name, result) in (('urllib, new connection', without),
+                           ('keep-alive pool', pooled)):
+        print ('%-24s %10.2f %10.2f %12d' % (name, result['avg_ms'],
+                                             result['p99_ms'],
+                                             result['connections']))
+    print ('pool stats: %s' % KalturaClient.connectionPool.info())
+
+
+if __name__ == '__main__':
+    main()
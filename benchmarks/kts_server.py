@@ -0,0 +1,143 @@
+"""KTS served in its own processes against the local Kaltura stub.
+
+The stub (benchmarks/kaltura_stub) plays the Kaltura API with `responder`,
+which answers the calls the /service endpoints make with complete entries.
+`kts_env` points the first Kaltura instance of a fresh definitions db in
+`workdir` at it, with locally generated sessions.  `start_server` then runs
+KTS by gunicorn with gunicorn_conf.py, or by runtornado.py, on a free port,
+and returns once it accepts connections:
+
+    stub = KalturaStub(responder, delay=0.1).start()
+    env = kts_env(stub.url, workdir, KTS_WORKER_CLASS='gevent')
+    process, port = start_server('gunicorn', workdir, env, workers=1)
+    ... GET http://127.0.0.1:<port>/service/get_media/?id=1:0_0000001 ...
+    stop_server(process)
+    stub.stop()
+"""
+import os
+import sys
+import time
+import signal
+import socket
+import subprocess
+
+from benchmarks import payloads
+from benchmarks.kaltura_stub import multirequest_responder
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# media entry properties KTS reads that the listing payloads leave out
+EXTRA_ENTRY_FIELDS = [
+    ('dataUrl', 'http://cdn.example.edu/p/1234567/flvclipper'),
+    ('searchText', 'lecture recording'), ('startDate', ''),
+    ('endDate', ''), ('sourceType', '1'), ('conversionQuality', '3'),
+    ('creditUrl', ''), ('creditUserName', ''), ('flavorParamsIds', '0,2'),
+    ('mediaDate', ''),
+]
+
+GUNICORN_CONF = '''
+exec(open(%(conf)r).read())
+bind = '127.0.0.1:%(port)d'
+daemon = False
+pidfile = None
+accesslog = None
+errorlog = %(log)r
+'''
+
+
+def entry_fields(i):
+    fields = payloads.media_entry_fields(i)
+    names = set(name for (name, _) in fields)
+    return fields + [(name, value) for (name, value) in EXTRA_ENTRY_FIELDS
+                     if name not in names]
+
+
+def result_xml(body):
+    body = body.decode('utf8')
+    return body[body.index('<result>') + 8:body.rindex('</result>')]
+
+
+def call_responder(service, action, params):
+    if service == 'media' and action == 'get':
+        return payloads.item_xml(entry_fields(1))
+    if service == 'media' and action == 'list':
+        return payloads.list_response_xml('media', 30, entry_fields)
+    if service == 'thumbasset' and action == 'list':
+        return result_xml(payloads.list_response_xml('thumbAsset', 4))
+    if service == 'caption_captionasset' and action == 'list':
+        return result_xml(payloads.list_response_xml('captionAsset', 4))
+    if action == 'getUrl':
+        return 'http://cdn.example.edu/%s/%s' % (service, params.get('id'))
+    return ''
+
+
+# the multirequests of KTS_BATCH_CALLS too
+responder = multirequest_responder(call_responder)
+
+
+def kts_env(stub_url, workdir, **overrides):
+    env = dict(os.environ)
+    env.update({
+        'PYTHONPATH': ROOT,
+        'KALTURA_DEFINITIONS_DB': os.path.join(workdir, 'kaldefs.db'),
+        'KS_CACHE_DB': os.path.join(workdir, 'ks-cache.db'),
+        'UPLOAD_FOLDER': workdir,
+        'KTS_WARMUP': '0',
+        'KTS_THREADS': '1',
+        # the first instance, created with the db: the stub, local KS
+        'k_1_KALTURA_PATH': stub_url.split('://', 1)[1],
+        'k_1_PARTNER_ID': '99',
+        'k_1_ADMIN_SECRET': 'stub-admin-secret',
+        'k_1_USER_NAME': 'kts',
+        'k_1_KS_MODE': 'local',
+    })
+    env.update(overrides)
+    return env
+
+
+def free_port():
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def start_server(kind, workdir, env, workers):
+    """Start KTS with `kind` 'gunicorn' or 'tornado'; returns (process,
+    port)."""
+    port = free_port()
+    env = dict(env, KTS_WORKERS=str(workers))
+    log = open(os.path.join(workdir, '%s.log' % kind), 'w')
+    if kind == 'gunicorn':
+        conf = os.path.join(workdir, 'gunicorn_bench_conf.py')
+        with open(conf, 'w') as f:
+            f.write(GUNICORN_CONF % {
+                'conf': os.path.join(ROOT, 'gunicorn_conf.py'),
+                'port': port, 'log': os.path.join(workdir, 'gunicorn.log')})
+        command = [sys.executable, '-m', 'gunicorn', '-c', conf, 'server:app']
+    else:
+        command = [sys.executable, os.path.join(ROOT, 'runtornado.py'),
+                   str(port)]
+    # a session of its own, so stopping it takes its workers down too
+    process = subprocess.Popen(command, cwd=workdir, env=env, stdout=log,
+                               stderr=subprocess.STDOUT,
+                               preexec_fn=os.setsid)
+    deadline = time.time() + 60
+    while True:
+        try:
+            socket.create_connection(('127.0.0.1', port), 1).close()
+            return process, port
+        except socket.error:
+            if process.poll() is not None or time.time() > deadline:
+                stop_server(process)
+                raise Exception('%s did not start, see %s' % (kind, log.name))
+            time.sleep(0.2)
+
+
+def stop_server(process):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except OSError:
+        pass
+    process.wait()
@@ -0,0 +1,104 @@
+"""Benchmark of finding one item in a list response, eager vs lazy objects.
+
+Takes a synthetic thumbAsset.list page (benchmarks/payloads), parsed once,
+whose default thumbnail sits halfway down the list, and finds the last
+default thumbnail the way thumbnail_get_default does: once by creating every
+KalturaThumbAsset up front (createArray, as list responses used to) and once
+through the response's lazy objects, consumed one at a time.  Reports the
+time per page, how many thumbnail objects were created and how many were
+alive at once.
+
+Usage (from the repository root):
+
+    python benchmarks/lazy_lists.py --thumbs 200
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from KalturaClient import KalturaClient, KalturaConfiguration
+from KalturaClientBase import KalturaObjectFactory, KalturaObjectBase, \
+    getChildNodeByXPath
+from KalturaCoreClient import KalturaThumbAsset
+from benchmarks import payloads
+
+created = {'count': 0, 'alive': 0, 'peak': 0}
+
+
+class CountedThumbAsset(KalturaThumbAsset):
+    __slots__ = ()
+    PROPERTY_LOADERS = {}
+
+    def __init__(self):
+        KalturaThumbAsset.__init__(self)
+        created['count'] += 1
+        created['alive'] += 1
+        created['peak'] = max(created['peak'], created['alive'])
+
+    def __del__(self):
+        created['alive'] -= 1
+
+
+def find_default_eager(result):
+    thumbs = KalturaObjectFactory.createArray(
+        getChildNodeByXPath(result, 'objects'), KalturaThumbAsset)
+    default = None
+    for thumb in thumbs:
+        if thumb.getTags() == 'default_thumb':
+            default = thumb
+    return default
+
+
+def find_default_lazy(result):
+    response = KalturaObjectFactory.create(result, KalturaObjectBase)
+    default = None
+    for thumb in response.objects.consume():
+        if thumb.getTags() == 'default_thumb':
+            default = thumb
+    return default
+
+
+def measure(func, result, repeat):
+    created.update(count=0, alive=0, peak=0)
+    assert func(result).getTags() == 'default_thumb'
+    (count, peak) = (created['count'], created['peak'])
+    start = time.time()
+    for _ in range(repeat):
+        func(result)
+    return ((time.time() - start) / repeat, count, peak)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--thumbs', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    def thumb_fields(i):
+        fields = payloads.thumb_asset_fields(i)
+        if i == args.thumbs // 2:
+            fields = [(name, 'default_thumb' if name == 'tags' else value)
+                      for (name, value) in fields]
+        return fields
+
+    client = KalturaClient(KalturaConfiguration(99))
+    KalturaObjectFactory.registerObjects(
+        {'KalturaThumbAsset': CountedThumbAsset})
+    result = client.parsePostResult(
+        payloads.list_response_xml('thumbAsset', args.thumbs, thumb_fields))
+
+    print ('thumbAsset.list page: %d thumbnails, default at %d'
+           % (args.thumbs, args.thumbs // 2))
+    print ('%-10s %10s %16s %14s' % ('objects', 'us/page', 'thumbs created',
+                                     'alive at once'))
+    for (name, func) in (('eager', find_default_eager),
+                         ('lazy', find_default_lazy)):
+        (seconds, count, peak) = measure(func, result, args.repeat)
+        print ('%-10s %10.0f %16d %14d' % (name, seconds * 1e6, count, peak))
+
+
+if __name__ == '__main__':
+    main()
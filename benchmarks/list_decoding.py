@@ -0,0 +1,75 @@
+"""Benchmark of decoding a large list response: whole DOM vs streaming.
+
+Decodes a synthetic media.list page (benchmarks/payloads) the way
+client.media.list does (minidom, then Kaltura objects for every item), and
+through KalturaListIterator, which builds each item from parse events and
+drops it once consumed.  Both consume the entries the way searchVideos does,
+keeping one small dict per entry.  Reports time and tracemalloc peak.
+
+Usage (from the repository root):
+
+    python benchmarks/list_decoding.py --entries 500
+"""
+import io
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from KalturaClient import KalturaClient, KalturaConfiguration, \
+    KalturaListIterator
+from KalturaCoreClient import KalturaObjectFactory, KalturaMediaListResponse
+from benchmarks import payloads
+
+
+def summarize(entry):
+    return {'id': entry.getId(), 'name': entry.getName(),
+            'plays': entry.getPlays(), 'status': entry.getStatus().getValue()}
+
+
+def decode_dom(client, body):
+    result = client.parsePostResult(body)
+    response = KalturaObjectFactory.create(result, KalturaMediaListResponse)
+    return [summarize(entry) for entry in response.objects]
+
+
+def decode_streaming(client, body):
+    listing = KalturaListIterator(client, io.BytesIO(body), 'media.list')
+    return [summarize(entry) for entry in listing]
+
+
+def measure(func, client, body, repeat):
+    tracemalloc.start()
+    func(client, body)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    start = time.time()
+    for _ in range(repeat):
+        func(client, body)
+    return (time.time() - start) / repeat, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--entries', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    client = KalturaClient(KalturaConfiguration(99))
+    body = payloads.list_response_xml('media', args.entries)
+    assert decode_dom(client, body) == decode_streaming(client, body)
+    print ('media.list page: %d entries, %.0f kB of xml'
+           % (args.entries, len(body) / 1024.0))
+    print ('%-12s %10s %14s' % ('decoder', 'ms/page', 'peak alloc MB'))
+    for (name, func) in (('minidom', decode_dom),
+                         ('streaming', decode_streaming)):
+        (seconds, peak) = measure(func, client, body, args.repeat)
+        print ('%-12s %10.1f %14.2f' % (name, seconds * 1000,
+                                        peak / 1048576.0))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Benchmark of building Kaltura objects from a parsed list response.
+
+Times KalturaObjectFactory.createArray over the objects of a synthetic
+media.list page (benchmarks/payloads), already parsed with minidom, against
+the same loop going through each object's generated fromXml, which runs
+fromXmlImpl once per class in the inheritance chain (KalturaMediaEntry ->
+KalturaPlayableEntry -> KalturaBaseEntry).
+
+Usage (from the repository root):
+
+    python benchmarks/object_decoding.py --entries 500
+"""
+import os
+import sys
+import time
+import argparse
+from xml.dom import minidom
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from KalturaClient import KalturaClient, KalturaConfiguration
+from KalturaClientBase import KalturaObjectFactory, getChildNodeByXPath, \
+    getXmlNodeText
+from KalturaCoreClient import KalturaMediaEntry
+from benchmarks import payloads
+
+
+def create_array_from_xml(objects_node, expected_type):
+    """createArray as it was before the per-class deserializers."""
+    results = []
+    for node in objects_node.childNodes:
+        obj_type = getXmlNodeText(getChildNodeByXPath(node, 'objectType'))
+        result = KalturaObjectFactory.objectFactories[obj_type]()
+        assert isinstance(result, expected_type)
+        result.fromXml(node)
+        results.append(result)
+    return results
+
+
+def properties(obj):
+    values = {}
+    for name in KalturaObjectFactory.getPropertyLoaders(obj.__class__):
+        value = getattr(obj, name)
+        if hasattr(value, 'getValue'):
+            value = value.getValue()
+        values[name] = value
+    return values
+
+
+def measure(func, objects_node, repeat):
+    start = time.time()
+    for _ in range(repeat):
+        func(objects_node, KalturaMediaEntry)
+    return (time.time() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--entries', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    # registers the core types
+    KalturaClient(KalturaConfiguration(99))
+    document = minidom.parseString(
+        payloads.list_response_xml('media', args.entries))
+    objects_node = getChildNodeByXPath(document, 'xml/result/objects')
+    assert ([properties(entry) for entry in
+             create_array_from_xml(objects_node, KalturaMediaEntry)] ==
+            [properties(entry) for entry in
+             KalturaObjectFactory.createArray(objects_node,
+                                              KalturaMediaEntry)])
+
+    print ('media.list page: %d entries' % args.entries)
+    print ('%-26s %10s %12s' % ('loader', 'ms/page', 'us/entry'))
+    for (name, func) in (('fromXml per class', create_array_from_xml),
+                         ('merged deserializer',
+                          KalturaObjectFactory.createArray)):
+        seconds = measure(func, objects_node, args.repeat)
+        print ('%-26s %10.2f %12.1f' % (name, seconds * 1000,
+                                        seconds / args.entries * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Benchmark of the memory held by decoded Kaltura objects.
+
+Decodes a synthetic media.list page (benchmarks/payloads) into
+KalturaMediaEntry objects, which keep their properties in __slots__, and
+into copies of the same class hierarchy built without slots, whose
+instances carry a __dict__ as the generated classes used to.  Reports the
+memory the decoded entries hold (tracemalloc), what was allocated while
+decoding them, and the time per page.
+
+Usage (from the repository root):
+
+    python benchmarks/object_memory.py --entries 2000
+"""
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+from xml.dom import minidom
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from KalturaClient import KalturaClient, KalturaConfiguration
+from KalturaClientBase import KalturaObjectFactory, getChildNodeByXPath
+from KalturaCoreClient import KalturaMediaEntry
+from benchmarks import payloads
+
+
+def without_slots(cls):
+    """A copy of cls and its bases made with plain type(), so instances
+    get a __dict__ instead of slots."""
+    if cls.__bases__ == (object,):
+        return object
+    base = without_slots(cls.__bases__[0])
+    slots = cls.__dict__.get('__slots__', ())
+    namespace = dict((name, value) for (name, value) in cls.__dict__.items()
+                     if name not in slots and
+                     name not in ('__slots__', '__dict__', '__weakref__'))
+    return type(cls.__name__, (base,), namespace)
+
+
+def decode(objects_node):
+    return KalturaObjectFactory.createArray(objects_node, object)
+
+
+def measure(objects_node, repeat):
+    tracemalloc.start()
+    entries = decode(objects_node)
+    (held, peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del entries
+    start = time.time()
+    for _ in range(repeat):
+        decode(objects_node)
+    return (held, peak, (time.time() - start) / repeat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--entries', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    # registers the core types
+    KalturaClient(KalturaConfiguration(99))
+    document = minidom.parseString(
+        payloads.list_response_xml('media', args.entries))
+    objects_node = getChildNodeByXPath(document, 'xml/result/objects')
+
+    factories = KalturaObjectFactory.objectFactories
+    print ('media.list page: %d entries' % args.entries)
+    print ('%-12s %12s %12s %12s %10s' % ('objects', 'held kB', 'bytes/entry',
+                                          'peak kB', 'ms/page'))
+    for (name, cls) in (('__dict__', without_slots(KalturaMediaEntry)),
+                        ('__slots__', KalturaMediaEntry)):
+        factories['KalturaMediaEntry'] = cls
+        try:
+            (held, peak, seconds) = measure(objects_node, args.repeat)
+        finally:
+            factories['KalturaMediaEntry'] = KalturaMediaEntry
+        print ('%-12s %12.0f %12.0f %12.0f %10.1f' % (
+            name, held / 1024.0, float(held) / args.entries, peak / 1024.0,
+            seconds * 1000))
+
+
+if __name__ == '__main__':
+    main()
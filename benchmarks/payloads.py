@@ -0,0 +1,160 @@
+"""Synthetic Kaltura API responses for the benchmarks.
+
+Builds media.list, thumbAsset.list and captionAsset.list responses shaped
+like the ones a Kaltura server returns for KTS's listing calls (the same
+fields, objectType tags and nesting), with deterministic values, in the xml
+and json (format=1) encodings.
+"""
+import json
+from xml.sax.saxutils import escape
+
+RESPONSE_TEMPLATE = ('<?xml version="1.0" encoding="utf-8"?><xml>'
+                     '<result>%s</result><executionTime>0.0421</executionTime>'
+                     '</xml>')
+
+
+def media_entry_fields(i):
+    entry_id = '0_%07d' % i
+    return [
+        ('objectType', 'KalturaMediaEntry'),
+        ('id', entry_id),
+        ('name', 'Lecture recording %d - Introduction & overview' % i),
+        ('description', 'Recorded lecture number %d. Covers the course '
+                        'outline, reading list and assessment.' % i),
+        ('partnerId', '1234567'),
+        ('userId', 'lecturer%d@example.edu' % (i % 40)),
+        ('tags', 'lecture, week%d, recording' % (i % 12)),
+        ('adminTags', ''),
+        ('categories', 'Courses>CS101'),
+        ('categoriesIds', '11%d' % (i % 7)),
+        ('status', '2'),
+        ('moderationStatus', '6'),
+        ('moderationCount', '0'),
+        ('type', '1'),
+        ('createdAt', str(1400000000 + i * 3600)),
+        ('updatedAt', str(1400000000 + i * 3600 + 600)),
+        ('rank', '0'),
+        ('totalRank', '0'),
+        ('votes', '0'),
+        ('downloadUrl', 'http://cdn.example.edu/p/1234567/sp/123456700/'
+                        'raw/entry_id/%s/version/0' % entry_id),
+        ('searchText', '_PAR_ONLY_ _1234567_ _MEDIA_TYPE_1| Lecture '
+                       'recording %d lecture week%d' % (i, i % 12)),
+        ('licenseType', '-1'),
+        ('version', '0'),
+        ('thumbnailUrl', 'http://cdn.example.edu/p/1234567/sp/123456700/'
+                         'thumbnail/entry_id/%s/version/100002' % entry_id),
+        ('accessControlId', '4'),
+        ('replacementStatus', '0'),
+        ('partnerSortValue', '0'),
+        ('conversionProfileId', '7'),
+        ('rootEntryId', entry_id),
+        ('operationAttributes', ''),
+        ('plays', str(i * 7 % 1000)),
+        ('views', str(i * 13 % 5000)),
+        ('width', '1280'),
+        ('height', '720'),
+        ('duration', str(600 + i % 3000)),
+        ('msDuration', str((600 + i % 3000) * 1000)),
+        ('durationType', 'long'),
+        ('mediaType', '1'),
+        ('conversionQuality', '7'),
+        ('sourceType', '1'),
+        ('searchProviderType', ''),
+        ('searchProviderId', ''),
+        ('creditUserName', ''),
+        ('creditUrl', ''),
+        ('dataUrl', 'http://cdn.example.edu/p/1234567/sp/123456700/'
+                    'flvclipper/entry_id/%s/version/0' % entry_id),
+        ('flavorParamsIds', '0,2,3,4,5,6'),
+    ]
+
+
+def thumb_asset_fields(i):
+    return [
+        ('objectType', 'KalturaThumbAsset'),
+        ('id', '0_th%06d' % i),
+        ('entryId', '0_%07d' % (i // 4)),
+        ('partnerId', '1234567'),
+        ('version', '1'),
+        ('size', str(20000 + i)),
+        ('tags', ''),
+        ('fileExt', 'jpg'),
+        ('createdAt', str(1400000000 + i * 60)),
+        ('updatedAt', str(1400000000 + i * 60)),
+        ('description', ''),
+        ('thumbParamsId', '0'),
+        ('width', '640'),
+        ('height', '360'),
+        ('status', '2'),
+    ]
+
+
+def caption_asset_fields(i):
+    return [
+        ('objectType', 'KalturaCaptionAsset'),
+        ('id', '0_cp%06d' % i),
+        ('entryId', '0_%07d' % (i // 2)),
+        ('partnerId', '1234567'),
+        ('version', '1'),
+        ('size', str(30000 + i)),
+        ('tags', ''),
+        ('fileExt', 'srt'),
+        ('createdAt', str(1400000000 + i * 60)),
+        ('updatedAt', str(1400000000 + i * 60)),
+        ('description', ''),
+        ('captionParamsId', '0'),
+        ('language', 'English'),
+        ('languageCode', 'en'),
+        ('isDefault', '1' if i % 2 else '0'),
+        ('label', 'English'),
+        ('format', '1'),
+        ('status', '2'),
+    ]
+
+
+LIST_RESPONSE_TYPES = {
+    'media': ('KalturaMediaListResponse', media_entry_fields),
+    'thumbAsset': ('KalturaThumbAssetListResponse', thumb_asset_fields),
+    'captionAsset': ('KalturaCaptionAssetListResponse', caption_asset_fields),
+}
+
+
+def item_xml(fields):
+    return ''.join('<%s>%s</%s>' % (name, escape(value), name)
+                   for (name, value) in fields)
+
+
+def list_response_xml(kind, count, fields=None):
+    """The body of a <kind>.list response with `count` items, as bytes.
+    `fields` replaces the kind's function giving the fields of item i."""
+    (response_type, kind_fields) = LIST_RESPONSE_TYPES[kind]
+    fields = fields or kind_fields
+    items = ''.join('<item>%s</item>' % item_xml(fields(i))
+                    for i in range(count))
+    result = ('<objectType>%s</objectType><objects>%s</objects>'
+              '<totalCount>%d</totalCount>' % (response_type, items, count))
+    return (RESPONSE_TEMPLATE % result).encode('utf8')
+
+
+def json_value(value):
+    """The json the API sends for a field: numbers as numbers, the rest
+    (and empty fields) as strings."""
+    if value.lstrip('-').isdigit():
+        return int(value)
+    return value
+
+
+def item_json(fields):
+    return dict((name, json_value(value)) for (name, value) in fields)
+
+
+def list_response_json(kind, count, fields=None):
+    """The json (format=1) body of a <kind>.list response, as bytes.
+    `fields` replaces the kind's function giving the fields of item i."""
+    (response_type, kind_fields) = LIST_RESPONSE_TYPES[kind]
+    fields = fields or kind_fields
+    items = [item_json(fields(i)) for i in range(count)]
+    result = {'objectType': response_type, 'objects': items,
+              'totalCount': count}
+    return json.dumps(result).encode('utf8')
@@ -0,0 +1,172 @@
+"""Benchmark of the dependent-call flows of KTS as multirequest pipelines.
+
+Runs the flows whose calls take the results of the calls before them
+against the local stub server (benchmarks/kaltura_stub), which waits
+--delay-ms before every response, standing in for the round trip to a
+remote Kaltura API: a thumbnail added from a url (thumbAsset.add, then
+setContent), a thumbnail generated from the player and set as default
+(thumbAsset.generate, then setAsDefault), and a caption file added
+(uploadToken.add and upload, captionAsset.add, then setContent).  Each one
+call after another, as KTS made them, and as myKalturaObject makes them now,
+with KalturaCallPipeline sending the dependent calls together and the file
+data on its own.  Reports the wall time and requests per flow.
+
+Usage (from the repository root):
+
+    python benchmarks/pipelines.py --runs 5 --delay-ms 50
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from KalturaClient import KalturaClient, KalturaConfiguration
+from KalturaCoreClient import KalturaThumbAsset, KalturaThumbParams, \
+    KalturaUrlResource, KalturaUploadedFileTokenResource
+from KalturaCaptionClientPlugin import KalturaCaptionAsset, \
+    KalturaCaptionAssetService
+import myKalturaObject
+from benchmarks import payloads
+from benchmarks.kaltura_stub import KalturaStub, multirequest_responder
+
+CAPTION = b'''<?xml version="1.0" encoding="utf-8"?>
+<tt xmlns="http://www.w3.org/ns/ttml"><body><div>
+<p begin="00:00:01.000" end="00:00:03.000">Welcome to the lecture</p>
+</div></body></tt>
+'''
+
+
+def asset_xml(fields, id):
+    return payloads.item_xml([(name, id if name == 'id' else value)
+                              for (name, value) in fields])
+
+
+def call_responder(service, action, params):
+    if service == 'thumbasset' and action in ('add', 'generate'):
+        return asset_xml(payloads.thumb_asset_fields(1), '0_th000001')
+    if service == 'thumbasset' and action == 'setContent':
+        return asset_xml(payloads.thumb_asset_fields(1), params['id'])
+    if service == 'caption_captionasset' and action == 'add':
+        return asset_xml(payloads.caption_asset_fields(1), '0_cp000001')
+    if service == 'caption_captionasset' and action == 'setContent':
+        return asset_xml(payloads.caption_asset_fields(1), params['id'])
+    if service == 'uploadtoken':
+        return ('<objectType>KalturaUploadToken</objectType>'
+                '<id>0_up000001</id><status>2</status>')
+    return ''
+
+
+def make_client(stub):
+    config = KalturaConfiguration(99)
+    config.serviceUrl = stub.url
+    client = KalturaClient(config)
+    client.setKs('stub-ks')
+    return client
+
+
+# the flows one call after another
+
+def thumbnail_from_url_sequential(client, entry_id, url):
+    thumb_asset = client.thumbAsset.add(entry_id, KalturaThumbAsset())
+    client.thumbAsset.setContent(thumb_asset.getId(),
+                                 KalturaUrlResource(url=url))
+    return thumb_asset.getId()
+
+
+def thumbnail_from_player_sequential(client, entry_id, offset):
+    thumb_params = KalturaThumbParams()
+    thumb_params.setVideoOffset(offset)
+    thumb_asset = client.thumbAsset.generate(entry_id, thumb_params, None)
+    client.thumbAsset.setAsDefault(thumb_asset.getId())
+    return thumb_asset.getId()
+
+
+def caption_sequential(client, entry_id, captionfile):
+    caption_asset_service = KalturaCaptionAssetService(client)
+    caption_asset = caption_asset_service.add(entry_id, KalturaCaptionAsset())
+    upload_token = client.uploadToken.add()
+    with open(captionfile, 'rb') as f:
+        upload_token = client.uploadToken.upload(upload_token.getId(), f)
+    caption_asset = caption_asset_service.setContent(
+        caption_asset.getId(),
+        KalturaUploadedFileTokenResource(upload_token.getId()))
+    return caption_asset.getId()
+
+
+# the flows of myKalturaObject
+
+def thumbnail_from_url_pipeline(client, entry_id, url):
+    added = myKalturaObject.thumbnail_add_from_url(client, entry_id, url)
+    assert added['success'], added['message']
+    return added['message'][0].split()[-1]
+
+
+def thumbnail_from_player_pipeline(client, entry_id, offset):
+    (success, thumb_id) = myKalturaObject.updateThumbnailFromPlayer(
+        offset, entry_id, client)
+    assert success, thumb_id
+    return thumb_id
+
+
+def caption_pipeline(client, entry_id, captionfile):
+    return myKalturaObject.add_caption(captionfile, entry_id, 'dfxp',
+                                       language='English', client=client)
+
+
+def measure(stub, runs, flow, *args):
+    client = make_client(stub)
+    before = stub.stats['requests']
+    start = time.time()
+    results = set(flow(client, *args) for _ in range(runs))
+    seconds = (time.time() - start) / runs
+    return (seconds, (stub.stats['requests'] - before) // runs, results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--delay-ms', type=float, default=50.0)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='kts-pipelines-')
+    captionfile = os.path.join(workdir, 'lecture.dfxp')
+    with open(captionfile, 'wb') as f:
+        f.write(CAPTION)
+    flows = [
+        ('thumbnail from url', '0_th000001', 'http://cdn.example.edu/a.jpg',
+         thumbnail_from_url_sequential, thumbnail_from_url_pipeline),
+        ('thumbnail from player', '0_th000001', 12,
+         thumbnail_from_player_sequential, thumbnail_from_player_pipeline),
+        ('caption file', '0_cp000001', captionfile,
+         caption_sequential, caption_pipeline),
+    ]
+    stub = KalturaStub(multirequest_responder(call_responder),
+                       delay=args.delay_ms / 1000.0).start()
+    timings = []
+    try:
+        for (name, expected, arg, sequential, pipeline) in flows:
+            for (mode, flow) in (('one by one', sequential),
+                                 ('pipeline', pipeline)):
+                (seconds, requests, results) = measure(
+                    stub, args.runs, flow, '0_entry', arg)
+                assert results == set([expected]), results
+                timings.append((name, mode, seconds, requests))
+    finally:
+        stub.stop()
+        shutil.rmtree(workdir)
+
+    print ('%.0f ms per request upstream, mean of %d runs'
+           % (args.delay_ms, args.runs))
+    print ('%-22s %-11s %10s %10s'
+           % ('flow', 'calls', 'wall ms', 'requests'))
+    for (name, mode, seconds, requests) in timings:
+        print ('%-22s %-11s %10.1f %10d'
+               % (name, mode, seconds * 1000, requests))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""Benchmark of building, signing and encoding Kaltura request params.
+
+Queues a multirequest of media.update calls (one KalturaMediaEntry with a
+dozen properties each) and times turning it into the request body: the
+service calls filling KalturaParams, getRequestParams signing them, and
+encodeParams urlencoding them.  "before" swaps in LegacyKalturaParams, a
+copy of the params container as it was (text values, signature built with
+str +=, every key and value re-encoded before urlencode); "after" is the
+current one, which keeps values utf-8 encoded and signs and urlencodes in
+one pass.  No network calls are made.
+
+Usage (from the repository root):
+
+    python benchmarks/request_params.py --calls 50
+"""
+import os
+import sys
+import time
+import hashlib
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import KalturaClient
+import KalturaClientBase
+import KalturaCoreClient
+from KalturaClient import KalturaConfiguration
+from KalturaCoreClient import KalturaMediaEntry, KalturaMediaType
+from utils import urlencode, maybe_cast_to_unicode
+
+try:
+    from urllib.parse import parse_qsl
+except ImportError:
+    from urlparse import parse_qsl
+
+
+class LegacyKalturaParams(KalturaClientBase.KalturaParams):
+    """KalturaParams with the text storage, signature and encoding it had."""
+
+    def get(self):
+        return self.params
+
+    def getValue(self, key):
+        return self.params.get(key)
+
+    def put(self, key, value=None):
+        if value == None:
+            self.params[key + '__null'] = ''
+        else:
+            self.params[key] = maybe_cast_to_unicode(value)
+
+    def update(self, props):
+        self.params.update(props.get())
+
+    def copy(self):
+        params = LegacyKalturaParams()
+        params.params = self.params.copy()
+        return params
+
+    def addParams(self, key, props):
+        self.add(key, props.get())
+
+    def signature(self):
+        params = list(self.params.items())
+        params.sort()
+        str = ""
+        for (k, v) in params:
+            str += '%s%s' % (k, v)
+        return hashlib.md5(str.encode('utf-8')).hexdigest()
+
+    def sign(self):
+        signature = self.signature()
+        self.put('kalsig', signature)
+        return signature
+
+    def encode(self):
+        sanitized_params = {}
+        for k, v in self.params.items():
+            if hasattr(k, 'encode'):
+                key = k.encode('utf-8')
+            else:
+                key = str(k).encode('utf-8')
+            if hasattr(v, 'encode'):
+                val = v.encode('utf-8')
+            else:
+                val = str(v).encode('utf-8')
+            sanitized_params[key] = val
+        return urlencode(sanitized_params)
+
+
+PARAMS_MODULES = (KalturaClientBase, KalturaClient, KalturaCoreClient)
+
+
+def use_params(params_class):
+    for module in PARAMS_MODULES:
+        module.KalturaParams = params_class
+
+
+def request_body(calls):
+    client = KalturaClient.KalturaClient(KalturaConfiguration(99))
+    client.ks = 'djJ8OTl8c3R1Yi1rcy1mb3ItYmVuY2htYXJrcw=='
+    client.startMultiRequest()
+    for i in range(calls):
+        entry = KalturaMediaEntry()
+        entry.name = u'Lecture recording %d – week %d' % (i, i % 12)
+        entry.description = 'Recorded lecture %d: outline, reading list' % i
+        entry.tags = 'lecture, week%d, recording' % (i % 12)
+        entry.categories = 'Courses>CS101'
+        entry.userId = 'lecturer%d@example.edu' % i
+        entry.mediaType = KalturaMediaType.VIDEO
+        entry.referenceId = 'ref-%06d' % i
+        entry.startDate = 1400000000 + i
+        entry.endDate = 1500000000 + i
+        entry.accessControlId = 4
+        entry.conversionProfileId = 7
+        entry.creditUserName = 'Media team'
+        client.media.update('0_%07d' % i, entry)
+    (url, params, files) = client.getRequestParams()
+    client.callsQueue = []
+    client.multiRequest = False
+    return client.encodeParams(params)
+
+
+def measure(params_class, calls, repeat):
+    use_params(params_class)
+    try:
+        body = request_body(calls)
+        start = time.time()
+        for _ in range(repeat):
+            request_body(calls)
+        return (time.time() - start) / repeat, body
+    finally:
+        use_params(KalturaClientBase.KalturaParams)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--calls', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    current_params = KalturaClientBase.KalturaParams
+    (before, before_body) = measure(LegacyKalturaParams, args.calls,
+                                    args.repeat)
+    (after, after_body) = measure(current_params, args.calls, args.repeat)
+    # the same params either way
+    assert (sorted(parse_qsl(before_body.decode('ascii'))) ==
+            sorted(parse_qsl(after_body.decode('ascii'))))
+
+    keys = len(parse_qsl(after_body.decode('ascii')))
+    print ('multirequest: %d media.update calls, %d params, %.0f kB body'
+           % (args.calls, keys, len(after_body) / 1024.0))
+    print ('%-8s %12s' % ('params', 'ms/request'))
+    for (name, seconds) in (('before', before), ('after', after)):
+        print ('%-8s %12.2f' % (name, seconds * 1000))
+
+
+if __name__ == '__main__':
+    main()
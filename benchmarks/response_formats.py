@@ -0,0 +1,87 @@
+"""Benchmark of decoding list responses in the xml and json formats.
+
+Decodes synthetic media.list, thumbAsset.list and captionAsset.list pages
+(benchmarks/payloads) the way a list action does for each format: xml
+through minidom and the PROPERTY_LOADERS, json (format=1) through the json
+module and KalturaObjectFactory.createFromJson.  Checks both give the same
+objects, then reports the time per page.
+
+Usage (from the repository root):
+
+    python benchmarks/response_formats.py --entries 500
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from KalturaClient import KalturaClient, KalturaConfiguration
+from KalturaClientBase import KalturaObjectFactory, KalturaObjectBase
+from benchmarks import payloads
+
+
+def decode_xml(client, body):
+    result = client.parsePostResult(body)
+    response = KalturaObjectFactory.create(result, KalturaObjectBase)
+    # list responses create their objects when used
+    list(response.objects)
+    return response
+
+
+def decode_json(client, body):
+    result = client.parseJsonPostResult(body)
+    response = KalturaObjectFactory.create(result, KalturaObjectBase)
+    list(response.objects)
+    return response
+
+
+def properties(obj):
+    """The loaded values of an object, with enums as their values."""
+    values = {}
+    for name in KalturaObjectFactory.getPropertyLoaders(obj.__class__):
+        value = getattr(obj, name)
+        if hasattr(value, 'getValue'):
+            value = value.getValue()
+        values[name] = value
+    return values
+
+
+def same_objects(first, second):
+    return (first.totalCount == second.totalCount and
+            [properties(item) for item in first.objects] ==
+            [properties(item) for item in second.objects])
+
+
+def measure(func, client, body, repeat):
+    start = time.time()
+    for _ in range(repeat):
+        func(client, body)
+    return (time.time() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--entries', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    client = KalturaClient(KalturaConfiguration(99))
+    print ('%-18s %10s %10s %10s %10s %8s' % ('list', 'xml kB', 'json kB',
+                                              'xml ms', 'json ms', 'speedup'))
+    for kind in ('media', 'thumbAsset', 'captionAsset'):
+        xml_body = payloads.list_response_xml(kind, args.entries)
+        json_body = payloads.list_response_json(kind, args.entries)
+        assert same_objects(decode_xml(client, xml_body),
+                            decode_json(client, json_body))
+        xml_seconds = measure(decode_xml, client, xml_body, args.repeat)
+        json_seconds = measure(decode_json, client, json_body, args.repeat)
+        print ('%-18s %10.0f %10.0f %10.1f %10.1f %7.1fx' % (
+            kind + '.list', len(xml_body) / 1024.0, len(json_body) / 1024.0,
+            xml_seconds * 1000, json_seconds * 1000,
+            xml_seconds / json_seconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""Benchmark of KTS under concurrent connections: runtornado.py vs gunicorn.
+
+Starts the local stub server (benchmarks/kaltura_stub) as the Kaltura API,
+answering every call after --delay-ms, and a KTS instance pointing at it.
+KTS is then served with --workers processes: by gunicorn with the sync
+workers of gunicorn_conf.py, by gunicorn with its gevent workers
+(KTS_WORKER_CLASS=gevent, when gevent is installed), and by runtornado.py,
+which serves the /service endpoints on the IOLoop with KalturaAsyncClient.
+--connections clients each request the --endpoint over and over for
+--seconds, waiting for every answer before sending the next request.  Reports requests per second,
+latencies and failed requests for each server.
+
+Usage (from the repository root):
+
+    python benchmarks/tornado_async.py --workers 2 --connections 50 \\
+        --delay-ms 100 --endpoint get_media
+"""
+import os
+import sys
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.kaltura_stub import KalturaStub
+from benchmarks.kts_server import responder, kts_env, start_server, \
+    stop_server
+
+ENDPOINTS = {
+    'get_media': '/service/get_media/?id=1:0_0000001',
+    'thumbnail_list': '/service/thumbnail_list/?id=1:0_0000001',
+    'list_captions': '/service/list_captions/?id=1:0_0000001',
+    'search_video': '/service/search_video/',
+}
+
+
+async def fetch(port, path):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        writer.write(('GET %s HTTP/1.1\r\nHost: 127.0.0.1:%d\r\n'
+                      'Connection: close\r\n\r\n' % (path, port)).encode())
+        response = await reader.read()
+    finally:
+        writer.close()
+    return int(response.split(b' ', 2)[1])
+
+
+async def client_loop(port, path, deadline, results):
+    while time.time() < deadline:
+        start = time.time()
+        try:
+            ok = await fetch(port, path) == 200
+        except (OSError, IndexError, ValueError):
+            ok = False
+        results.append((ok, time.time() - start))
+
+
+async def run_load(port, path, connections, seconds):
+    results = []
+    deadline = time.time() + seconds
+    await asyncio.gather(*[client_loop(port, path, deadline, results)
+                           for _ in range(connections)])
+    return results
+
+
+def measure(kind, workdir, env, args):
+    if kind == 'gevent':
+        (kind, env) = ('gunicorn', dict(env, KTS_WORKER_CLASS='gevent'))
+    process, port = start_server(kind, workdir, env, args.workers)
+    path = ENDPOINTS[args.endpoint]
+    try:
+        # warm up: session, client pools and connections to the stub
+        asyncio.run(run_load(port, path, args.workers, 1))
+        start = time.time()
+        results = asyncio.run(run_load(port, path, args.connections,
+                                       args.seconds))
+        seconds = time.time() - start
+    finally:
+        stop_server(process)
+    latencies = sorted(latency for (ok, latency) in results if ok)
+    failed = len([ok for (ok, _) in results if not ok])
+    if not latencies:
+        latencies = [0.0]
+    return {'rps': len(results) / seconds,
+            'p50_ms': latencies[len(latencies) // 2] * 1000,
+            'p99_ms': latencies[int(len(latencies) * 0.99) - 1] * 1000,
+            'failed': failed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--connections', type=int, default=50)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--delay-ms', type=float, default=100.0)
+    parser.add_argument('--endpoint', choices=sorted(ENDPOINTS),
+                        default='get_media')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='kts-tornado-bench-')
+    stub = KalturaStub(responder, delay=args.delay_ms / 1000.0).start()
+    env = kts_env(stub.url, workdir)
+    kinds = ['gunicorn', 'gevent', 'tornado']
+    try:
+        import gevent
+    except ImportError:
+        kinds.remove('gevent')
+    try:
+        results = [(kind, measure(kind, workdir, env, args))
+                   for kind in kinds]
+    finally:
+        stub.stop()
+        shutil.rmtree(workdir)
+
+    print ('%s, %d workers, %d connections, %.0f ms per Kaltura call'
+           % (args.endpoint, args.workers, args.connections, args.delay_ms))
+    print ('%-10s %10s %10s %10s %8s' % ('server', 'req/s', 'p50 ms',
+                                         'p99 ms', 'failed'))
+    for (kind, result) in results:
+        print ('%-10s %10.1f %10.1f %10.1f %8d' % (
+            kind, result['rps'], result['p50_ms'], result['p99_ms'],
+            result['failed']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Startup benchmark for a KTS worker: import time and RSS.
+
+Every measurement runs in a fresh interpreter that imports myKalturaObject
+and builds one KalturaClient, the way a gunicorn worker does on its first
+request.  "eager" additionally imports chardet and every client plugin module
+and registers their types, which is what each worker used to do at startup;
+"lazy" leaves those to the first request that needs them.  The cold-bytecode
+runs point PYTHONPYCACHEPREFIX at an empty directory, which is what a worker
+sees when it cannot write the .pyc next to KalturaCoreClient.py.
+
+Usage (from the repository root):
+
+    python benchmarks/worker_startup.py --runs 5
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r'''
+import os, sys, time, json
+start = time.time()
+sys.path.insert(0, %(root)r)
+import myKalturaObject
+if %(eager)r:
+    import chardet
+    import KalturaPluginManifest
+    from KalturaClientBase import loadPluginObjects
+client = myKalturaObject.KalturaClient(
+    myKalturaObject.KalturaConfiguration(1))
+if %(eager)r:
+    for moduleName in KalturaPluginManifest.PLUGIN_MODULES:
+        loadPluginObjects(moduleName)
+seconds = time.time() - start
+rss = 0
+with open('/proc/self/status') as status:
+    for line in status:
+        if line.startswith('VmRSS:'):
+            rss = int(line.split()[1])
+plugins = len([name for name in sys.modules if name.endswith('ClientPlugin')])
+print(json.dumps({'seconds': seconds, 'rss_kb': rss, 'plugins': plugins}))
+'''
+
+
+def run_child(workdir, eager, cold):
+    env = dict(os.environ)
+    env['KALTURA_DEFINITIONS_DB'] = os.path.join(workdir, 'kaldefs.db')
+    if cold:
+        env['PYTHONPYCACHEPREFIX'] = tempfile.mkdtemp(dir=workdir)
+    code = CHILD % {'root': ROOT, 'eager': eager}
+    output = subprocess.check_output([sys.executable, '-c', code], cwd=workdir,
+                                     env=env)
+    return json.loads(output.decode('utf8').strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='kts-startup-bench-')
+    try:
+        # one throwaway run creates the scratch db and warms the .pyc files
+        run_child(workdir, True, False)
+        print ('%-22s %10s %10s %8s' % ('scenario', 'import ms', 'rss MB',
+                                        'plugins'))
+        for cold in (False, True):
+            for eager in (True, False):
+                results = [run_child(workdir, eager, cold)
+                           for _ in range(args.runs)]
+                seconds = sorted(r['seconds'] for r in results)
+                rss = sorted(r['rss_kb'] for r in results)
+                name = '%s%s' % ('eager' if eager else 'lazy',
+                                 ', cold .pyc' if cold else '')
+                print ('%-22s %10.1f %10.1f %8d' % (
+                    name, seconds[len(seconds) // 2] * 1000,
+                    rss[len(rss) // 2] / 1024.0, results[0]['plugins']))
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    main()
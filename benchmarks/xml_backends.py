@@ -0,0 +1,82 @@
+"""Benchmark of the xml parser backends of the Kaltura client.
+
+Decodes synthetic media.list, thumbAsset.list and captionAsset.list pages
+(benchmarks/payloads) into Kaltura objects with each backend available
+(KalturaXmlDecoder.getXmlBackends: lxml when installed, the stdlib expat
+parser always), both whole (parsePostResult, as a service action does) and
+streamed (KalturaListIterator, as iterateList does), next to minidom, which
+the client used before the backends.  Reports the time per page.
+
+Usage (from the repository root):
+
+    python benchmarks/xml_backends.py --entries 500
+"""
+import io
+import os
+import sys
+import time
+import argparse
+from xml.dom import minidom
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from KalturaClient import KalturaClient, KalturaConfiguration, \
+    KalturaListIterator
+from KalturaClientBase import KalturaObjectFactory, KalturaObjectBase, \
+    getChildNodeByXPath
+import KalturaXmlDecoder
+from benchmarks import payloads
+
+
+def decode_minidom(client, body):
+    result = getChildNodeByXPath(minidom.parseString(body), 'xml/result')
+    response = KalturaObjectFactory.create(result, KalturaObjectBase)
+    return list(response.objects)
+
+
+def decode_whole(client, body):
+    response = KalturaObjectFactory.create(client.parsePostResult(body),
+                                           KalturaObjectBase)
+    return list(response.objects)
+
+
+def decode_streaming(client, body):
+    return list(KalturaListIterator(client, io.BytesIO(body), 'list'))
+
+
+def measure(func, client, body, repeat):
+    start = time.time()
+    for _ in range(repeat):
+        func(client, body)
+    return (time.time() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--entries', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    client = KalturaClient(KalturaConfiguration(99))
+    default_backend = KalturaXmlDecoder.getXmlBackend()
+    print ('%-18s %-8s %10s %12s' % ('list', 'parser', 'whole ms',
+                                     'streamed ms'))
+    for kind in ('media', 'thumbAsset', 'captionAsset'):
+        body = payloads.list_response_xml(kind, args.entries)
+        print ('%-18s %-8s %10.1f %12s' % (
+            kind + '.list', 'minidom',
+            measure(decode_minidom, client, body, args.repeat) * 1000, '-'))
+        for backend in KalturaXmlDecoder.getXmlBackends():
+            KalturaXmlDecoder.setXmlBackend(backend)
+            try:
+                whole = measure(decode_whole, client, body, args.repeat)
+                streamed = measure(decode_streaming, client, body, args.repeat)
+            finally:
+                KalturaXmlDecoder.setXmlBackend(default_backend)
+            print ('%-18s %-8s %10.1f %12.1f' % (kind + '.list', backend,
+                                                 whole * 1000,
+                                                 streamed * 1000))
+
+
+if __name__ == '__main__':
+    main()
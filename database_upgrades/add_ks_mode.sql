@@ -0,0 +1 @@
+ALTER TABLE configurations ADD COLUMN KS_MODE TEXT;
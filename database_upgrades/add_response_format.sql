@@ -0,0 +1 @@
+ALTER TABLE configurations ADD COLUMN RESPONSE_FORMAT TEXT;
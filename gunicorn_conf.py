@@ -1,6 +1,23 @@
+import os
+
 bind = "0.0.0.0:6500"
-workers = 4
+workers = int(os.environ.get('KTS_WORKERS', 4))
+# KTS_THREADS > 1 serves that many requests at once per worker (gunicorn's
+# gthread workers); Kaltura clients are safe to share between threads
+threads = int(os.environ.get('KTS_THREADS', 1))
+worker_class = 'gthread' if threads > 1 else 'sync'
+# KTS_WORKER_CLASS=gevent serves up to KTS_WORKER_CONNECTIONS requests at once
+# per worker, each in a greenlet that yields while it waits on Kaltura
+if os.environ.get('KTS_WORKER_CLASS') == 'gevent':
+    # patch before preload_app imports the app, so the locks, thread-locals
+    # and sockets it creates are gevent's
+    from gevent import monkey
+    monkey.patch_all()
+    worker_class = 'gevent'
+    worker_connections = int(os.environ.get('KTS_WORKER_CONNECTIONS', 1000))
 daemon = True
 accesslog = 'kts_access.log'
 errorlog = 'kts_error.log'
 pidfile = 'kts.pid'
+# import and warm up the app once in the master; workers fork from it
+preload_app = True
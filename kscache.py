@@ -0,0 +1,237 @@
+"""Server-side Kaltura session (KS) cache shared by all KTS workers.
+
+Sessions are keyed by kaltura id, privilege string and a fingerprint of the
+instance settings they were minted with, and kept in a small sqlite db next
+to kaldefs.db so every gunicorn worker sees the same KS.  Each worker also
+keeps an in-memory copy, so a warm request never touches the db.
+
+A daemon thread per worker re-mints sessions shortly before they expire.
+A lease column in the db makes sure only one worker refreshes a given
+session, so requests don't wait on session.start once a KS is warm.
+"""
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger('kscache')
+
+# refresh sessions that have less than this many seconds left
+KS_REFRESH_AHEAD = 120
+# never hand out a KS with less than this many seconds left
+KS_MIN_TTL = 30
+# how often the refresher wakes up, in seconds
+KS_REFRESH_INTERVAL = 15
+# how long one worker may hold the refresh lease on a session
+KS_REFRESH_LEASE = 30
+
+ks_table_creation_query = """
+    CREATE TABLE IF NOT EXISTS ks_cache (CACHE_KEY text PRIMARY KEY,
+                                         KALTURA_ID text,
+                                         PRIVILEGES text,
+                                         KS text,
+                                         EXPIRES real,
+                                         REFRESHING_UNTIL real)
+    """
+
+# settings that go into a KS; changing any of them invalidates cached ones
+KS_SETTINGS_FIELDS = ['SERVICE_URL', 'PARTNER_ID', 'USER_NAME', 'ADMIN_SECRET']
+
+
+def cache_key(kaltura_id, settings, privileges=''):
+    fingerprint = '|'.join(
+        [str(kaltura_id), privileges or ''] +
+        [str(settings.get(field)) for field in KS_SETTINGS_FIELDS])
+    return hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()
+
+
+class KsCache(object):
+    """Cache of minted sessions.
+
+    mint(settings, privileges) must return a new KS valid for `expiry`
+    seconds; load_settings(kaltura_id) returns the current settings of an
+    instance (or None once it is gone) and is used by the refresher.
+    """
+
+    def __init__(self, path, mint, load_settings, expiry,
+                 refresh_ahead=KS_REFRESH_AHEAD, min_ttl=KS_MIN_TTL,
+                 refresh_interval=KS_REFRESH_INTERVAL):
+        self.path = path
+        self.mint = mint
+        self.load_settings = load_settings
+        self.expiry = expiry
+        self.refresh_ahead = refresh_ahead
+        self.min_ttl = min_ttl
+        self.refresh_interval = refresh_interval
+        self.stats = {'hits': 0, 'misses': 0, 'refreshes': 0,
+                      'refresh_failures': 0, 'refresh_seconds_total': 0.0,
+                      'refresh_seconds_max': 0.0}
+        # cache_key -> [kaltura_id, privileges, ks, expires]
+        self._local = {}
+        self._lock = threading.Lock()
+        self._pid = None
+        self._store_ready = False
+
+    def _connect(self):
+        if not self._store_ready:
+            # the db holds admin sessions: keep it private to the KTS user
+            os.close(os.open(self.path, os.O_CREAT | os.O_RDWR, 0o600))
+            store = sqlite3.connect(self.path, timeout=30)
+            store.execute("PRAGMA journal_mode=WAL")
+            store.execute(ks_table_creation_query)
+            store.commit()
+            self._store_ready = True
+            return store
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _start_refresher(self):
+        # threads don't survive fork, so every worker starts its own
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._local = {}
+            refresher = threading.Thread(target=self._refresh_loop,
+                                         name='ks-refresher')
+            refresher.daemon = True
+            refresher.start()
+
+    def _read(self, key):
+        store = self._connect()
+        try:
+            row = store.execute(
+                "select KALTURA_ID, PRIVILEGES, KS, EXPIRES from ks_cache "
+                "where CACHE_KEY = ?", (key,)).fetchone()
+        finally:
+            store.close()
+        return list(row) if row else None
+
+    def _write(self, key, kaltura_id, privileges, ks, expires):
+        store = self._connect()
+        try:
+            store.execute(
+                "insert or replace into ks_cache values(?,?,?,?,?,0)",
+                (key, kaltura_id, privileges, ks, expires))
+            store.commit()
+        finally:
+            store.close()
+
+    def _take_lease(self, key, now):
+        store = self._connect()
+        try:
+            cur = store.execute(
+                "update ks_cache set REFRESHING_UNTIL = ? "
+                "where CACHE_KEY = ? and REFRESHING_UNTIL < ?",
+                (now + KS_REFRESH_LEASE, key, now))
+            store.commit()
+            return cur.rowcount == 1
+        finally:
+            store.close()
+
+    def _mint(self, key, kaltura_id, settings, privileges):
+        started = time.time()
+        ks = self.mint(settings, privileges)
+        entry = [kaltura_id, privileges, ks, started + self.expiry]
+        self._write(key, kaltura_id, privileges, ks, entry[3])
+        with self._lock:
+            self._local[key] = entry
+        return entry, time.time() - started
+
+    def get(self, kaltura_id, settings, privileges=''):
+        """Return a KS for the instance, minting one only on a cold miss."""
+        self._start_refresher()
+        return self._lookup(kaltura_id, settings, privileges)
+
+    def warm(self, kaltura_id, settings, privileges=''):
+        """Make sure the shared store holds a fresh KS for the instance.
+
+        Unlike get() this doesn't start the refresher thread, so it is safe
+        to call in a process that forks workers afterwards.
+        """
+        return self._lookup(kaltura_id, settings, privileges)
+
+    def peek(self, kaltura_id, settings, privileges=''):
+        """Return this worker's copy of a KS that needs no refresh yet.
+
+        Returns None instead of reading the db or minting, so it never
+        blocks; callers fall back to get() for that.
+        """
+        entry = self._local.get(cache_key(kaltura_id, settings, privileges))
+        if entry is None or entry[3] - time.time() < self.refresh_ahead:
+            return None
+        self.stats['hits'] += 1
+        return entry[2]
+
+    def _lookup(self, kaltura_id, settings, privileges):
+        key = cache_key(kaltura_id, settings, privileges)
+        now = time.time()
+        entry = self._local.get(key)
+        if entry is None or entry[3] - now < self.refresh_ahead:
+            # another worker may already have refreshed it
+            stored = self._read(key)
+            if stored is not None:
+                with self._lock:
+                    self._local[key] = stored
+                entry = stored
+        if entry is not None and entry[3] - now > self.min_ttl:
+            self.stats['hits'] += 1
+            return entry[2]
+        self.stats['misses'] += 1
+        entry, _ = self._mint(key, kaltura_id, settings, privileges)
+        return entry[2]
+
+    def refresh_due(self):
+        """Re-mint every session this worker uses that is about to expire."""
+        now = time.time()
+        with self._lock:
+            due = [(key, entry) for key, entry in self._local.items()
+                   if entry[3] - now < self.refresh_ahead]
+        for key, entry in due:
+            kaltura_id, privileges = entry[0], entry[1]
+            settings = self.load_settings(kaltura_id)
+            if not settings or cache_key(kaltura_id, settings,
+                                         privileges) != key:
+                # instance removed or reconfigured; let the old KS lapse
+                with self._lock:
+                    self._local.pop(key, None)
+                continue
+            stored = self._read(key)
+            if stored is not None and stored[3] - now >= self.refresh_ahead:
+                with self._lock:
+                    self._local[key] = stored
+                continue
+            if stored is not None and not self._take_lease(key, now):
+                continue
+            try:
+                _, took = self._mint(key, kaltura_id, settings, privileges)
+            except Exception as e:
+                self.stats['refresh_failures'] += 1
+                logger.exception('KS refresh failed for kaltura id %s: %s'
+                                 % (kaltura_id, e))
+                continue
+            self.stats['refreshes'] += 1
+            self.stats['refresh_seconds_total'] += took
+            self.stats['refresh_seconds_max'] = max(
+                self.stats['refresh_seconds_max'], took)
+
+    def _refresh_loop(self):
+        while True:
+            time.sleep(self.refresh_interval)
+            try:
+                self.refresh_due()
+            except Exception as e:
+                logger.exception('KS refresher error: %s' % e)
+
+    def info(self):
+        stats = dict(self.stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = float(stats['hits']) / lookups if lookups else None
+        stats['refresh_seconds_avg'] = \
+            stats['refresh_seconds_total'] / stats['refreshes'] \
+            if stats['refreshes'] else None
+        stats['cached_sessions'] = len(self._local)
+        return stats
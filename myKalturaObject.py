@@ -1,5 +1,6 @@
 import logging
 import difflib
+import threading
 from utils import urlencode
 import xml.etree.ElementTree as ET
 
@@ -7,14 +8,17 @@ from flask import current_app
 
 # from httplib2 import Http
 from KalturaClient import *
-from KalturaMetadataClientPlugin import *
-from KalturaCaptionClientPlugin import *
+from KalturaConnectionPool import KalturaConnectionPool
+from KalturaCallBatcher import KalturaCallBatcher, KalturaCallPipeline
+from KalturaCaptionClientPlugin import KalturaCaptionAsset, \
+    KalturaCaptionAssetService, KalturaCaptionType
 from KalturaCoreClient import KalturaThumbAsset, KalturaUrlResource, \
     KalturaEntryStatus, KalturaThumbParams, KalturaNullableBoolean
 # to handle some particular kaltura exceptions:
 from KalturaClientBase import KalturaException
 
 import properties
+import kscache
 from utils import convert_file_to_unicode, addFileLogger
 
 if current_app:
@@ -28,7 +32,37 @@ SETTINGS = {}
 properties.load_kaltura_settings(SETTINGS)
 
 KALTURA_REQUEST_TIMEOUT = 60
+KALTURA_CONNECT_TIMEOUT = 5
+# read timeouts per 'service' or 'service.action': short for reads, long
+# for calls that stream whole files
+KALTURA_TIMEOUT_POLICIES = {
+    'session.start': 10,
+    'media.get': 15,
+    'media.count': 15,
+    'baseentry.get': 15,
+    'thumbasset.getbyentryid': 15,
+    'thumbasset.geturl': 15,
+    'caption_captionasset.list': 15,
+    'caption_captionasset.geturl': 15,
+    'uploadtoken.upload': 3600,
+    'media.upload': 3600,
+}
 KS_EXPIRY = 600
+# idle clients kept per Kaltura instance
+CLIENT_POOL_MAX_IDLE = 16
+# idle keep-alive connections kept per Kaltura host, and for how long; ones
+# the server closes earlier are noticed and dropped before reuse
+HTTP_POOL_MAX_IDLE = 4
+HTTP_POOL_IDLE_TIMEOUT = 30
+
+KalturaClient.connectionPool = KalturaConnectionPool(HTTP_POOL_MAX_IDLE,
+                                                     HTTP_POOL_IDLE_TIMEOUT)
+
+# with KTS_BATCH_CALLS=1, independent calls (e.g. one getUrl per asset) go
+# out together, as multirequests of at most KTS_BATCH_MAX_SIZE calls
+SERVER_SETTINGS = properties.load_server_settings({})
+BATCH_CALLS = SERVER_SETTINGS['BATCH_CALLS']
+BATCH_MAX_SIZE = SERVER_SETTINGS['BATCH_MAX_SIZE']
 
 DEFAULT_SEARCH_FIELD_LIST = [
     'id',
@@ -62,6 +96,90 @@ DEFAULT_SEARCH_FIELD_LIST = [
     'creditUrl'
 ]
 
+# Names of the enum values KTS reports
+ENTRY_STATUS_NAMES = {
+    KalturaEntryStatus.ERROR_IMPORTING: "ERROR_IMPORTING",
+    KalturaEntryStatus.ERROR_CONVERTING: "ERROR_CONVERTING",
+    KalturaEntryStatus.IMPORT: "IMPORT",
+    KalturaEntryStatus.PRECONVERT: "PRECONVERT",
+    KalturaEntryStatus.READY: "READY",
+    KalturaEntryStatus.DELETED: "DELETED",
+    KalturaEntryStatus.PENDING: "PENDING",
+    KalturaEntryStatus.MODERATE: "MODERATE",
+    KalturaEntryStatus.BLOCKED: "BLOCKED",
+    KalturaEntryStatus.NO_CONTENT: "NO_CONTENT",
+    KalturaEntryStatus.INFECTED: "virusScan.Infected",
+    KalturaEntryStatus.SCAN_FAILURE: "virusScan.ScanFailure"
+}
+MEDIA_TYPE_NAMES = {
+    KalturaMediaType.VIDEO: 'VIDEO',
+    KalturaMediaType.IMAGE: 'IMAGE',
+    KalturaMediaType.AUDIO: 'AUDIO',
+    KalturaMediaType.LIVE_STREAM_FLASH: 'LIVE_STREAM_FLASH',
+    KalturaMediaType.LIVE_STREAM_WINDOWS_MEDIA: 'LIVE_STREAM_WINDOWS_MEDIA',
+    KalturaMediaType.LIVE_STREAM_REAL_MEDIA: 'LIVE_STREAM_REAL_MEDIA',
+    KalturaMediaType.LIVE_STREAM_QUICKTIME: 'LIVE_STREAM_QUICKTIME'
+}
+SOURCE_TYPE_NAMES = {
+    KalturaSourceType.FILE: "FILE",
+    KalturaSourceType.WEBCAM: "WEBCAM",
+    KalturaSourceType.URL: "URL",
+    KalturaSourceType.SEARCH_PROVIDER: "SEARCH_PROVIDER",
+    KalturaSourceType.AKAMAI_LIVE: "AKAMAI_LIVE",
+    KalturaSourceType.MANUAL_LIVE_STREAM: "MANUAL_LIVE_STREAM"
+}
+# thumbnail and caption asset statuses
+ASSET_STATUS_NAMES = {
+    -1: 'ERROR',
+    0: 'QUEUED',
+    2: 'READY',
+    3: 'DELETED',
+    7: 'IMPORTING'
+}
+
+# searchVideos / get_entry fields copied from a media entry property
+ENTRY_FIELD_PROPERTIES = {
+    'url': 'dataUrl',
+    'download_url': 'downloadUrl',
+    'thumbnail_url': 'thumbnailUrl',
+    'plays': 'plays',
+    'views': 'views',
+    'width': 'width',
+    'height': 'height',
+    'duration': 'duration',
+    'created': 'createdAt',
+    'updated': 'updatedAt',
+    'name': 'name',
+    'description': 'description',
+    'tags': 'tags',
+    'searchtext': 'searchText',
+    'startDate': 'startDate',
+    'endDate': 'endDate',
+    'conversionQuality': 'conversionQuality',
+    'creditUrl': 'creditUrl',
+    'creditUserName': 'creditUserName',
+    'flavorParamsId': 'flavorParamsIds',
+    'mediaDate': 'mediaDate',
+    'partner_id': 'partnerId',
+    'user_id': 'userId'
+}
+# fields worked out from other properties (the entry id is always loaded)
+ENTRY_DERIVED_FIELD_PROPERTIES = {
+    'status': ['status'],
+    'media_type': ['mediaType'],
+    'source_type': ['sourceType'],
+    'rank': ['rank', 'totalRank']
+}
+SEARCH_FIELDS = list(ENTRY_FIELD_PROPERTIES) + \
+    list(ENTRY_DERIVED_FIELD_PROPERTIES)
+# the media entry properties get_entry reports
+GET_ENTRY_PROPERTIES = [
+    'mediaType', 'dataUrl', 'thumbnailUrl', 'downloadUrl', 'plays', 'views',
+    'rank', 'totalRank', 'width', 'height', 'duration', 'createdAt',
+    'updatedAt', 'name', 'description', 'tags', 'searchText', 'startDate',
+    'endDate'
+]
+
 LANGUAGE_LIST = [
     "Abkhazian",
     "Afar",
@@ -298,35 +416,191 @@ def GetConfig(settings):
     config.serviceUrl = service_url
     config.setLogger(KalturaLogger())
     config.requestTimeout = KALTURA_REQUEST_TIMEOUT
+    config.connectTimeout = KALTURA_CONNECT_TIMEOUT
+    config.timeoutPolicies = dict(KALTURA_TIMEOUT_POLICIES)
+    if settings.get('RESPONSE_FORMAT') == 'json':
+        config.format = KALTURA_SERVICE_FORMAT_JSON
     return config
 
 
-def get_new_session_key(settings):
+class KalturaClientPool(object):
+    """Pre-built KalturaClient instances, per Kaltura instance.
+
+    Clients (and the services they create on first use) are built once
+    and recycled: acquire() hands out a client carrying only the caller's
+    KS and an empty call queue, and release() puts it back once the
+    request is done with it.  Pools are keyed on what GetConfig uses, so
+    instances pointing at the same server and partner, with the same
+    response format, share one.  client_class builds the clients (e.g.
+    KalturaAsyncClient).
+    """
+
+    def __init__(self, max_idle=CLIENT_POOL_MAX_IDLE,
+                 client_class=KalturaClient):
+        self.max_idle = max_idle
+        self.client_class = client_class
+        # (service url, partner id, response format) -> {'config', 'idle'}
+        self._pools = {}
+        self._lock = threading.Lock()
+        self.stats = {'built': 0, 'reused': 0}
+
+    def acquire(self, settings, ks=NotImplemented):
+        key = (settings.get('SERVICE_URL'), settings.get('PARTNER_ID'),
+               settings.get('RESPONSE_FORMAT'))
+        client = None
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = {'config': GetConfig(settings), 'idle': []}
+                self._pools[key] = pool
+            if pool['idle']:
+                client = pool['idle'].pop()
+                self.stats['reused'] += 1
+        if client is None:
+            client = self.client_class(pool['config'])
+            client.ktsPoolKey = key
+            self.stats['built'] += 1
+        client.callsQueue = []
+        client.multiRequest = False
+        client.setKs(ks)
+        return client
+
+    def release(self, client):
+        client.setKs(NotImplemented)
+        with self._lock:
+            pool = self._pools.get(getattr(client, 'ktsPoolKey', None))
+            if pool is not None and len(pool['idle']) < self.max_idle:
+                pool['idle'].append(client)
+
+    def info(self):
+        stats = dict(self.stats)
+        stats['idle'] = sum([len(pool['idle'])
+                             for pool in self._pools.values()])
+        return stats
+
+
+client_pool = KalturaClientPool()
+
+
+def generate_session_key(settings, privileges=""):
+    """Sign a KS locally with the instance's ADMIN_SECRET (no round trip)."""
+    return KalturaClient.generateSession(settings.get('ADMIN_SECRET'),
+                                         settings.get('USER_NAME'),
+                                         KalturaSessionType.ADMIN,
+                                         int(settings.get('PARTNER_ID')),
+                                         KS_EXPIRY, privileges)
+
+
+def check_local_session_key(settings, remote_ks, local_ks):
+    """Compare a locally generated KS against one from session.start.
+
+    The remote KS must carry our signature (i.e. the server signs exactly
+    what we sign) and both must agree on partner, type, user and privileges.
+    Returns a list of mismatches, empty when the local KS can be trusted.
+    """
+    problems = []
+    remote = KalturaClient.decodeSession(remote_ks)
+    local = KalturaClient.decodeSession(local_ks)
+    if remote is None:
+        return ['session.start returned a KS format KTS cannot generate']
+    if not KalturaClient.verifySession(remote_ks, settings.get('ADMIN_SECRET')):
+        problems.append('remote KS is not signed with ADMIN_SECRET')
+    # partner id, partner id, expiry, type, random, user, privileges
+    if len(remote[1]) < 7:
+        problems.append('remote KS has %d fields, not 7 or more' %
+                        len(remote[1]))
+        return problems
+    for index, field in [(0, 'partner id'), (3, 'session type'),
+                         (5, 'user'), (6, 'privileges')]:
+        if remote[1][index] != local[1][index]:
+            problems.append('%s differs: remote %r, local %r' % (
+                field, remote[1][index], local[1][index]))
+    return problems
+
+
+ks_validation_stats = {'matched': 0, 'mismatched': 0}
+
+
+def get_new_session_key(settings, privileges=""):
     if not settings:
         raise Exception("Settings not set in get_new_session_key")
+    ks_mode = settings.get('KS_MODE')
+    if ks_mode == 'local':
+        return generate_session_key(settings, privileges)
     partner_id = settings.get('PARTNER_ID')
     admin_secret = settings.get('ADMIN_SECRET')
     user_name = settings.get('USER_NAME')
-    client = KalturaClient(GetConfig(settings))
+    client = client_pool.acquire(settings)
     print ("-> get_new_session_key", admin_secret, user_name, partner_id)
-    return client.session.start(admin_secret,
-                                user_name,
-                                KalturaSessionType.ADMIN,
-                                partner_id, KS_EXPIRY, "")
+    try:
+        ks = client.session.start(admin_secret,
+                                  user_name,
+                                  KalturaSessionType.ADMIN,
+                                  partner_id, KS_EXPIRY, privileges)
+    finally:
+        client_pool.release(client)
+    if ks_mode == 'validate':
+        local_ks = generate_session_key(settings, privileges)
+        problems = check_local_session_key(settings, ks, local_ks)
+        if problems:
+            ks_validation_stats['mismatched'] += 1
+            logger.warning('Local KS for partner %s does not match '
+                           'session.start: %s' % (partner_id,
+                                                  '; '.join(problems)))
+        else:
+            ks_validation_stats['matched'] += 1
+            logger.info('Local KS for partner %s matches session.start'
+                        % partner_id)
+            return local_ks
+    return ks
+
+
+def get_kaltura_settings(kaltura_id):
+    return properties.load_kaltura_settings().get(kaltura_id)
+
+
+# Sessions shared by every worker, refreshed ahead of expiry.
+ks_cache = kscache.KsCache(
+    properties.load_server_settings({})['KS_CACHE_DB'],
+    mint=get_new_session_key,
+    load_settings=get_kaltura_settings,
+    expiry=KS_EXPIRY)
+
+
+def get_cached_session_key(kaltura_id, privileges=""):
+    settings = get_kaltura_settings(kaltura_id)
+    if not settings:
+        raise Exception("Kaltura ID %s Settings %s" % (kaltura_id, settings))
+    return ks_cache.get(kaltura_id, settings, privileges)
 
 
 def create_session(kaltura_id, ks=None):
+    """Return a pooled client for the instance; hand it back with
+    release_session once the request is done with it."""
     settings = properties.load_kaltura_settings().get(kaltura_id)
     if not settings:
         raise Exception("Kaltura ID %s Settings %s" % (kaltura_id, settings))
-    client = KalturaClient(GetConfig(settings))
-    if not settings:
-        raise Exception("Kaltura ID %s not in session %s" % (
-            kaltura_id, repr(settings)))
     if not ks:
         ks = get_new_session_key(settings)
-    client.setKs(ks)
-    return client
+    return client_pool.acquire(settings, ks)
+
+
+def release_session(client):
+    client_pool.release(client)
+
+
+def call_all(client, calls):
+    """Results of the (action, args) calls, in order.
+
+    With KTS_BATCH_CALLS set they go out together, as multirequests;
+    otherwise one after another. Either way, the exception of the first call
+    that failed is raised.
+    """
+    if not BATCH_CALLS:
+        return [action(*args) for (action, args) in calls]
+    batcher = KalturaCallBatcher(client, BATCH_MAX_SIZE)
+    batched_calls = [batcher.queue(action, *args) for (action, args) in calls]
+    return [batched_call.get() for batched_call in batched_calls]
 
 
 def count(client, mediafilter=None):
@@ -429,9 +703,13 @@ def updateThumbnailFromPlayer(offset, entry_id, client=None):
         thumb_params = KalturaThumbParams()
         thumb_params.setVideoOffset(round(offset))
         source_asset_id = None
-        thumbasset = thumbnail_asset_service.generate(entry_id, thumb_params,
-                                                      source_asset_id)
-        thumbnail_set_default(client, thumbasset.id)
+        # one request: setAsDefault takes the id generate returns, by
+        # reference; like generate alone, it may fail on its own
+        pipeline = KalturaCallPipeline(client)
+        generated = pipeline.queue(thumbnail_asset_service.generate,
+                                   entry_id, thumb_params, source_asset_id)
+        pipeline.queue(thumbnail_asset_service.setAsDefault, generated.ref.id)
+        thumbasset = generated.get()
         # mediaEntry = client.baseEntry.updateThumbnailFromSourceEntry(
         #     entry_id, entry_id, round(offset))
         return (True, thumbasset.id)
@@ -471,15 +749,16 @@ def thumbnail_list(client, entry_id, in_dict=True):
         kfilter.entryIdEqual = entry_id
         pager = None
         response = thumb_asset_service.list(kfilter, pager)
-        thumbnail_list = []
-        for thumbnail in response.objects:
-            if in_dict:
-                thumbinfo = thumbnail_dictify(thumbnail)
-                thumbinfo['url'] = thumb_asset_service.getUrl(thumbinfo['id'],
-                                                              None)
-                thumbnail_list.append(thumbinfo)
-            else:
-                thumbnail_list.append(thumbnail)
+        if in_dict:
+            thumbnail_list = [thumbnail_dictify(thumbnail)
+                              for thumbnail in response.objects]
+            urls = call_all(client, [
+                (thumb_asset_service.getUrl, (thumbinfo['id'], None))
+                for thumbinfo in thumbnail_list])
+            for thumbinfo, url in zip(thumbnail_list, urls):
+                thumbinfo['url'] = url
+        else:
+            thumbnail_list = list(response.objects)
         thumbnail_list = sort_by_field(thumbnail_list,
                                        "created_at", ascending=False)
         return thumbnail_list
@@ -511,20 +790,18 @@ def thumbnail_get_default(client, entry_id, in_dict=True):
         kfilter.entryIdEqual = entry_id
         pager = None
         response = thumb_asset_service.list(kfilter, pager)
-        thumbnail_list = []
-        for thumbnail in response.objects:
-            if in_dict:
-                thumbinfo = thumbnail_dictify(thumbnail)
-                thumbinfo['url'] = thumb_asset_service.getUrl(thumbinfo['id'],
-                                                              None)
-                thumbnail_list.append(thumbinfo)
-            else:
-                thumbnail_list.append(thumbnail)
+        # the last default thumbnail, as before; thumbnails are let go of
+        # as they are checked, and only the default one gets its url
+        # looked up
         default_thumb = None
-        for item in thumbnail_list:
-            if item.get('default', False) == True:
-                default_thumb = item
-        return default_thumb
+        for thumbnail in response.objects.consume():
+            if thumbnail.getTags() == 'default_thumb':
+                default_thumb = thumbnail
+        if default_thumb is None or not in_dict:
+            return default_thumb
+        thumbinfo = thumbnail_dictify(default_thumb)
+        thumbinfo['url'] = thumb_asset_service.getUrl(thumbinfo['id'], None)
+        return thumbinfo
     except:
         return (False,
                 "Unexpected error retrieving thumbnail list:" + "<p>" + repr(
@@ -536,11 +813,17 @@ def thumbnail_add_from_url(client, entry_id, thumburl):
     try:
         thumbnail_asset_service = KalturaThumbAssetService(client)
         thumb_asset = KalturaThumbAsset()
-        thumb_asset = thumbnail_asset_service.add(entry_id, thumb_asset)
-        thumb_id = thumb_asset.getId()
-        msgs.append('ThumbAsset added to entry, id %s' % thumb_id)
         content_resource = KalturaUrlResource(url=thumburl)
-        thumbnail_asset_service.setContent(thumb_id, content_resource)
+        # one request: setContent takes the id of the added asset by
+        # reference
+        pipeline = KalturaCallPipeline(client)
+        added = pipeline.queue(thumbnail_asset_service.add, entry_id,
+                               thumb_asset)
+        content_set = pipeline.queue(thumbnail_asset_service.setContent,
+                                     added.ref.id, content_resource)
+        thumb_id = added.get().getId()
+        msgs.append('ThumbAsset added to entry, id %s' % thumb_id)
+        content_set.get()
         msgs.append(
             'url %s applied to thumbnail with id %s' % (thumburl, thumb_id))
         return {'success': True, 'message': msgs}
@@ -587,11 +870,25 @@ def searchVideos(client,
                  kaltura_id=None,
                  composite=False,
                  page_size=None,
-                 page_index=None):
+                 page_index=None,
+                 fields=None):
     # Setup a pager and search to use
     # pager = KalturaFilterPager()
     # pager.setPageSize(5)
     # pager.setPageIndex(1)
+    search, pager = search_filter(page_size, page_index)
+    print ("List videos, get the first one...")
+    # Get 10 video entries, but we'll just use the first one returned
+    # entries are decoded one at a time as the response arrives, straight
+    # into the properties the requested fields need
+    projection = search_projection(fields)
+    entries = client.projectList(projection[0], client.media.list,
+                                 search, pager)
+    return search_entries_data(entries, projection, kaltura_id, composite)
+
+
+def search_filter(page_size=None, page_index=None):
+    """The media.list filter and pager searchVideos sends."""
     pager = None
     if page_size:
         pager = KalturaFilterPager()
@@ -601,165 +898,121 @@ def searchVideos(client,
     search = KalturaMediaEntryFilter()
     search.setOrderBy(KalturaMediaEntryOrderBy.CREATED_AT_ASC)
     # search.setMediaTypeEqual(KalturaMediaType.VIDEO)  # Video only
-    print ("List videos, get the first one...")
-    # Get 10 video entries, but we'll just use the first one returned
-    entries = client.media.list(search, pager).objects
+    return search, pager
+
+
+def search_projection(fields=None):
+    """(entry properties to load, copied fields, derived fields) for the
+    searchVideos output fields."""
+    if fields is None:
+        fields = SEARCH_FIELDS
+    copied = [(field, ENTRY_FIELD_PROPERTIES[field]) for field in fields
+              if field in ENTRY_FIELD_PROPERTIES]
+    derived = set(field for field in fields
+                  if field in ENTRY_DERIVED_FIELD_PROPERTIES)
+    property_names = set(['id'] + [prop for (field, prop) in copied])
+    for field in derived:
+        property_names.update(ENTRY_DERIVED_FIELD_PROPERTIES[field])
+    return list(property_names), copied, derived
+
+
+def search_entries_data(entries, projection, kaltura_id=None,
+                        composite=False):
+    """searchVideos output for the projected entries of a media.list."""
+    property_names, copied, derived = projection
     entriesData = []
     for entry in entries:
-        entryData = {}
-        # Status
-        status_codes = {
-            KalturaEntryStatus.ERROR_IMPORTING: "ERROR_IMPORTING",
-            KalturaEntryStatus.ERROR_CONVERTING: "ERROR_CONVERTING",
-            KalturaEntryStatus.IMPORT: "IMPORT",
-            KalturaEntryStatus.PRECONVERT: "PRECONVERT",
-            KalturaEntryStatus.READY: "READY",
-            KalturaEntryStatus.DELETED: "DELETED",
-            KalturaEntryStatus.PENDING: "PENDING",
-            KalturaEntryStatus.MODERATE: "MODERATE",
-            KalturaEntryStatus.BLOCKED: "BLOCKED",
-            KalturaEntryStatus.NO_CONTENT: "NO_CONTENT",
-            KalturaEntryStatus.INFECTED: "virusScan.Infected",
-            KalturaEntryStatus.SCAN_FAILURE: "virusScan.ScanFailure"
-        }
-        entryData['status'] = status_codes.get(entry.getStatus().getValue(),
-                                               'UNKNOWN')
-        # Urls/Accessors
-        entryData['url'] = entry.getDataUrl()
-        entryData['download_url'] = entry.getDownloadUrl()
-        entryData['thumbnail_url'] = entry.getThumbnailUrl()
-        # Type (media type and source type)
-        typelist = {
-            KalturaMediaType.VIDEO: 'VIDEO',
-            KalturaMediaType.IMAGE: 'IMAGE',
-            KalturaMediaType.AUDIO: 'AUDIO',
-            KalturaMediaType.LIVE_STREAM_FLASH: 'LIVE_STREAM_FLASH',
-            KalturaMediaType.LIVE_STREAM_WINDOWS_MEDIA:
-                'LIVE_STREAM_WINDOWS_MEDIA',
-            KalturaMediaType.LIVE_STREAM_REAL_MEDIA: 'LIVE_STREAM_REAL_MEDIA',
-            KalturaMediaType.LIVE_STREAM_QUICKTIME: 'LIVE_STREAM_QUICKTIME'
-        }
-        sourcetypelist = {
-            KalturaSourceType.FILE: "FILE",
-            KalturaSourceType.WEBCAM: "WEBCAM",
-            KalturaSourceType.URL: "URL",
-            KalturaSourceType.SEARCH_PROVIDER: "SEARCH_PROVIDER",
-            KalturaSourceType.AKAMAI_LIVE: "AKAMAI_LIVE",
-            KalturaSourceType.MANUAL_LIVE_STREAM: "MANUAL_LIVE_STREAM"
-        }
-        entryData['media_type'] = typelist.get(entry.getMediaType().getValue(),
-                                               'UNKNOWN')
-        entryData['source_type'] = sourcetypelist.get(
-            entry.getSourceType().getValue(), 'UNKNOWN')
-        # ViewData
-        entryData['plays'] = entry.getPlays()
-        entryData['views'] = entry.getViews()
-        entryData['rank'] = '%s, %s' % (entry.getRank(), entry.getTotalRank())
-        # Video Properties
-        entryData['width'] = entry.getWidth()
-        entryData['height'] = entry.getHeight()
-        entryData['duration'] = entry.getDuration()
-        entryData['created'] = entry.getCreatedAt()
-        entryData['updated'] = entry.getUpdatedAt()
-        # Video Data
-        entryData['name'] = entry.getName()
-        entryData['description'] = entry.getDescription()
-        entryData['tags'] = entry.getTags()
-        # Search Text
-        entryData['searchtext'] = entry.getSearchText()
-        # Control
-        entryData['startDate'] = entry.getStartDate()
-        entryData['endDate'] = entry.getEndDate()
-        # Extra KalturaMediaEntry data
-        entryData['conversionQuality'] = entry.getConversionQuality()
-        entryData['creditUrl'] = entry.getCreditUrl()
-        entryData['creditUserName'] = entry.getCreditUserName()
-        entryData['flavorParamsId'] = entry.getFlavorParamsIds()
-        entryData['mediaDate'] = entry.getMediaDate()
+        entryData = dict((field, entry[prop]) for (field, prop) in copied)
+        if 'status' in derived:
+            entryData['status'] = ENTRY_STATUS_NAMES.get(entry['status'],
+                                                         'UNKNOWN')
+        if 'media_type' in derived:
+            entryData['media_type'] = MEDIA_TYPE_NAMES.get(entry['mediaType'],
+                                                           'UNKNOWN')
+        if 'source_type' in derived:
+            entryData['source_type'] = SOURCE_TYPE_NAMES.get(
+                entry['sourceType'], 'UNKNOWN')
+        if 'rank' in derived:
+            entryData['rank'] = '%s, %s' % (entry['rank'], entry['totalRank'])
         # Identifiers
-        entryData['partner_id'] = entry.getPartnerId()
-        entryData['user_id'] = entry.getUserId()
         if kaltura_id:
             if composite:
-                entryData['id'] = 'kal:' + str(kaltura_id) + ':' + entry.getId()
+                entryData['id'] = 'kal:' + str(kaltura_id) + ':' + entry['id']
             else:
                 entryData['kaltura_id'] = str(kaltura_id)
-                entryData['entry_id'] = entry.getId()
+                entryData['entry_id'] = entry['id']
         else:
-            entryData['id'] = entry.getId()
+            entryData['id'] = entry['id']
         entriesData.append(entryData)
     return entriesData
 
 
 def get_entry(media_id, kaltura_id, client=None, width=120, height=120):
     settings = properties.load_kaltura_settings().get(kaltura_id)
-    error = False
-    error_message = None
-    entry = None
     try:
-        entry = client.media.get(media_id)
+        entry = client.projectObject(GET_ENTRY_PROPERTIES, client.media.get,
+                                     media_id)
     except Exception as inst:
-        error_message = str(inst)
-        error = True
+        return {'success': False, 'message': str(inst)}
+    url, data = default_thumb_request(settings, media_id)
+    content = urllib2.urlopen(urllib2.Request(url, data)).read()
+    return entry_data(entry, media_id, settings, client.getKs(), content,
+                      width, height)
+
+
+def default_thumb_request(settings, media_id):
+    """(url, body) of the thumbasset.list get_entry finds the default
+    thumbnail with."""
+    url = "%s/api_v3/?service=thumbasset&action=list" % settings[
+        'SERVICE_URL']
+    data = urlencode({"filter:entryIdEqual": media_id, "action": "list"})
+    return url, data
+
+
+def entry_data(entry, media_id, settings, ks, thumbs_content, width=120,
+               height=120):
+    """get_entry output for the projected entry and the thumbasset.list
+    response."""
     entryData = {}
-    if error:
-        entryData['success'] = False
-        entryData['message'] = error_message
-    else:
-        entryData['success'] = True
-        typelist = {
-            KalturaMediaType.VIDEO: 'VIDEO',
-            KalturaMediaType.IMAGE: 'IMAGE',
-            KalturaMediaType.AUDIO: 'AUDIO',
-            KalturaMediaType.LIVE_STREAM_FLASH: 'LIVE_STREAM_FLASH',
-            KalturaMediaType.LIVE_STREAM_WINDOWS_MEDIA:
-                'LIVE_STREAM_WINDOWS_MEDIA',
-            KalturaMediaType.LIVE_STREAM_REAL_MEDIA: 'LIVE_STREAM_REAL_MEDIA',
-            KalturaMediaType.LIVE_STREAM_QUICKTIME: 'LIVE_STREAM_QUICKTIME'
-        }
-        entryData['media_type'] = typelist[entry.getMediaType().getValue()]
-        # Urls/Accessors
-        entryData['url'] = entry.getDataUrl()
-        entryData['thumbnail_url_old'] = entry.getThumbnailUrl()
-        url = "%s/api_v3/?service=thumbasset&action=list" % settings[
-            'SERVICE_URL']
-        data = urlencode({"filter:entryIdEqual": media_id, "action": "list"})
-        req = urllib2.Request(url, data)
-        content = urllib2.urlopen(req).read()
-        entryData['ks'] = client.getKs()
-        contentxml = ET.fromstring(content)
-        thumb_id = ''
-        for item in contentxml.findall('./result/objects/item'):
-            tags = item.find('tags').text
-            if tags and 'default_thumb' in tags:
-                thumb_id = item.find('id').text
-        thumbnail_url = "%s/p/%s/thumbnail/entry_id/%s" % (
-            settings['SERVICE_URL'], settings['PARTNER_ID'], media_id)
-        entryData['thumbnail_url'] = thumbnail_url + \
-                                     "/width/%s/height/%s?%s" % (
-                                     width, height, int(time.time()))
-        entryData['download_url'] = entry.getDownloadUrl()
-        entryData['thumb_id'] = thumb_id
-        # ViewData
-        entryData['plays'] = entry.getPlays()
-        entryData['views'] = entry.getViews()
-        entryData['rank'] = (entry.getRank(), entry.getTotalRank())
-        # Video Properties
-        entryData['width'] = entry.getWidth()
-        entryData['height'] = entry.getHeight()
-        entryData['duration'] = entry.getDuration()
-        entryData['created'] = entry.getCreatedAt()
-        entryData['updated'] = entry.getUpdatedAt()
-        # Video Data
-        entryData['name'] = entry.getName()
-        entryData['description'] = entry.getDescription()
-        entryData['tags'] = entry.getTags()
-        # Search Text
-        entryData['searchtext'] = entry.getSearchText()
-        # Control
-        entryData['startDate'] = entry.getStartDate()
-        entryData['endDate'] = entry.getEndDate()
-        # entryData['status'] = entry.getStatus()
+    entryData['success'] = True
+    entryData['media_type'] = MEDIA_TYPE_NAMES[entry['mediaType']]
+    # Urls/Accessors
+    entryData['url'] = entry['dataUrl']
+    entryData['thumbnail_url_old'] = entry['thumbnailUrl']
+    entryData['ks'] = ks
+    contentxml = ET.fromstring(thumbs_content)
+    thumb_id = ''
+    for item in contentxml.findall('./result/objects/item'):
+        tags = item.find('tags').text
+        if tags and 'default_thumb' in tags:
+            thumb_id = item.find('id').text
+    thumbnail_url = "%s/p/%s/thumbnail/entry_id/%s" % (
+        settings['SERVICE_URL'], settings['PARTNER_ID'], media_id)
+    entryData['thumbnail_url'] = thumbnail_url + \
+                                 "/width/%s/height/%s?%s" % (
+                                 width, height, int(time.time()))
+    entryData['download_url'] = entry['downloadUrl']
+    entryData['thumb_id'] = thumb_id
+    # ViewData
+    entryData['plays'] = entry['plays']
+    entryData['views'] = entry['views']
+    entryData['rank'] = (entry['rank'], entry['totalRank'])
+    # Video Properties
+    entryData['width'] = entry['width']
+    entryData['height'] = entry['height']
+    entryData['duration'] = entry['duration']
+    entryData['created'] = entry['createdAt']
+    entryData['updated'] = entry['updatedAt']
+    # Video Data
+    entryData['name'] = entry['name']
+    entryData['description'] = entry['description']
+    entryData['tags'] = entry['tags']
+    # Search Text
+    entryData['searchtext'] = entry['searchText']
+    # Control
+    entryData['startDate'] = entry['startDate']
+    entryData['endDate'] = entry['endDate']
+    # entryData['status'] = entry.getStatus()
     return entryData
 
 
@@ -817,20 +1070,24 @@ def add_caption(captionfile,
         caption_asset.setFormat(KalturaCaptionType(KalturaCaptionType.DFXP))
     else:
         raise Exception('bad format %s' % capformat)
-    # 2: attach the caption_asset to a media entry. Later we'll attach a file
-    # to the caption_asset.
-    caption_asset_service = KalturaCaptionAssetService(client)
-    caption_asset = caption_asset_service.add(entry_id, caption_asset)
-    # 3: upload file using uploadtoken, and get its token and then its
-    # resource object
+    # 2: upload file using uploadtoken, and get its token and then its
+    # resource object. The file data goes in a request of its own.
     upload_token = client.uploadToken.add()
-    upload_token_detailed = client.uploadToken.upload(
-        upload_token.getId(), file(captionfile, 'rb'))
+    with open(captionfile, 'rb') as f:
+        upload_token_detailed = client.uploadToken.upload(
+            upload_token.getId(), f)
     uploaded_resource = KalturaUploadedFileTokenResource(
         upload_token_detailed.getId())
-    # 4: attach file to caption entry
-    caption_asset = caption_asset_service.setContent(
-        caption_asset.getId(), uploaded_resource)
+    # 3: attach the caption_asset to a media entry and the file to the
+    # caption_asset, in one request: setContent takes the id of the added
+    # caption_asset by reference
+    caption_asset_service = KalturaCaptionAssetService(client)
+    pipeline = KalturaCallPipeline(client)
+    added = pipeline.queue(caption_asset_service.add, entry_id, caption_asset)
+    content_set = pipeline.queue(caption_asset_service.setContent,
+                                 added.ref.id, uploaded_resource)
+    added.get()
+    caption_asset = content_set.get()
     return caption_asset.getId()
 
 
@@ -857,14 +1114,7 @@ def caption_dictify(caption_asset):
     elif caption_asset.getFormat().getValue() == KalturaCaptionType.DFXP:
         caption_details['format'] = 'dfxp'
     cap_stat = caption_asset.getStatus().getValue()
-    stat_codes = {
-        -1: 'ERROR',
-        0: 'QUEUED',
-        2: 'READY',
-        3: 'DELETED',
-        7: 'IMPORTING'
-    }
-    caption_details['status'] = stat_codes.get(cap_stat, 'UNKNOWN')
+    caption_details['status'] = ASSET_STATUS_NAMES.get(cap_stat, 'UNKNOWN')
     return caption_details
 
 
@@ -877,14 +1127,7 @@ def thumbnail_dictify(thumbasset):
     thumb_details['created_at'] = thumbasset.getCreatedAt()
     thumb_details[
         'default'] = True if thumbasset.getTags() == 'default_thumb' else False
-    status_codes = {
-        -1: 'ERROR',
-        0: 'QUEUED',
-        2: 'READY',
-        3: 'DELETED',
-        7: 'IMPORTING'
-    }
-    thumb_details['status'] = status_codes.get(
+    thumb_details['status'] = ASSET_STATUS_NAMES.get(
         thumbasset.getStatus().getValue(), 'UNKNOWN')
     return thumb_details
 
@@ -903,14 +1146,16 @@ def get_entry_captions(entry_id, client, in_dict=True):
     listfilter.entryIdEqual = entry_id
     pager = None
     response = caption_asset_service.list(listfilter, pager)
-    caption_list = []
-    for caption in response.objects:
-        if in_dict:
-            caption_entry = caption_dictify(caption)
-            caption_entry['url'] = caption_asset_service.getUrl(caption.getId())
-            caption_list.append(caption_entry)
-        else:
-            caption_list.append(caption)
+    if in_dict:
+        caption_list = [caption_dictify(caption)
+                        for caption in response.objects]
+        urls = call_all(client, [(caption_asset_service.getUrl,
+                                  (caption.getId(),))
+                                 for caption in response.objects])
+        for caption_entry, url in zip(caption_list, urls):
+            caption_entry['url'] = url
+    else:
+        caption_list = list(response.objects)
     caption_list = sort_by_field(caption_list, "created_at", ascending=False)
     return caption_list
 
@@ -58,11 +58,25 @@ else:
 
 
 __all__ = ['StreamingHTTPConnection', 'StreamingHTTPRedirectHandler',
-        'StreamingHTTPHandler', 'register_openers']
+        'StreamingHTTPHandler', 'register_openers', 'cooperative_pause']
 
 if hasattr(httplib, 'HTTPS'):
     __all__.extend(['StreamingHTTPSHandler', 'StreamingHTTPSConnection'])
 
+def cooperative_pause():
+    """Return a function that lets other greenlets run when gevent has
+    patched the socket module, or None.
+
+    A cooperative socket only yields when it would block, which a fast
+    network seldom makes it do, and reading the file being uploaded never
+    yields; pausing after each block keeps one upload from holding up every
+    other request of a gevent worker."""
+    monkey = sys.modules.get('gevent.monkey')
+    if monkey is None or not monkey.is_module_patched('socket'):
+        return None
+    import gevent
+    return gevent.sleep
+
 class _StreamingHTTPMixin:
     """Mixin class for HTTP and HTTPS connections that implements a streaming
     send method."""
@@ -87,6 +101,7 @@ class _StreamingHTTPMixin:
         #       ignore the error... the caller will know if they can retry.
         if self.debuglevel > 0:
             print ("send:", repr(value))
+        pause = cooperative_pause()
         try:
             blocksize = 8192
             if hasattr(value, 'read') :
@@ -95,10 +110,12 @@ class _StreamingHTTPMixin:
                 if self.debuglevel > 0:
                     print ("sendIng a read()able")
                 data = value.read(blocksize)
-                if sys.version_info[0] > 2:
-                    data = data.encode('utf8')
                 while data:
+                    if sys.version_info[0] > 2 and hasattr(data, 'encode'):
+                        data = data.encode('utf8')
                     self.sock.sendall(data)
+                    if pause:
+                        pause()
                     data = value.read(blocksize)
             elif hasattr(value, 'next'):
                 if hasattr(value, 'reset'):
@@ -109,11 +126,18 @@ class _StreamingHTTPMixin:
                     if sys.version_info[0] > 2 and hasattr(data, 'encode'):
                         data = data.encode('utf8')
                     self.sock.sendall(data)
+                    if pause:
+                        pause()
             else:
+                # python 3's httplib sends iterable bodies a block at a time
+                if sys.version_info[0] > 2 and hasattr(value, 'encode'):
+                    value = value.encode('utf8')
                 self.sock.sendall(value)
+                if pause:
+                    pause()
         except socket.error as v:
         
-            if v[0] == 32:      # Broken pipe
+            if v.args[0] == 32:      # Broken pipe
                 self.close()
             raise
 
@@ -1,5 +1,7 @@
 import os
+import time
 import sqlite3
+import threading
 import simplejson
 from pprint import pprint
 from utils import rangegen
@@ -9,6 +11,7 @@ try:
 except ImportError:
     class FCNTL(object):
         LOCK_EX = None
+        LOCK_SH = None
 
         def lockf(*args, **kwargs):
             pass
@@ -29,12 +32,45 @@ DEFAULT_KTS_ADMIN_USER = 'ktsadmin'
 DEFAULT_KTS_ADMIN_PWD = 'ktsadmin'
 DEFAULT_DEBUG_MODE = ''
 DEFAULT_MOBILE_PLAYER_FLAVOR = ''
+DEFAULT_KS_MODE = 'remote'
+DEFAULT_RESPONSE_FORMAT = 'xml'
 DEFAULT_KALTURA_DEFINITIONS_DB = 'kaldefs.db'
+DEFAULT_CONFIG_WAL = '1'
+DEFAULT_KS_CACHE_DB = 'kts-ks-cache.db'
+DEFAULT_WARMUP = '1'
+DEFAULT_BATCH_CALLS = '0'
+DEFAULT_BATCH_MAX_SIZE = '50'
+DEFAULT_BATCH_WINDOW_MS = '0'
 
 kaldefsfile = os.environ.get('KALTURA_DEFINITIONS_DB',
                              DEFAULT_KALTURA_DEFINITIONS_DB)
 kaldefsdb = None
 
+CONFIG_LOCKFILE = 'kts-config.lock'
+CONFIG_BUSY_TIMEOUT = 30
+# WAL lets readers work off a snapshot without taking kts-config.lock at all.
+# Set KTS_CONFIG_WAL=0 where WAL isn't available (e.g. kaldefs.db on NFS);
+# readers then fall back to a shared lock.
+config_use_wal = os.environ.get('KTS_CONFIG_WAL', DEFAULT_CONFIG_WAL) != '0'
+
+# Schema upgrades, applied in order at startup.  PRAGMA user_version records
+# how many of them the definitions db has seen.
+MIGRATIONS_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                 'database_upgrades')
+schema_migrations = ['add_flavor.sql', 'add_ks_mode.sql',
+                     'add_response_format.sql']
+_config_store = {'pid': None, 'wal': False}
+
+# Per-process cache of the configurations table.  The cache is keyed on a
+# stamp of the definitions db file (so writes from other workers are seen)
+# and on config_generation, which add/update/rem_kaltura bump so that writes
+# from this process are seen immediately.
+CONFIG_RACY_WINDOW = 2
+config_generation = 0
+config_cache_stats = {'hits': 0, 'misses': 0}
+_settings_cache = {'stamp': None, 'generation': None, 'settings': None}
+_settings_cache_lock = threading.Lock()
+
 kaltura_defaults_dictionary = {
     "KALTURA_NAME": "Anonymous monkey",
     "KALTURA_PATH": "www.example.com",
@@ -45,7 +81,9 @@ kaltura_defaults_dictionary = {
     "SECRET": "8e81fdce8808cbf71b8dc6c8ee258842",
     "USER_NAME": "foo@example.com",
     "KALTURA_INSTANCES": 1,
-    "MOBILE_PLAYER_FLAVOR": ""
+    "MOBILE_PLAYER_FLAVOR": "",
+    "KS_MODE": DEFAULT_KS_MODE,
+    "RESPONSE_FORMAT": DEFAULT_RESPONSE_FORMAT
 }
 
 # the order of the follwing is important.
@@ -59,7 +97,9 @@ config_table_creation_query = """
                                  ADMIN_SECRET text,
                                  SECRET text,
                                  USER_NAME text,
-                                 MOBILE_PLAYER_FLAVOR text
+                                 MOBILE_PLAYER_FLAVOR text,
+                                 KS_MODE text,
+                                 RESPONSE_FORMAT text
                                  )
     """
 
@@ -73,7 +113,15 @@ Makes a map of id => Settings Map
 kaltura_properties_list = ['KALTURA_CONFIG_ID', 'KALTURA_NAME', 'KALTURA_PATH',
                            'PARTNER_ID', 'PLAYER_ID', 'THUMBNAIL_PLAYER_ID',
                            'ADMIN_SECRET', 'SECRET', 'USER_NAME',
-                           'MOBILE_PLAYER_FLAVOR']
+                           'MOBILE_PLAYER_FLAVOR', 'KS_MODE',
+                           'RESPONSE_FORMAT']
+
+# How KTS gets a KS for an instance: 'remote' calls session.start, 'local'
+# signs one with ADMIN_SECRET, 'validate' does both and compares them.
+KS_MODES = ['remote', 'local', 'validate']
+
+# The format the Kaltura API answers an instance's calls in.
+RESPONSE_FORMATS = ['xml', 'json']
 
 
 def load_kals_from_env(SETTINGS, cur):
@@ -101,7 +149,7 @@ def load_kals_from_env(SETTINGS, cur):
                      [temp_kaltura_config_map.get(kaltura_properties_list[j])
                       for j in rangegen(1, len(kaltura_properties_list))]
             cur.execute(
-                "insert into configurations values(?,?,?,?,?,?,?,?,?,?)",
+                "insert into configurations values(?,?,?,?,?,?,?,?,?,?,?,?)",
                 values)
     else:
         raise Exception(
@@ -110,64 +158,211 @@ def load_kals_from_env(SETTINGS, cur):
     return SETTINGS
 
 
-def load_kaltura_settings(SETTINGS=None):
-    lockfile = open('kts-config.lock', 'w')
-    fcntl.lockf(lockfile, fcntl.LOCK_EX)
-    if SETTINGS is None:
-        SETTINGS = {}
-    kaldefsdb = sqlite3.connect(kaldefsfile)
+def _file_stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_size, getattr(st, 'st_mtime_ns', st.st_mtime))
+
+
+def _config_stamp():
+    """Cheap change marker for the definitions db: (inode, size, mtime) of
+    the db and of its write-ahead log, where committed writes land first."""
+    db_stamp = _file_stamp(kaldefsfile)
+    if db_stamp is None:
+        return None
+    return (db_stamp, _file_stamp(kaldefsfile + '-wal'))
+
+
+def _stamp_is_racy(stamp):
+    # mtime resolution can be as coarse as a second, so a write landing in
+    # the same tick as our read would go unnoticed.  Don't trust fresh stamps.
+    for file_stamp in stamp:
+        if file_stamp is None:
+            continue
+        mtime = file_stamp[2]
+        if isinstance(mtime, int):
+            mtime = mtime / 1e9
+        if time.time() - mtime < CONFIG_RACY_WINDOW:
+            return True
+    return False
+
+
+def _lock_config(exclusive=True):
+    """Take kts-config.lock; closing the returned file releases it."""
+    if exclusive:
+        lockfile = open(CONFIG_LOCKFILE, 'w')
+        fcntl.lockf(lockfile, fcntl.LOCK_EX)
+    else:
+        # shared (read) locks need the file open for reading
+        lockfile = open(CONFIG_LOCKFILE, 'a+')
+        fcntl.lockf(lockfile, fcntl.LOCK_SH)
+    return lockfile
+
+
+def _connect():
+    kaldefsdb = sqlite3.connect(kaldefsfile, timeout=CONFIG_BUSY_TIMEOUT)
+    if _config_store['wal']:
+        # durable enough in WAL mode, and commits stop waiting on fsync
+        kaldefsdb.execute("PRAGMA synchronous=NORMAL")
+    return kaldefsdb
+
+
+def _apply_migrations(kaldefsdb):
+    cur = kaldefsdb.cursor()
+    cur.execute("PRAGMA user_version")
+    version = cur.fetchall()[0][0]
+    for index in rangegen(version, len(schema_migrations)):
+        migration = schema_migrations[index]
+        with open(os.path.join(MIGRATIONS_FOLDER, migration)) as fp:
+            script = fp.read()
+        try:
+            kaldefsdb.executescript(script)
+        except sqlite3.OperationalError as e:
+            # upgrades used to be applied by hand, so they may already be in
+            if 'duplicate column name' not in str(e):
+                raise
+        kaldefsdb.execute("PRAGMA user_version = %d" % (index + 1))
+        kaldefsdb.commit()
+        print ("Applied schema migration %s" % migration)
+    cur.close()
+
+
+def init_config_store():
+    """Prepare the definitions db for this process.
+
+    Under the writer lock: switch the db to WAL mode, create and populate the
+    configurations table if it is missing and apply pending schema
+    migrations.  Runs once per process, on the first settings read.
+    """
+    lockfile = _lock_config()
+    kaldefsdb = _connect()
     cur = kaldefsdb.cursor()
+    wal = False
+    if config_use_wal:
+        cur.execute("PRAGMA journal_mode=WAL")
+        wal = cur.fetchall()[0][0].lower() == 'wal'
     cur.execute(
         "select count(*) from sqlite_master "
         "where type='table' and name='configurations'")
     existence = cur.fetchall()[0][0]
-    if existence == 1:
-        cur.execute("""select KALTURA_CONFIG_ID,
-                                 KALTURA_NAME,
-                                 KALTURA_PATH,
-                                 PARTNER_ID,
-                                 PLAYER_ID,
-                                 THUMBNAIL_PLAYER_ID,
-                                 ADMIN_SECRET,
-                                 SECRET,
-                                 USER_NAME,
-                                 MOBILE_PLAYER_FLAVOR from configurations""")
-        for row in cur:
-            kal_id = str(row[0])
-            SETTINGS[kal_id] = {kaltura_properties_list[i]: str(row[i]) for i in
-                                rangegen(1, len(row))}
-            # a.k.a dict( zip( kaltura_properties_list[1:], row[1:] ) )
-            SETTINGS[kal_id]['SERVICE_URL'] = "http://" + SETTINGS[kal_id][
-                'KALTURA_PATH']
-
-    elif existence == 0:
+    if existence == 0:
         cur.execute(config_table_creation_query)
-        SETTINGS = load_kals_from_env(SETTINGS, cur)
+        load_kals_from_env({}, cur)
+        # the creation query already has every upgrade in it
+        cur.execute("PRAGMA user_version = %d" % len(schema_migrations))
         kaldefsdb.commit()
-
+    else:
+        _apply_migrations(kaldefsdb)
     cur.close()
     kaldefsdb.close()
     lockfile.close()
+    _config_store['wal'] = wal
+    _config_store['pid'] = os.getpid()
+
+
+def bump_config_generation():
+    global config_generation
+    with _settings_cache_lock:
+        config_generation += 1
+
+
+def config_cache_info():
+    return {'hits': config_cache_stats['hits'],
+            'misses': config_cache_stats['misses'],
+            'generation': config_generation}
+
+
+def read_kaltura_settings(SETTINGS=None):
+    """Read the configurations table, bypassing the per-process cache.
+
+    In WAL mode this takes no lock at all; sqlite serves the select from a
+    consistent snapshot even while a writer is committing.
+    """
+    if _config_store['pid'] != os.getpid():
+        init_config_store()
+    lockfile = None
+    if not _config_store['wal']:
+        lockfile = _lock_config(exclusive=False)
+    if SETTINGS is None:
+        SETTINGS = {}
+    kaldefsdb = _connect()
+    cur = kaldefsdb.cursor()
+    cur.execute("""select KALTURA_CONFIG_ID,
+                             KALTURA_NAME,
+                             KALTURA_PATH,
+                             PARTNER_ID,
+                             PLAYER_ID,
+                             THUMBNAIL_PLAYER_ID,
+                             ADMIN_SECRET,
+                             SECRET,
+                             USER_NAME,
+                             MOBILE_PLAYER_FLAVOR,
+                             KS_MODE,
+                             RESPONSE_FORMAT from configurations""")
+    for row in cur:
+        kal_id = str(row[0])
+        SETTINGS[kal_id] = {kaltura_properties_list[i]: str(row[i]) for i in
+                            rangegen(1, len(row))}
+        # a.k.a dict( zip( kaltura_properties_list[1:], row[1:] ) )
+        SETTINGS[kal_id]['SERVICE_URL'] = "http://" + SETTINGS[kal_id][
+            'KALTURA_PATH']
+    cur.close()
+    kaldefsdb.close()
+    if lockfile is not None:
+        lockfile.close()
+    return SETTINGS
+
+
+def load_kaltura_settings(SETTINGS=None):
+    """Return the Kaltura configurations, served from the per-process cache.
+
+    The table is only re-read when the definitions db changed on disk or
+    config_generation moved since the last read.  Callers get their own
+    copies of the per-instance dicts, so mutating them is safe.
+    """
+    if _config_store['pid'] != os.getpid():
+        init_config_store()
+    stamp = _config_stamp()
+    with _settings_cache_lock:
+        cached = _settings_cache['settings']
+        if cached is not None and stamp is not None \
+                and stamp == _settings_cache['stamp'] \
+                and _settings_cache['generation'] == config_generation:
+            config_cache_stats['hits'] += 1
+        else:
+            config_cache_stats['misses'] += 1
+            generation = config_generation
+            cached = read_kaltura_settings()
+            _settings_cache['settings'] = cached
+            if stamp is not None and _stamp_is_racy(stamp):
+                stamp = None
+            _settings_cache['stamp'] = stamp
+            _settings_cache['generation'] = generation
+    if SETTINGS is None:
+        SETTINGS = {}
+    for kal_id, kal_settings in cached.items():
+        SETTINGS[kal_id] = dict(kal_settings)
     return SETTINGS
 
 
 def add_kaltura(values):
     try:
-        lockfile = open('kts-config.lock', 'w')
-        fcntl.lockf(lockfile, fcntl.LOCK_EX)
+        lockfile = _lock_config()
 
-        kaldefsdb = sqlite3.connect(kaldefsfile)
+        kaldefsdb = _connect()
         cur = kaldefsdb.cursor()
 
         cur.execute("select count(*) from configurations")
         count = cur.fetchall()[0][0]
         if count == 0:
             cur.execute(
-                "insert into configurations values(1,?,?,?,?,?,?,?,?,?)",
+                "insert into configurations values(1,?,?,?,?,?,?,?,?,?,?,?)",
                 values)
         else:
             cur.execute(
-                "insert into configurations values(NULL,?,?,?,?,?,?,?,?,?)",
+                "insert into configurations values(NULL,?,?,?,?,?,?,?,?,?,?,?)",
                 values)
 
         kaldefsdb.commit()
@@ -175,6 +370,7 @@ def add_kaltura(values):
         cur.close()
         kaldefsdb.close()
         lockfile.close()
+        bump_config_generation()
 
         return simplejson.dumps({'success': True, 'kaltura_id': kaltura_id})
     except Exception as e:
@@ -189,10 +385,9 @@ def rem_kaltura(kaltura_id):
         if kaltura_id is None or kaltura_id == '':
             success = False
             msgs.append('KALTURA_CONFIG_ID must be provided')
-        lockfile = open('kts-config.lock', 'w')
-        fcntl.lockf(lockfile, fcntl.LOCK_EX)
+        lockfile = _lock_config()
 
-        kaldefsdb = sqlite3.connect(kaldefsfile)
+        kaldefsdb = _connect()
         cur = kaldefsdb.cursor()
 
         cur.execute("delete from configurations where KALTURA_CONFIG_ID = ?",
@@ -202,6 +397,7 @@ def rem_kaltura(kaltura_id):
         cur.close()
         kaldefsdb.close()
         lockfile.close()
+        bump_config_generation()
 
         return simplejson.dumps({'success': success, 'messages': msgs})
     except Exception as e:
@@ -211,10 +407,9 @@ def rem_kaltura(kaltura_id):
 
 def update_kaltura(kaltura_id, values):
     try:
-        lockfile = open('kts-config.lock', 'w')
-        fcntl.lockf(lockfile, fcntl.LOCK_EX)
+        lockfile = _lock_config()
 
-        kaldefsdb = sqlite3.connect(kaldefsfile)
+        kaldefsdb = _connect()
         cur = kaldefsdb.cursor()
 
         upd_query = """update configurations set
@@ -226,7 +421,9 @@ def update_kaltura(kaltura_id, values):
                             ADMIN_SECRET = ?,
                             SECRET = ?,
                             USER_NAME = ?,
-                            MOBILE_PLAYER_FLAVOR = ?
+                            MOBILE_PLAYER_FLAVOR = ?,
+                            KS_MODE = ?,
+                            RESPONSE_FORMAT = ?
                             WHERE KALTURA_CONFIG_ID = ?"""
 
         cur.execute(upd_query, (list(values) + [kaltura_id]))
@@ -235,6 +432,7 @@ def update_kaltura(kaltura_id, values):
         cur.close()
         kaldefsdb.close()
         lockfile.close()
+        bump_config_generation()
 
         return simplejson.dumps({'success': True, 'messages': None})
     except Exception as e:
@@ -255,6 +453,15 @@ def load_server_settings(SETTINGS={}):
     SETTINGS['KALTURA_DEFINITIONS_DB'] = os.environ.get(
         'KALTURA_DEFINITIONS_DB',
         DEFAULT_KALTURA_DEFINITIONS_DB)
+    SETTINGS['KS_CACHE_DB'] = os.environ.get('KS_CACHE_DB',
+                                             DEFAULT_KS_CACHE_DB)
+    SETTINGS['WARMUP'] = os.environ.get('KTS_WARMUP', DEFAULT_WARMUP) != '0'
+    SETTINGS['BATCH_CALLS'] = os.environ.get('KTS_BATCH_CALLS',
+                                             DEFAULT_BATCH_CALLS) != '0'
+    SETTINGS['BATCH_MAX_SIZE'] = int(os.environ.get('KTS_BATCH_MAX_SIZE',
+                                                    DEFAULT_BATCH_MAX_SIZE))
+    SETTINGS['BATCH_WINDOW'] = float(os.environ.get(
+        'KTS_BATCH_WINDOW_MS', DEFAULT_BATCH_WINDOW_MS)) / 1000
     return SETTINGS
 
 
@@ -1,8 +1,14 @@
+import os
+import sys
 from sys import argv
 
 from tornado.wsgi import WSGIContainer
 from tornado.httpserver import HTTPServer
 from tornado.ioloop import IOLoop
+from tornado.netutil import bind_sockets
+from tornado.process import fork_processes
+from tornado.web import Application, FallbackHandler
+# importing the app also warms it up, see warmup.py
 from server import app
 
 import properties
@@ -10,15 +16,38 @@ import properties
 SETTINGS = {}
 properties.load_server_settings(SETTINGS)
 
-http_server = HTTPServer(WSGIContainer(app))
-if len(argv)==2:
-    http_server.listen(int(argv[1]))
-else:
-    http_server.listen(int(SETTINGS['PORT']))
-IOLoop.instance().start()
-
-# the following didn't help much
-# http_server = HTTPServer(WSGIContainer(app))
-# http_server.bind(int(SETTINGS['PORT']))
-# http_server.start(4)
-# IOLoop.instance().start()
+# the natively served endpoints use async/await
+ASYNC_SERVICES = sys.version_info >= (3, 5) and \
+    os.environ.get('KTS_ASYNC_SERVICES', '1') != '0'
+
+
+def make_app():
+    """The tornado application, or on Python 2 and with
+    KTS_ASYNC_SERVICES=0 the Flask app alone."""
+    if not ASYNC_SERVICES:
+        return WSGIContainer(app)
+    import tornadoservices
+    # everything else runs the Flask app, one request at a time
+    return Application(tornadoservices.HANDLERS + [
+        (r'.*', FallbackHandler, dict(fallback=WSGIContainer(app)))])
+
+
+def main():
+    if len(argv) == 2:
+        port = int(argv[1])
+    else:
+        port = int(SETTINGS['PORT'])
+    processes = int(os.environ.get('KTS_WORKERS', 1))
+    if processes != 1:
+        # each process listens on its own SO_REUSEPORT socket and the
+        # kernel spreads new connections over them; 0 starts one per cpu
+        fork_processes(processes)
+    sockets = bind_sockets(port, reuse_port=processes != 1)
+    http_server = HTTPServer(make_app(),
+                             max_body_size=app.config['MAX_CONTENT_LENGTH'])
+    http_server.add_sockets(sockets)
+    IOLoop.current().start()
+
+
+if __name__ == '__main__':
+    main()
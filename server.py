@@ -5,7 +5,7 @@ import logging
 import simplejson
 
 # Flask Imports
-from flask import Flask, request, session, render_template, \
+from flask import Flask, request, render_template, \
     send_file, redirect, url_for, g
 import werkzeug
 from werkzeug import secure_filename
@@ -18,6 +18,7 @@ from flask.ext.login import LoginManager, login_user, logout_user, \
 import myKalturaObject
 import properties
 import utils
+import warmup
 from filetypes import get_KalturaMediaType_from_file, \
     get_KalturaMediaType_from_pull_url, get_specified_type
 from exceldumps import create_workbook, close_workbook, get_new_worksheet, \
@@ -90,37 +91,27 @@ def _parse_ids(args, form):
     return kaltura_id, entry_id
 
 
-def kaltura_session_loader_base(kaltura_id, session):
-    # Refresh Kaltura Session If not
-    print ("Current in session" + repr(session))
-    kkey = 'kaltura-{}'.format(kaltura_id)
-    if kkey in session and 'ksusages' in session[kkey] \
-        and 'ksessionkey' in session[kkey] \
-        and 'kstime' in session[kkey] and session[kkey]['ksusages'] < 5 and \
-           (time.time() - session[kkey]['kstime']) < myKalturaObject.KS_EXPIRY:
-        print ("I already have session. kid: {} ks: {} usages: {}" . 
-        format(
-            kaltura_id, session[kkey]['ksessionkey'], session[kkey]['ksusages']))
-        session[kkey]['ksusages'] += 1
-        return myKalturaObject.create_session(kaltura_id,
-                                              session[kkey]["ksessionkey"])
-    else:
-        session[kkey] = {}
-        settings = properties.load_kaltura_settings().get(kaltura_id)
-        session[kkey]["ksessionkey"] = myKalturaObject.get_new_session_key(
-            settings)
-        session[kkey]["ksusages"] = 0
-        session[kkey]["kstime"] = time.time()
-        return myKalturaObject.create_session(kaltura_id,
-                                              session[kkey]["ksessionkey"])
-
-
 def allowed_file(filename):
     return True
 
 
 def kaltura_session_loader(kaltura_id):
-    return kaltura_session_loader_base(kaltura_id, session)
+    # The KS comes from the server-side cache shared by all workers, so
+    # cookie-less callers don't pay for session.start either.
+    client = myKalturaObject.create_session(
+        kaltura_id, myKalturaObject.get_cached_session_key(kaltura_id))
+    # pooled clients go back to the pool when the request is torn down
+    if not hasattr(g, 'kaltura_clients'):
+        g.kaltura_clients = []
+    g.kaltura_clients.append(client)
+    return client
+
+
+@app.teardown_request
+def release_kaltura_clients(exc):
+    for client in getattr(g, 'kaltura_clients', []):
+        myKalturaObject.release_session(client)
+    g.kaltura_clients = []
 
 
 @app.after_request
@@ -260,6 +251,32 @@ def view_configs():
                            data=data)
 
 
+@app.route('/service/health', methods=['GET'])
+def service_health():
+    """Readiness: 200 once the warm-up has run, 503 until then."""
+    return simplejson.dumps({
+        'pid': os.getpid(),
+        'ready': warmup.state['ready'],
+        'warmup_seconds': warmup.state['seconds'],
+        'instances': warmup.state['instances'],
+        'errors': warmup.state['errors']
+    }), 200 if warmup.state['ready'] else 503
+
+
+@app.route('/service/stats/', methods=['GET'])
+def service_stats():
+    """Per-worker counters for the caches on the request hot path."""
+    return simplejson.dumps({
+        'pid': os.getpid(),
+        'config_cache': properties.config_cache_info(),
+        'ks_cache': myKalturaObject.ks_cache.info(),
+        'ks_validation': myKalturaObject.ks_validation_stats,
+        'client_pool': myKalturaObject.client_pool.info(),
+        'http_pool': myKalturaObject.KalturaClient.connectionPool.info(),
+        'read_timers': myKalturaObject.readTimerStats()
+    })
+
+
 @app.route('/service/kaltura_session_start', methods=['GET', 'POST'])
 def kaltura_session_start():
     kaltura_id = request.form.get('kaltura_id', None)
@@ -267,7 +284,7 @@ def kaltura_session_start():
         kaltura_id = request.args.get('kaltura_id', "1")
     if not kaltura_id:
         raise Exception("kaltura_id not provided")
-    return repr(kaltura_session_loader(kaltura_id, True))
+    return repr(kaltura_session_loader(kaltura_id))
 
 
 @app.route('/service/search_video/', methods=['GET', 'POST'])
@@ -310,7 +327,8 @@ def get_excel():
     skipped = 0
     for num in utils.rangegen(i):
         data = myKalturaObject.searchVideos(
-            client, kaltura_id, True, int(pagesize), num + 1)
+            client, kaltura_id, True, int(pagesize), num + 1,
+            fields=list(fields) + list(skip_vals))
         write_result = write_to_worksheet(worksheet,
                                           data,
                                           fields,
@@ -942,6 +960,14 @@ if not SETTINGS['DEBUG_MODE']:
         return simplejson.dumps(error_dict), 500
 
 
+# Runs wherever the app is imported: in the gunicorn master when it preloads
+# the app (so workers fork warm), otherwise in each worker before it serves.
+if SETTINGS['WARMUP']:
+    warmup.warm_up()
+else:
+    warmup.skip()
+
+
 if __name__ == '__main__':
     app.debug = True if SETTINGS['DEBUG_MODE'] else False
     from pprint import pprint
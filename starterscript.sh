@@ -23,6 +23,10 @@ export k_1_PARTNER_ID=99
 export k_1_PLAYER_ID=1234567
 export k_1_SECRET=someSecret
 export k_1_THUMBNAIL_PLAYER_ID=1234568
+# remote (session.start), local (signed with ADMIN_SECRET) or validate
+export k_1_KS_MODE=remote
+# xml or json: the format the Kaltura API answers in
+export k_1_RESPONSE_FORMAT=xml
 
 # And works for kaltura subscribers too.
 export k_2_ADMIN_SECRET=someSecret
@@ -56,9 +60,12 @@ fi
 echo 'waiting to ensure old processes are killed'
 sleep 10
 
+echo 'Byte-compiling sources'
+python -m compileall -q . > /dev/null
+
 echo 'Starting gunicorn daemon'
 
-nohup gunicorn -w 4 --access-logfile='kts_access.log' --error-logfile='kts_error.log' -b 0.0.0.0:6500 server:app &
+nohup gunicorn --preload -w 4 --access-logfile='kts_access.log' --error-logfile='kts_error.log' -b 0.0.0.0:6500 server:app &
 
 echo $! > kts.pid
 echo 'Started.'
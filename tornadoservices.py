@@ -0,0 +1,237 @@
+"""The /service endpoints runtornado.py serves natively on the IOLoop
+(Python 3.5 and later only, like asyncKalturaObject).
+
+Each handler answers like the Flask view of the same endpoint, making its
+Kaltura calls with KalturaAsyncClient.
+"""
+import os
+
+import simplejson
+from tornado.ioloop import IOLoop
+from tornado.web import RequestHandler, HTTPError
+
+from server import app, _parse_ids, allowed_file, secure_filename
+
+import properties
+import asyncKalturaObject
+from filetypes import get_KalturaMediaType_from_file, \
+    get_KalturaMediaType_from_pull_url, get_specified_type
+
+SETTINGS = {}
+properties.load_server_settings(SETTINGS)
+
+
+class ServiceHandler(RequestHandler):
+    """A /service endpoint served on the IOLoop, with KalturaAsyncClient.
+
+    Answers like the Flask view of the same endpoint: same arguments, same
+    JSON, same headers and errors.  Kaltura calls don't hold up the other
+    requests of the process while they wait on the Kaltura server.
+    """
+
+    def initialize(self):
+        self.msgs = []
+        self.kaltura_clients = []
+
+    def prepare(self):
+        # like flask's request.args and request.form: first values
+        self.args = dict((name, self.decode_argument(values[0], name))
+                         for name, values in
+                         self.request.query_arguments.items())
+        self.form = dict((name, self.decode_argument(values[0], name))
+                         for name, values in
+                         self.request.body_arguments.items())
+
+    def set_default_headers(self):
+        self.set_header('Access-Control-Allow-Headers',
+                        'Content-Type, X-Requested-With')
+
+    async def kaltura_session_loader(self, kaltura_id):
+        client = await asyncKalturaObject.create_session(kaltura_id)
+        # pooled clients go back to the pool when the request is done
+        self.kaltura_clients.append(client)
+        return client
+
+    def on_finish(self):
+        for client in self.kaltura_clients:
+            asyncKalturaObject.release_session(client)
+        self.kaltura_clients = []
+
+    def write_error(self, status_code, **kwargs):
+        exc_info = kwargs.get('exc_info')
+        if SETTINGS['DEBUG_MODE'] or exc_info is None or \
+                isinstance(exc_info[1], HTTPError):
+            return RequestHandler.write_error(self, status_code, **kwargs)
+        error = exc_info[1]
+        app.logger.error(str(error), exc_info=exc_info)
+        self.finish(simplejson.dumps({
+            "success": False,
+            "messages": [str(error)] + self.msgs
+        }))
+
+
+class CrossDomainServiceHandler(ServiceHandler):
+    """What utils.crossdomain(origin='*') adds to a Flask view (error
+    responses go without, as they do there)."""
+
+    def prepare(self):
+        ServiceHandler.prepare(self)
+        self.set_header('Access-Control-Allow-Origin', '*')
+        self.set_header('Access-Control-Allow-Methods',
+                        'POST, GET, HEAD, OPTIONS')
+        self.set_header('Access-Control-Max-Age', '21600')
+
+    def options(self):
+        self.set_header('Allow', 'POST, GET, HEAD, OPTIONS')
+
+
+class SearchVideoHandler(ServiceHandler):
+    async def get(self):
+        kaltura_id, entry_id = _parse_ids(self.args, self.form)
+        client = await self.kaltura_session_loader(kaltura_id)
+        entriesData = await asyncKalturaObject.searchVideos(
+            client, kaltura_id, True)
+        self.write(simplejson.dumps(entriesData))
+
+    post = get
+
+
+class GetMediaHandler(ServiceHandler):
+    async def get(self):
+        kaltura_id, entry_id = _parse_ids(self.args, self.form)
+        width = self.args.get('width', 120)
+        height = self.args.get('height', 120)
+        client = await self.kaltura_session_loader(kaltura_id)
+        self.write(simplejson.dumps(
+            await asyncKalturaObject.get_entry(entry_id, kaltura_id, client,
+                                               width, height)))
+
+    post = get
+
+
+class ThumbnailListHandler(CrossDomainServiceHandler):
+    async def get(self):
+        kaltura_id, entry_id = _parse_ids(self.args, self.form)
+        if not entry_id:
+            raise Exception('entry_id is required')
+        client = await self.kaltura_session_loader(kaltura_id)
+        list_of_thumbs = await asyncKalturaObject.thumbnail_list(
+            client=client, entry_id=entry_id)
+        self.write(simplejson.dumps(list_of_thumbs))
+
+    post = get
+
+
+class ListCaptionsHandler(CrossDomainServiceHandler):
+    async def get(self):
+        kaltura_id, entry_id = _parse_ids(self.args, self.form)
+        if not entry_id:
+            raise Exception('entry_id is required')
+        client = await self.kaltura_session_loader(kaltura_id)
+        caption_list = await asyncKalturaObject.get_entry_captions(entry_id,
+                                                                   client)
+        self.write(simplejson.dumps(caption_list))
+
+    post = get
+
+
+class UploadFileHandler(ServiceHandler):
+    """Upload a file to kaltura (via remote URL or file POST).
+
+    Returns a JSON object containing "success", "kaltura_id" (misnomer,
+    deprecated), "messages" and "entry_id".
+    """
+
+    def get(self):
+        self.write(simplejson.dumps({
+            'success': False,
+            'errorValue': 'Data not Posted', 'messages': self.msgs}))
+
+    def upload_result(self, upload_status, upload_info):
+        return simplejson.dumps({
+            'success': bool(upload_status),
+            'messages': self.msgs, 'kaltura_id': upload_info,
+            'entry_id': upload_info})
+
+    async def post(self):
+        kaltura_id = self.form.get('kaltura_id', None)
+        if not kaltura_id:
+            kaltura_id = self.args.get('kaltura_id', "1")
+        # Three Modes of Consumption.
+        # 1. FromLocal
+        # 2. File Post
+        # 3. PullPath
+        pull_path = self.form.get('pullPath', None) or \
+            self.args.get('pullPath', None)
+        fromlocal = self.form.get('fromlocal', None) or \
+            self.args.get('fromlocal', None)
+        medianame = self.form.get('medianame', None)
+        if not medianame:
+            medianame = self.args.get('medianame', None)
+        if medianame is None:
+            # as flask answers a missing request.args key
+            raise HTTPError(400)
+        split_medianame = medianame.split(".")
+        if len(split_medianame) >= 2:
+            medianame = ".".join(split_medianame[:-1])
+
+        if fromlocal:
+            media_type = get_KalturaMediaType_from_file(fromlocal)
+            (upload_status, upload_info) = \
+                await asyncKalturaObject.uploadVideo(
+                    fromlocal, medianame,
+                    client=await self.kaltura_session_loader(kaltura_id),
+                    media_type=media_type)
+            self.msgs.append("Uploaded to Kaltura")
+        elif pull_path:
+            # Must Instruct Kaltura to pull from this path
+            # and also supply media name
+            deftype = self.args.get('default', None) or \
+                self.form.get('default', None) or 'video'
+            user_defined_type = self.form.get('mediatype') or \
+                self.args.get('mediatype')
+            if user_defined_type:
+                media_type = get_specified_type(user_defined_type)
+            else:
+                # the media name is checked too, for when neither the url
+                # nor its mime type give the type away
+                media_type = get_KalturaMediaType_from_pull_url(
+                    pull_path, deftype) or \
+                    get_KalturaMediaType_from_pull_url(medianame, deftype)
+            (upload_status, upload_info) = \
+                await asyncKalturaObject.pullVideo(
+                    pull_path, medianame,
+                    client=await self.kaltura_session_loader(kaltura_id),
+                    media_type=media_type)
+            self.msgs.append("Kaltura will now pull and process the video")
+        else:
+            inputfile = self.request.files['file'][0]
+            if not (inputfile and allowed_file(inputfile.filename)):
+                return self.get()
+            filename = secure_filename(inputfile.filename)
+            upload_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+            await IOLoop.current().run_in_executor(
+                None, save_file, upload_path, inputfile.body)
+            media_type = get_KalturaMediaType_from_file(upload_path)
+            self.msgs.append("File Uploaded locally")
+            (upload_status, upload_info) = \
+                await asyncKalturaObject.uploadVideo(
+                    upload_path, medianame,
+                    client=await self.kaltura_session_loader(kaltura_id),
+                    media_type=media_type)
+            self.msgs.append("Uploaded to Kaltura")
+        self.write(self.upload_result(upload_status, upload_info))
+
+
+def save_file(path, body):
+    with open(path, 'wb') as f:
+        f.write(body)
+
+
+HANDLERS = [
+    (r'/service/search_video/', SearchVideoHandler),
+    (r'/service/get_media/', GetMediaHandler),
+    (r'/service/thumbnail_list/', ThumbnailListHandler),
+    (r'/service/list_captions/', ListCaptionsHandler),
+    (r'/service/upload_file', UploadFileHandler),
+]
@@ -5,24 +5,26 @@ import sys
 from logging.handlers import RotatingFileHandler
 from functools import update_wrapper
 from datetime import timedelta
-import chardet
 from flask import make_response, request, current_app
 
 
 if sys.version_info[0] > 2:
     base_string_type = str
+    text_type = str
     rangegen = range
     def maybe_cast_to_unicode(s):
         return s
     import urllib.parse
+    from urllib.parse import quote_plus
     def urlencode(*args, **kwargs):
         return urllib.parse.urlencode(*args, **kwargs).encode('utf8')
 else:
     base_string_type = basestring
+    text_type = unicode
     rangegen = xrange
     def maybe_cast_to_unicode(s):
         return unicode(s)
-    from urllib import urlencode
+    from urllib import urlencode, quote_plus
 
 
 def addFileLogger(logger_object, log_name, level=2):
@@ -36,6 +38,8 @@ def addFileLogger(logger_object, log_name, level=2):
 
 
 def convert_file_to_unicode(filepath):
+    # chardet is slow to import and heavy; only caption uploads need it
+    import chardet
     utext = None
     with open(filepath, 'r') as fp:
         text = fp.read()
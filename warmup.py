@@ -0,0 +1,69 @@
+"""Warm-up run before KTS takes traffic.
+
+Called once in the process that will serve requests, or in the gunicorn
+master when the app is preloaded, before any worker is forked.  It loads the
+Kaltura configurations, mints a KS for every instance into the shared KS
+cache and pre-builds a pooled client per instance.  It then freezes the heap,
+so forked workers share it copy-on-write.  /service/health reports ready once
+it has run.
+
+Nothing here starts a thread: workers forked from the master start their own.
+"""
+import gc
+import time
+import logging
+
+import properties
+import myKalturaObject
+
+logger = logging.getLogger('warmup')
+
+state = {'ready': False, 'started': None, 'finished': None, 'seconds': None,
+         'instances': 0, 'errors': []}
+
+
+def warm_instance(kaltura_id, settings):
+    ks = myKalturaObject.ks_cache.warm(kaltura_id, settings)
+    myKalturaObject.release_session(
+        myKalturaObject.client_pool.acquire(settings, ks))
+
+
+def skip():
+    """Mark the process ready without a warm-up (KTS_WARMUP=0): every
+    instance is warmed on its first request instead."""
+    state['ready'] = True
+    return state
+
+
+def warm_up(freeze=True):
+    """Warm every configured Kaltura instance and mark the process ready.
+
+    A failing instance is logged and skipped; it is warmed on its first
+    request instead, as it would be without a warm-up.
+    """
+    state['started'] = time.time()
+    state['errors'] = []
+    properties.init_config_store()
+    kaltura_settings = properties.load_kaltura_settings()
+    for kaltura_id in sorted(kaltura_settings):
+        try:
+            warm_instance(kaltura_id, kaltura_settings[kaltura_id])
+        except Exception as e:
+            logger.exception('Warm-up failed for kaltura id %s: %s'
+                             % (kaltura_id, e))
+            state['errors'].append({'kaltura_id': kaltura_id,
+                                    'error': str(e)})
+    state['instances'] = len(kaltura_settings)
+    if freeze:
+        gc.collect()
+        # objects alive now are never collected, so the collector doesn't
+        # touch (and un-share) their pages in the forked workers
+        if hasattr(gc, 'freeze'):
+            gc.freeze()
+    state['finished'] = time.time()
+    state['seconds'] = state['finished'] - state['started']
+    state['ready'] = True
+    logger.info('Warm-up of %d instances took %.2fs, %d failed'
+                % (state['instances'], state['seconds'],
+                   len(state['errors'])))
+    return state